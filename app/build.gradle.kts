@@ -42,6 +42,10 @@ android {
     composeOptions {
         kotlinCompilerExtensionVersion = "1.5.4"
     }
+    androidResources {
+        // Image packs (scripts/extract_pdf_images.py --pack) are read by offset
+        noCompress += "pack"
+    }
     packaging {
         resources {
             excludes += "/META-INF/{AL2.0,LGPL2.1}"
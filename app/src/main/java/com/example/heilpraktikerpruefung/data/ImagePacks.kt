@@ -0,0 +1,101 @@
+package com.example.heilpraktikerpruefung.data
+
+import android.content.Context
+import java.io.BufferedInputStream
+import java.io.DataInputStream
+import java.io.IOException
+import java.io.InputStream
+import java.util.concurrent.ConcurrentHashMap
+
+/**
+ * Reads exam images from the per-exam packs written by
+ * scripts/extract_pdf_images.py --pack ("images/2022-march.pack"): one asset
+ * per exam holding all its WebP files behind an offset index. Images of
+ * exams without a pack (and hand-made assets) are read as loose files, so
+ * callers always pass the plain asset path ("images/2022-march/q3.webp").
+ */
+object ImagePacks {
+
+    private const val IMAGES_DIR = "images/"
+    private const val MAGIC = "HPIMGPK1"
+
+    private class Entry(val offset: Long, val length: Int)
+
+    // exam id -> pack index, or an empty map if the exam has no pack
+    private val indexes = ConcurrentHashMap<String, Map<String, Entry>>()
+
+    private fun packPath(examId: String) = "$IMAGES_DIR$examId.pack"
+
+    private fun readIndex(context: Context, examId: String): Map<String, Entry> = try {
+        DataInputStream(BufferedInputStream(context.assets.open(packPath(examId)))).use { input ->
+            val magic = ByteArray(MAGIC.length)
+            input.readFully(magic)
+            if (String(magic, Charsets.US_ASCII) != MAGIC) return emptyMap()
+            val count = input.readInt()
+            HashMap<String, Entry>(count * 2).apply {
+                repeat(count) {
+                    val name = ByteArray(input.readUnsignedShort())
+                    input.readFully(name)
+                    val offset = input.readInt().toLong() and 0xffffffffL
+                    put(String(name, Charsets.UTF_8), Entry(offset, input.readInt()))
+                }
+            }
+        }
+    } catch (e: IOException) {
+        emptyMap()
+    }
+
+    /** Pack index entry of an asset path, or null if it is not packed. */
+    private fun entryFor(context: Context, assetPath: String): Pair<String, Entry>? {
+        val parts = assetPath.removePrefix(IMAGES_DIR).split('/', limit = 2)
+        if (parts.size != 2) return null
+        val (examId, name) = parts
+        val index = indexes.getOrPut(examId) { readIndex(context, examId) }
+        return index[name]?.let { examId to it }
+    }
+
+    private fun readEntry(context: Context, examId: String, entry: Entry): ByteArray {
+        val path = packPath(examId)
+        // Packs are stored uncompressed (noCompress in build.gradle.kts), so
+        // skipping is a seek; openFd fails for compressed assets, which are
+        // then decompressed up to the image instead
+        val stream = try {
+            context.assets.openFd(path).createInputStream()
+        } catch (e: IOException) {
+            context.assets.open(path)
+        }
+        return stream.use { input ->
+            skipFully(input, entry.offset)
+            ByteArray(entry.length).also { DataInputStream(input).readFully(it) }
+        }
+    }
+
+    private fun skipFully(input: InputStream, count: Long) {
+        var remaining = count
+        while (remaining > 0) {
+            val skipped = input.skip(remaining)
+            if (skipped <= 0) {
+                if (input.read() < 0) throw IOException("Unexpected end of pack")
+                remaining--
+            } else {
+                remaining -= skipped
+            }
+        }
+    }
+
+    /** The bytes of an image asset, from its exam's pack or the loose file. */
+    fun read(context: Context, assetPath: String): ByteArray {
+        val packed = entryFor(context, assetPath)
+        if (packed != null) return readEntry(context, packed.first, packed.second)
+        return context.assets.open(assetPath).use { it.readBytes() }
+    }
+
+    fun exists(context: Context, assetPath: String): Boolean {
+        if (entryFor(context, assetPath) != null) return true
+        return try {
+            context.assets.open(assetPath).use { true }
+        } catch (e: IOException) {
+            false
+        }
+    }
+}
@@ -0,0 +1,63 @@
+package com.example.heilpraktikerpruefung.data
+
+import android.content.Context
+import kotlinx.serialization.Serializable
+import kotlinx.serialization.SerializationException
+import kotlinx.serialization.json.Json
+import java.io.IOException
+
+@Serializable
+data class ImageVariant(
+    val file: String,
+    val width: Int,
+    val height: Int
+)
+
+@Serializable
+data class ImageIndexFile(
+    val format: Int = 1,
+    val images: Map<String, Map<String, ImageVariant>> = emptyMap()
+)
+
+/**
+ * Resolves exam images to the best resolution tier using images/index.json,
+ * written by scripts/extract_pdf_images.py. Paths are always the plain 1x
+ * asset path ("images/2022-march/q3.webp"); images missing from the index
+ * (or an app built without it) simply resolve to that path.
+ */
+object ImageTiers {
+
+    private const val INDEX_PATH = "images/index.json"
+    private const val IMAGES_DIR = "images/"
+
+    private val json = Json { ignoreUnknownKeys = true }
+
+    @Volatile
+    private var images: Map<String, Map<String, ImageVariant>>? = null
+
+    private fun load(context: Context): Map<String, Map<String, ImageVariant>> {
+        images?.let { return it }
+        val loaded = try {
+            val jsonString = context.assets.open(INDEX_PATH).bufferedReader().use { it.readText() }
+            json.decodeFromString<ImageIndexFile>(jsonString).images
+        } catch (e: IOException) {
+            emptyMap()
+        } catch (e: SerializationException) {
+            emptyMap()
+        }
+        images = loaded
+        return loaded
+    }
+
+    /**
+     * Asset path of the smallest variant at least [minWidthPx] wide, or of the
+     * widest variant if none is that wide.
+     */
+    fun variantFor(context: Context, assetPath: String, minWidthPx: Int): String {
+        val variants = load(context)[assetPath.removePrefix(IMAGES_DIR)]?.values
+        if (variants.isNullOrEmpty()) return assetPath
+        val byWidth = variants.sortedBy { it.width }
+        val pick = byWidth.firstOrNull { it.width >= minWidthPx } ?: byWidth.last()
+        return IMAGES_DIR + pick.file
+    }
+}
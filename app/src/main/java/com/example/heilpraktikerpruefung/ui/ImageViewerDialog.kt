@@ -16,10 +16,19 @@ import androidx.compose.ui.graphics.Color
 import androidx.compose.ui.graphics.asImageBitmap
 import androidx.compose.ui.graphics.graphicsLayer
 import androidx.compose.ui.input.pointer.pointerInput
+import androidx.compose.ui.platform.LocalConfiguration
 import androidx.compose.ui.platform.LocalContext
+import androidx.compose.ui.platform.LocalDensity
 import androidx.compose.ui.unit.dp
 import androidx.compose.ui.window.Dialog
 import androidx.compose.ui.window.DialogProperties
+import com.example.heilpraktikerpruefung.data.ImagePacks
+import com.example.heilpraktikerpruefung.data.ImageTiers
+
+// The viewer zooms, so load a variant this many times the screen width if
+// there is one (images/index.json lists the 1x tier, and 2x for builds made
+// with extract_pdf_images.py --tiers 1x,2x)
+private const val ZOOM_DETAIL = 2
 
 @Composable
 fun ImageViewerDialog(
@@ -28,13 +37,18 @@ fun ImageViewerDialog(
     onDismiss: () -> Unit
 ) {
     val context = LocalContext.current
-    val bitmap = remember(assetPath) {
-        try {
-            context.assets.open(assetPath).use { inputStream ->
-                BitmapFactory.decodeStream(inputStream)?.asImageBitmap()
+    val screenWidthPx = with(LocalDensity.current) {
+        LocalConfiguration.current.screenWidthDp.dp.roundToPx()
+    }
+    val bitmap = remember(assetPath, screenWidthPx) {
+        val sharpPath = ImageTiers.variantFor(context, assetPath, screenWidthPx * ZOOM_DETAIL)
+        listOf(sharpPath, assetPath).distinct().firstNotNullOfOrNull { path ->
+            try {
+                val bytes = ImagePacks.read(context, path)
+                BitmapFactory.decodeByteArray(bytes, 0, bytes.size)?.asImageBitmap()
+            } catch (e: Exception) {
+                null
             }
-        } catch (e: Exception) {
-            null
         }
     }
 
@@ -19,6 +19,7 @@ import androidx.compose.ui.text.font.FontWeight
 import androidx.compose.ui.unit.dp
 import androidx.compose.ui.unit.sp
 import com.example.heilpraktikerpruefung.data.ExamRepository
+import com.example.heilpraktikerpruefung.data.ImagePacks
 import com.example.heilpraktikerpruefung.data.Question
 import kotlinx.coroutines.launch
 
@@ -27,14 +28,6 @@ private data class AnsweredQuestion(
     val isCorrect: Boolean
 )
 
-private fun assetExists(context: android.content.Context, path: String): Boolean {
-    return try {
-        context.assets.open(path).use { true }
-    } catch (e: Exception) {
-        false
-    }
-}
-
 @OptIn(ExperimentalMaterial3Api::class)
 @Composable
 fun QuizScreen(examId: String, onFinished: (Int, Int) -> Unit) {
@@ -170,8 +163,8 @@ fun QuizScreen(examId: String, onFinished: (Int, Int) -> Unit) {
     val currentGruppe = questionGruppen.getOrNull(currentQuestionIndex) ?: "A"
     val questionImagePath = "images/$currentExamIdForImages/q${currentQuestion?.id}.webp"
     val answerImagePath = "images/$currentExamIdForImages/answer_key.webp"
-    val hasQuestionImage = remember(questionImagePath) { assetExists(context, questionImagePath) }
-    val hasAnswerImage = remember(answerImagePath) { assetExists(context, answerImagePath) }
+    val hasQuestionImage = remember(questionImagePath) { ImagePacks.exists(context, questionImagePath) }
+    val hasAnswerImage = remember(answerImagePath) { ImagePacks.exists(context, answerImagePath) }
 
     // When navigating to an answered question, show its saved state
     LaunchedEffect(currentQuestionIndex) {
@@ -0,0 +1,420 @@
+#!/usr/bin/env python3
+"""Benchmark the ingestion pipeline stages on the real fragen/ corpus.
+
+Each stage runs over every PDF in fragen/ (the input it needs is prepared
+outside the timed section) and is timed once per PDF and repetition:
+
+  get_pdf_text                fix_all.get_pdf_text, cold (empty text cache)
+  extract_questions_from_pdf  fix_all.extract_questions_from_pdf
+  find_option_blocks          extract_options.find_option_blocks
+  parse_solutions_from_pdf    answer_grid.parse_solutions_from_pdf
+                              (warm page-type map)
+  parse_pdf_modern            import_exams.parse_pdf_modern, questions and
+                              answer key of the PDFs with a key page
+  build_layout                pdf_layout.build_layout, uncached layout index
+                              of the text PDFs (warm word store)
+  extract_question_image      extract_pdf_images.extract_question_image,
+                              every question of the PDF (one PageCache)
+  verify_text_match           text_utils.verify_text_match, every text,
+                              option and statement of the matching exams
+
+Every stage runs in its own worker process so its memory can be reported.
+Per stage the report shows the median and p95 time per PDF, throughput in
+PDF pages per second and stage RSS: the peak RSS growth during the timed
+runs, measured from the RSS after setup (Linux resets the peak for this;
+elsewhere it is the growth of the process peak, which may miss a stage
+that stays below the setup peak). Results are written as JSON to
+.cache/benchmarks/latest.json.
+
+benchmarks/baseline.json is the tracked baseline that --compare reads. It
+records the commit, Python version and machine it was measured on; timings
+only compare on similar hardware, so after an intended change or on a new
+machine, re-measure with --save-baseline and commit the file.
+
+Usage: python3 benchmarks/bench_pipeline.py [--repeat N] [--stage NAME ...]
+                                            [--save-baseline] [--compare]
+                                            [--baseline PATH] [--threshold F]
+  --repeat N        time every PDF N times (default: 3)
+  --stage NAME      run only these stages
+  --save-baseline   also write the results to benchmarks/baseline.json
+  --compare         compare medians with the baseline; exit 1 if any stage
+                    got slower by more than --threshold (default: 0.25)
+                    and by at least 1 ms per PDF
+Run from project root.
+"""
+
+import argparse
+import json
+import math
+import os
+import platform
+import resource
+import shutil
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from concurrent.futures import ProcessPoolExecutor
+from multiprocessing import get_context
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "scripts"))
+
+FRAGEN_DIR = "fragen"
+RESULTS_DIR = ".cache/benchmarks"
+LATEST_PATH = os.path.join(RESULTS_DIR, "latest.json")
+BASELINE_PATH = "benchmarks/baseline.json"
+RESULTS_FORMAT = 1
+# Median slowdowns below this are timer noise, whatever the ratio
+MIN_REGRESSION_MS = 1.0
+
+
+def list_pdfs():
+    return [os.path.join(FRAGEN_DIR, f) for f in sorted(os.listdir(FRAGEN_DIR))
+            if f.endswith('.pdf')]
+
+
+def page_count(pdf_path):
+    import fitz
+    with fitz.open(pdf_path) as doc:
+        return doc.page_count
+
+
+# ===== STAGES =====
+# Each stage is (setup, run): setup(pdf_path, workdir) prepares the input
+# outside the timed section and returns (args, pages) or None to skip the
+# PDF; run(*args) is what gets timed.
+
+def setup_get_pdf_text(pdf_path, workdir):
+    import pdf_text
+    # Extract for real: point the cache at an empty directory
+    pdf_text.CACHE_DIR = os.path.join(workdir, "pdf_text")
+    return (pdf_path,), page_count(pdf_path)
+
+
+def run_get_pdf_text(pdf_path):
+    import fix_all
+    import pdf_text
+    pdf_text._pages_memo.clear()
+    shutil.rmtree(pdf_text.CACHE_DIR, ignore_errors=True)
+    fix_all.get_pdf_text(pdf_path)
+
+
+def setup_extract_questions(pdf_path, workdir):
+    import fix_all
+    return (fix_all.get_pdf_text(pdf_path),), page_count(pdf_path)
+
+
+def run_extract_questions(text):
+    import fix_all
+    import pdf_tokens
+    pdf_tokens._STREAM_CACHE.clear()
+    fix_all.extract_questions_from_pdf(text)
+
+
+def setup_find_option_blocks(pdf_path, workdir):
+    import extract_options
+    text = extract_options.clean_text(extract_options.extract_text_from_pdf(pdf_path))
+    return (text,), page_count(pdf_path)
+
+
+def run_find_option_blocks(text):
+    import extract_options
+    extract_options.find_option_blocks(text)
+
+
+def setup_solutions_from_pdf(pdf_path, workdir):
+    import answer_grid
+    if not answer_grid.answer_key_pages(pdf_path):
+        return None
+    return (pdf_path,), page_count(pdf_path)
+
+
+def run_solutions_from_pdf(pdf_path):
+    import answer_grid
+    answer_grid.parse_solutions_from_pdf(pdf_path)
+
+
+def setup_parse_pdf_modern(pdf_path, workdir):
+    import answer_grid
+    import page_types
+    if page_types.is_scanned(pdf_path) or not answer_grid.answer_key_pages(pdf_path):
+        return None
+    return (pdf_path,), page_count(pdf_path)
+
+
+def run_parse_pdf_modern(pdf_path):
+    import import_exams
+    import_exams.parse_pdf_modern(pdf_path)
+
+
+def setup_build_layout(pdf_path, workdir):
+    import page_types
+    import word_store
+    if page_types.is_scanned(pdf_path):
+        return None
+    word_store.get_store(pdf_path)
+    return (pdf_path,), page_count(pdf_path)
+
+
+def run_build_layout(pdf_path):
+    import pdf_layout
+    pdf_layout.build_layout(pdf_path)
+
+
+def setup_question_images(pdf_path, workdir):
+    import fitz
+    import extract_pdf_images as epi
+    import page_types
+    from pdf_text import find_gruppe_b_page, iter_pages
+    if page_types.is_scanned(pdf_path):
+        return None
+    doc = fitz.open(pdf_path)
+    end = doc.page_count
+    answer_page, _ = epi.find_answer_key_page(doc)
+    gruppe_b_page = find_gruppe_b_page(iter_pages(pdf_path))
+    for page in (answer_page, gruppe_b_page):
+        if page is not None:
+            end = min(end, page)
+    questions = epi.find_questions_on_pages(doc, end)
+    if not questions:
+        return None
+    output_dir = os.path.join(workdir, os.path.basename(pdf_path)[:-4])
+    return (doc, questions, output_dir), end
+
+
+def run_question_images(doc, questions, output_dir):
+    import extract_pdf_images as epi
+    cache = epi.PageCache(doc)
+    for qnum in sorted(questions):
+        epi.extract_question_image(doc, questions, qnum,
+                                   os.path.join(output_dir, f"q{qnum}.webp"), cache)
+
+
+_exams_by_pdf = None
+
+
+def setup_verify(pdf_path, workdir):
+    global _exams_by_pdf
+    from corpus import load_corpus
+    from pdf_text import get_normalized_text
+    from pdf_catalog import pdf_for_exam
+    if _exams_by_pdf is None:
+        _exams_by_pdf = {}
+        for exam in load_corpus():
+            path = pdf_for_exam(exam['id'])
+            if path:
+                _exams_by_pdf.setdefault(path, []).append(exam)
+    fields = []
+    for exam in _exams_by_pdf.get(pdf_path, []):
+        for q in exam['questions']:
+            fields.append(q.get('text', ''))
+            fields.extend(q.get('options', []))
+            fields.extend(q.get('statements', []))
+    text = get_normalized_text(pdf_path, "fitz")
+    if not fields or not text:
+        return None
+    return (fields, text), page_count(pdf_path)
+
+
+def run_verify(fields, text):
+    import text_utils
+    text_utils._INDEX_CACHE.clear()  # include building the index
+    for field in fields:
+        text_utils.verify_text_match(field, text)
+
+
+# (name, setup, run, required executable or None)
+STAGES = [
+    ('get_pdf_text', setup_get_pdf_text, run_get_pdf_text, None),
+    ('extract_questions_from_pdf', setup_extract_questions, run_extract_questions, None),
+    ('find_option_blocks', setup_find_option_blocks, run_find_option_blocks, None),
+    ('parse_solutions_from_pdf', setup_solutions_from_pdf, run_solutions_from_pdf, None),
+    ('parse_pdf_modern', setup_parse_pdf_modern, run_parse_pdf_modern, None),
+    ('build_layout', setup_build_layout, run_build_layout, None),
+    ('extract_question_image', setup_question_images, run_question_images, None),
+    ('verify_text_match', setup_verify, run_verify, None),
+]
+
+
+# ===== MEASUREMENT =====
+def percentile(values, pct):
+    """Nearest-rank percentile of a non-empty list."""
+    ordered = sorted(values)
+    return ordered[max(0, math.ceil(pct / 100 * len(ordered)) - 1)]
+
+
+def _rss_mb(field):
+    """VmRSS or VmHWM (peak) of this process from /proc, in MB."""
+    with open("/proc/self/status") as f:
+        for line in f:
+            if line.startswith(field + ":"):
+                return int(line.split()[1]) / 1024
+    raise OSError(f"no {field} in /proc/self/status")
+
+
+def _maxrss_mb():
+    # ru_maxrss is in KiB on Linux and in bytes on macOS
+    rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return rss / (1 << 20) if sys.platform == 'darwin' else rss / 1024
+
+
+def start_rss():
+    """Reset the peak RSS where possible; return the RSS to measure from."""
+    try:
+        # Writing 5 resets VmHWM to the current RSS (Linux)
+        with open("/proc/self/clear_refs", 'w') as f:
+            f.write("5")
+        return _rss_mb("VmRSS")
+    except OSError:
+        return _maxrss_mb()
+
+
+def stage_rss(start):
+    """Peak RSS growth since start_rss()."""
+    try:
+        peak = _rss_mb("VmHWM")
+    except OSError:
+        peak = _maxrss_mb()
+    return max(0.0, peak - start)
+
+
+def run_stage(name, repeat):
+    """Benchmark one stage over all PDFs (runs in a fresh worker process)."""
+    setup, run, tool = next((s, r, t) for n, s, r, t in STAGES if n == name)
+    if tool and not shutil.which(tool):
+        return {'skipped': f"{tool} not found"}
+
+    with tempfile.TemporaryDirectory(prefix=f"bench-{name}-") as workdir:
+        prepared = []
+        for pdf_path in list_pdfs():
+            result = setup(pdf_path, workdir)
+            if result is not None:
+                prepared.append(result)
+        if not prepared:
+            return {'skipped': "no input"}
+
+        # Only the timed runs count: the setup above loads every PDF
+        rss_start = start_rss()
+        samples = []
+        for _ in range(repeat):
+            for args, _pages in prepared:
+                start = time.perf_counter()
+                run(*args)
+                samples.append(time.perf_counter() - start)
+        rss_mb = stage_rss(rss_start)
+
+    pages = sum(p for _, p in prepared) * repeat
+    total = sum(samples)
+    return {
+        'pdfs': len(prepared),
+        'samples': len(samples),
+        'median_ms': round(statistics.median(samples) * 1000, 3),
+        'p95_ms': round(percentile(samples, 95) * 1000, 3),
+        'total_s': round(total / repeat, 4),
+        'pages_per_s': round(pages / total, 1) if total else None,
+        'stage_rss_mb': round(rss_mb, 1),
+    }
+
+
+def git_commit():
+    try:
+        result = subprocess.run(['git', 'rev-parse', '--short', 'HEAD'],
+                                capture_output=True, text=True)
+    except OSError:
+        return None
+    return result.stdout.strip() or None
+
+
+def print_results(stages):
+    print(f"\n{'Stage':<28} {'PDFs':>5} {'Median':>10} {'p95':>10} {'Pages/s':>9} {'Stage RSS':>10}")
+    print("-" * 77)
+    for name, r in stages.items():
+        if 'skipped' in r:
+            print(f"{name:<28} skipped ({r['skipped']})")
+            continue
+        print(f"{name:<28} {r['pdfs']:>5} {r['median_ms']:>8.2f}ms {r['p95_ms']:>8.2f}ms "
+              f"{r['pages_per_s']:>9} {r['stage_rss_mb']:>8.1f}MB")
+
+
+def compare(stages, baseline, threshold):
+    """Print median changes against the baseline; return the regressed stages."""
+    print(f"\nCompared with baseline ({baseline.get('git_commit') or 'unknown commit'}, "
+          f"{baseline.get('created')}):")
+    regressed = []
+    for name, r in stages.items():
+        base = baseline.get('stages', {}).get(name)
+        if 'skipped' in r or not base or 'skipped' in base:
+            continue
+        change = r['median_ms'] / base['median_ms'] - 1 if base['median_ms'] else 0.0
+        flag = ""
+        if change > threshold and r['median_ms'] - base['median_ms'] >= MIN_REGRESSION_MS:
+            flag = "  REGRESSION"
+            regressed.append(name)
+        print(f"  {name:<28} {base['median_ms']:>8.2f}ms -> {r['median_ms']:>8.2f}ms "
+              f"({change:+.0%}){flag}")
+    return regressed
+
+
+def write_json(path, data):
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    with open(path, 'w', encoding='utf-8') as f:
+        json.dump(data, f, indent=2)
+    print(f"Wrote {path}")
+
+
+def main():
+    names = [name for name, *_ in STAGES]
+    parser = argparse.ArgumentParser(description="Benchmark the ingestion pipeline stages.")
+    parser.add_argument('--repeat', type=int, default=3, help="timed runs per PDF (default: 3)")
+    parser.add_argument('--stage', nargs='+', choices=names, metavar='NAME',
+                        help=f"run only these stages ({', '.join(names)})")
+    parser.add_argument('--save-baseline', action='store_true',
+                        help="also write the results as the new baseline")
+    parser.add_argument('--compare', action='store_true',
+                        help="compare medians with the baseline, exit 1 on regressions")
+    parser.add_argument('--baseline', default=BASELINE_PATH,
+                        help=f"baseline file (default: {BASELINE_PATH})")
+    parser.add_argument('--threshold', type=float, default=0.25,
+                        help="allowed median slowdown for --compare (default: 0.25)")
+    args = parser.parse_args()
+
+    stages = {}
+    for name in args.stage or names:
+        print(f"Running {name}...")
+        # A fresh process per stage keeps peak RSS and caches separate
+        with ProcessPoolExecutor(max_workers=1, mp_context=get_context('spawn')) as pool:
+            stages[name] = pool.submit(run_stage, name, args.repeat).result()
+
+    results = {
+        'format': RESULTS_FORMAT,
+        'created': time.strftime('%Y-%m-%dT%H:%M:%S'),
+        'git_commit': git_commit(),
+        'python': platform.python_version(),
+        'machine': platform.machine(),
+        'repeat': args.repeat,
+        'stages': stages,
+    }
+    print_results(stages)
+    print()
+    write_json(LATEST_PATH, results)
+    if args.save_baseline:
+        write_json(args.baseline, results)
+
+    if args.compare:
+        try:
+            with open(args.baseline, 'r', encoding='utf-8') as f:
+                baseline = json.load(f)
+        except OSError:
+            print(f"No baseline at {args.baseline}; run with --save-baseline first")
+            sys.exit(1)
+        regressed = compare(stages, baseline, args.threshold)
+        if regressed:
+            print(f"\n{len(regressed)} stage(s) slower than the baseline by more "
+                  f"than {args.threshold:.0%}: {', '.join(regressed)}")
+            sys.exit(1)
+        print("\nNo regressions")
+
+
+if __name__ == '__main__':
+    main()
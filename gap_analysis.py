@@ -1,29 +1,14 @@
-import json
 import os
 import subprocess
 import re
+import sys
 
-# CONFIG
-EXAMS_JSON_PATH = "app/src/main/assets/exams.json"
-PDF_DIR = "fragen"
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "scripts"))
+from corpus import EXAMS_JSON, load_corpus
+from pdf_catalog import pdf_for_exam
 
-def get_pdf_filename(exam_id):
-    year, month = exam_id.split('-')
-    month_german = "Maerz" if month == "march" else "Oktober"
-    
-    # Pattern matching for filenames
-    patterns = [
-        f"HPP_Pruefung_{month_german}_{year}",
-        f"{month_german}-{year}",
-        f"Oktober-{year}" if month == "october" else f"Maerz-{year}"
-    ]
-    
-    for f in os.listdir(PDF_DIR):
-        if not f.endswith(".pdf"): continue
-        for p in patterns:
-            if f.startswith(p):
-                return os.path.join(PDF_DIR, f)
-    return None
+# CONFIG
+EXAMS_JSON_PATH = EXAMS_JSON
 
 def estimate_pdf_question_count(pdf_path):
     try:
@@ -73,8 +58,7 @@ def main():
         print(f"Error: {EXAMS_JSON_PATH} not found.")
         return
 
-    with open(EXAMS_JSON_PATH, 'r') as f:
-        exams = json.load(f)
+    exams = load_corpus(EXAMS_JSON_PATH).exams
 
     # Sort exams by Year/Month
     exams.sort(key=lambda x: (x.get('year'), x.get('month')))
@@ -89,7 +73,7 @@ def main():
         questions = exam.get('questions', [])
         app_count = len(questions)
         
-        pdf_path = get_pdf_filename(exam_id)
+        pdf_path = pdf_for_exam(exam_id)
         pdf_est = 0
         if pdf_path:
             pdf_est = estimate_pdf_question_count(pdf_path)
@@ -1,19 +1,17 @@
-import json
 import os
 import re
-from pypdf import PdfReader
+import sys
 
-JSON_PATH = "app/src/main/assets/exams.json"
-PDF_DIR = "fragen/"
-REPORT_PATH = "verification_report.txt"
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "scripts"))
+from corpus import EXAMS_JSON, load_corpus
+from page_types import is_scanned
+from pdf_catalog import pdf_for_exam
+from pdf_text import get_page_texts
 
-MONTH_MAP = {
-    "March": "Maerz",
-    "October": "Oktober"
-}
+JSON_PATH = EXAMS_JSON
+REPORT_PATH = "verification_report.txt"
 
 # Known limitations that cannot be fixed
-KNOWN_SCANNED = {"2007-october", "2014-october"}  # Fully scanned PDFs
 KNOWN_ANSWER_KEY_ONLY = {"2008-march", "2009-march"}  # Only answer key extractable
 KNOWN_EMPTY = {"2009-october", "2010-march"}  # No questions in JSON (no source)
 KNOWN_TEXT_MISMATCHES = {
@@ -40,27 +38,11 @@ def normalize_text_nospace(text):
 
 def extract_text_from_pdf(pdf_path):
     try:
-        reader = PdfReader(pdf_path)
-        text = ""
-        for page in reader.pages:
-            extracted = page.extract_text()
-            if extracted:
-                text += extracted + " "
-        return text
+        return "".join(page + " " for page in get_page_texts(pdf_path, "pypdf") if page)
     except Exception:
         return ""
 
 
-def find_pdf_file(year, month_en):
-    month_de = MONTH_MAP.get(month_en, month_en)
-    files = os.listdir(PDF_DIR)
-    candidates = []
-    for f in files:
-        if str(year) in f and month_de in f and f.lower().endswith(".pdf"):
-            candidates.append(os.path.join(PDF_DIR, f))
-    return candidates
-
-
 def check_match(needle, haystack_norm, haystack_nospace):
     if not needle.strip():
         return True
@@ -87,8 +69,7 @@ def verify():
         return
 
     try:
-        with open(JSON_PATH, 'r', encoding='utf-8') as f:
-            exams = json.load(f)
+        exams = load_corpus(JSON_PATH).exams
     except Exception as e:
         print(f"Error loading JSON: {e}")
         return
@@ -127,17 +108,16 @@ def verify():
                 continue
 
             # Find PDF
-            pdf_files = find_pdf_file(year, month)
-            if not pdf_files:
+            pdf_path = pdf_for_exam(exam_id)
+            if not pdf_path:
                 unverifiable.append(f"  {label:20s} No PDF found")
                 continue
 
-            pdf_path = pdf_files[0]
             raw_pdf_text = extract_text_from_pdf(pdf_path)
 
             # Scanned/answer-key-only PDFs
             if len(raw_pdf_text) < 500:
-                reason = "scanned PDF" if exam_id in KNOWN_SCANNED else "answer-key-only PDF"
+                reason = "scanned PDF" if is_scanned(pdf_path) else "answer-key-only PDF"
                 unverifiable.append(f"  {label:20s} {len(questions):2d} questions ({reason})")
                 continue
 
@@ -0,0 +1,231 @@
+#!/usr/bin/env python3
+"""Decode the answer key grid of an exam PDF from fitz word boxes.
+
+The key page is a grid: a row of question numbers, then one row per option
+letter A-E, with the correct letters set in a different style (black
+instead of light gray, or a different font). import_exams used to read
+this from pdftohtml output. It regex-parsed CSS positions, grouped rows
+pairwise and matched letters to columns with a fixed 20px distance.
+
+decode_answer_grid() works on the page's word boxes directly, in NumPy:
+  - rows are 1-D clusters of the box centres (split at gaps larger than
+    half the median box height)
+  - header rows are rows with at least MIN_HEADER_NUMBERS numbers
+  - every letter is assigned to the nearest number column of the header
+    above it in one broadcast step, within half the column spacing
+  - the correct letters are those in the darkest colour, or in the least
+    common font if all letters share one colour (see correct_mask)
+
+Key pages may hold a "Gruppe A" and a "Gruppe B" grid; only the grid of
+the group the questions belong to is decoded (parse_solutions_from_pdf
+reads it from the title page).
+
+Usage: python3 scripts/answer_grid.py [PDF ...]
+Prints the decoded key of the given PDFs (default: all of fragen/).
+Run from project root.
+"""
+
+import os
+import re
+import sys
+
+import numpy as np
+
+import page_types
+
+FRAGEN_DIR = "fragen"
+LETTERS = "ABCDE"
+MIN_HEADER_NUMBERS = 5
+MIN_STYLE_COUNT = 10
+GRUPPE_RE = re.compile(r'Gruppe\s*([AB])\b')
+GROUP_HEADER_LINES = 5  # the title page names the group in its first lines
+
+
+def word_boxes(page, page_dict=None):
+    """Words of a page as (x0, y0, x1, y1, text, style), style = (font, colour).
+
+    Built from the characters of get_text("rawdict") so that spans holding
+    several words ("10 11 12 13 14") are split, and a word is also split
+    where the style changes. Pass page_dict to reuse an existing rawdict.
+    """
+    if page_dict is None:
+        page_dict = page.get_text("rawdict")
+    words = []
+    for block in page_dict['blocks']:
+        for line in block.get('lines', []):
+            for span in line['spans']:
+                style = (span['font'], span['color'])
+                chars = []
+                for char in span['chars'] + [None]:
+                    if char is not None and not char['c'].isspace():
+                        chars.append(char)
+                        continue
+                    if chars:
+                        x0 = min(c['bbox'][0] for c in chars)
+                        y0 = min(c['bbox'][1] for c in chars)
+                        x1 = max(c['bbox'][2] for c in chars)
+                        y1 = max(c['bbox'][3] for c in chars)
+                        words.append((x0, y0, x1, y1, "".join(c['c'] for c in chars), style))
+                        chars = []
+    return words
+
+
+def cluster_1d(values, gap):
+    """Cluster labels for values: a new cluster starts where sorted values jump by > gap."""
+    order = np.argsort(values, kind='stable')
+    starts = np.concatenate(([0], np.diff(values[order]) > gap)).astype(int)
+    labels = np.empty(len(values), dtype=int)
+    labels[order] = np.cumsum(starts)
+    return labels
+
+
+def luminance(color):
+    """Relative luminance (0-255) of an sRGB integer colour."""
+    r, g, b = (color >> 16) & 255, (color >> 8) & 255, color & 255
+    return 0.299 * r + 0.587 * g + 0.114 * b
+
+
+def correct_mask(styles):
+    """Which letters are set in the "correct" style.
+
+    Letters in two or more colours: the darkest colour is correct (black
+    on light gray). Otherwise the least common font is. Styles seen
+    MIN_STYLE_COUNT times or fewer are noise and ignored if there are
+    others.
+    """
+    for part, pick in ((1, lambda counts: min(counts, key=luminance)),
+                       (0, lambda counts: min(counts, key=counts.get))):
+        counts = {}
+        for style in styles:
+            counts[style[part]] = counts.get(style[part], 0) + 1
+        valid = {k: n for k, n in counts.items() if n > MIN_STYLE_COUNT} or counts
+        if len(valid) >= 2:
+            correct = pick(valid)
+            return np.array([style[part] == correct for style in styles], dtype=bool)
+    return None
+
+
+def decode_answer_grid(words, group='A'):
+    """{question: [letters]} from the word boxes of an answer key page.
+
+    group picks the grid under a "Gruppe A" / "Gruppe B" heading; grids
+    without a heading are always used.
+    """
+    if not words:
+        return {}
+    texts = np.array([w[4] for w in words])
+    boxes = np.array([w[:4] for w in words], dtype=float)
+    x = (boxes[:, 0] + boxes[:, 2]) / 2
+    y = (boxes[:, 1] + boxes[:, 3]) / 2
+    heights = boxes[:, 3] - boxes[:, 1]
+    rows = cluster_1d(y, np.median(heights) / 2)
+    row_y = np.array([y[rows == r].mean() for r in range(rows.max() + 1)])
+
+    is_number = np.char.isdigit(texts)
+    is_letter = np.isin(texts, list(LETTERS))
+    numbers_per_row = np.bincount(rows[is_number], minlength=len(row_y))
+    header_rows = np.flatnonzero(numbers_per_row >= MIN_HEADER_NUMBERS)
+    header_rows = header_rows[np.argsort(row_y[header_rows])]
+    if not len(header_rows):
+        return {}
+
+    # Group of every header row: the nearest "Gruppe X" heading above it
+    headings = []  # (y, group)
+    for r in range(len(row_y)):
+        line = " ".join(texts[rows == r][np.argsort(x[rows == r])])
+        m = GRUPPE_RE.search(line)
+        if m and numbers_per_row[r] < MIN_HEADER_NUMBERS:
+            headings.append((row_y[r], m.group(1)))
+    headings.sort()
+    header_groups = []
+    for hy in row_y[header_rows]:
+        above = [g for gy, g in headings if gy < hy]
+        header_groups.append(above[-1] if above else None)
+
+    # Letters on rows of nothing but letters ("Gruppe B" is a heading, not an
+    # answer), each belonging to the header row above it
+    letter_rows = (np.bincount(rows[is_letter], minlength=len(row_y)) ==
+                   np.bincount(rows, minlength=len(row_y)))
+    letter_idx = np.flatnonzero(is_letter & letter_rows[rows] & (y > row_y[header_rows[0]]))
+    block = np.searchsorted(row_y[header_rows], y[letter_idx]) - 1
+    wanted = np.array([g in (group, None) for g in header_groups])
+    keep = wanted[block]
+    letter_idx, block = letter_idx[keep], block[keep]
+    if not len(letter_idx):
+        return {}
+    is_correct = correct_mask([words[i][5] for i in letter_idx])
+    if is_correct is None:
+        return {}  # a single style: nothing marks the correct answers
+
+    solutions = {}
+    for b in np.flatnonzero(wanted):
+        in_header = np.flatnonzero((rows == header_rows[b]) & is_number)
+        in_header = in_header[np.argsort(x[in_header])]
+        centers = x[in_header]
+        questions = texts[in_header].astype(int)
+        tolerance = np.median(np.diff(centers)) / 2 if len(centers) > 1 else np.inf
+        members = letter_idx[(block == b) & is_correct]
+        if not len(members):
+            continue
+        dist = np.abs(x[members, None] - centers[None, :])
+        nearest = dist.argmin(axis=1)
+        ok = dist[np.arange(len(members)), nearest] < tolerance
+        # Row order gives A..E per question
+        for i in np.argsort(y[members], kind='stable'):
+            if ok[i]:
+                letters = solutions.setdefault(int(questions[nearest[i]]), [])
+                letter = str(texts[members[i]])
+                if letter not in letters:
+                    letters.append(letter)
+    return solutions
+
+
+def answer_key_pages(pdf_path):
+    """Indices of the answer key pages of a PDF (page_types.is_answer_key_text)."""
+    return page_types.pages_of_type(pdf_path, page_types.ANSWER_KEY)
+
+
+def text_group(text):
+    """'A' or 'B': the group named in the first lines of a page text (default 'A')."""
+    for line in text.strip().split('\n')[:GROUP_HEADER_LINES]:
+        m = GRUPPE_RE.search(line)
+        if m:
+            return m.group(1)
+    return 'A'
+
+
+def question_group(doc):
+    """'A' or 'B': the group named at the top of the first page (default 'A')."""
+    if not doc.page_count:
+        return 'A'
+    return text_group(doc[0].get_text())
+
+
+def parse_solutions_from_pdf(pdf_path, group=None):
+    """{question: [letters]} from the first answer key grid of the exam's group.
+
+    group defaults to the group of the question pages (question_group).
+    """
+    import fitz
+    with fitz.open(pdf_path) as doc:
+        group = group or question_group(doc)
+        for page_idx in answer_key_pages(pdf_path):
+            solutions = decode_answer_grid(word_boxes(doc[page_idx]), group)
+            if solutions:
+                return solutions
+    return {}
+
+
+def main():
+    pdfs = sys.argv[1:]
+    if not pdfs:
+        pdfs = [os.path.join(FRAGEN_DIR, f) for f in sorted(os.listdir(FRAGEN_DIR))
+                if f.endswith('.pdf')]
+    for pdf_path in pdfs:
+        solutions = parse_solutions_from_pdf(pdf_path)
+        key = " ".join(f"{q}:{''.join(letters)}" for q, letters in sorted(solutions.items()))
+        print(f"  {os.path.basename(pdf_path):<55} {len(solutions):>3} {key}")
+
+
+if __name__ == '__main__':
+    main()
@@ -4,16 +4,14 @@ Comprehensive quality audit of exams.json.
 Checks all questions for every possible error, grouped by category.
 """
 
-import json
 import re
 import sys
 from collections import defaultdict
 
-EXAMS_PATH = "app/src/main/assets/exams.json"
+from corpus import load_corpus
 
 def load_exams():
-    with open(EXAMS_PATH, "r", encoding="utf-8") as f:
-        return json.load(f)
+    return load_corpus().exams
 
 def audit():
     exams = load_exams()
@@ -0,0 +1,311 @@
+#!/usr/bin/env python3
+"""Shared load/save layer for exams.json.
+
+All fix, verify and audit scripts go through this module instead of their
+own json.load()/json.dump():
+
+    corpus = load_corpus()
+    q = corpus.question('2022-march', 14)   # O(1) lookup
+    q['options'] = [...]                    # dict-style access keeps working
+    corpus.save()                           # atomic, and only if data changed
+
+Exam and Question are __slots__ classes. They also support the dict-style
+access (q['text'], q.get('options', [])) the scripts were written against,
+and remember their JSON key order so an unchanged corpus serializes
+byte-identically. Plain dicts appended to exam['questions'] are accepted and
+converted on the next lookup.
+
+Dirty tracking works on content, not on setters: every exam is fingerprinted
+at load time, so in-place edits such as q['options'].append(...) are seen too.
+"""
+
+import hashlib
+import json
+import os
+
+EXAMS_JSON = "app/src/main/assets/exams.json"
+
+
+class _Record:
+    """Dict-style access to the slots of Exam/Question via their JSON keys."""
+
+    __slots__ = ()
+    KEYS = {}           # JSON key -> attribute name
+    DEFAULT_ORDER = ()  # JSON key order for newly created records
+
+    def __getitem__(self, key):
+        attr = self.KEYS.get(key)
+        if attr is None:
+            return self._extra[key]
+        try:
+            return getattr(self, attr)
+        except AttributeError:
+            raise KeyError(key) from None
+
+    def __setitem__(self, key, value):
+        attr = self.KEYS.get(key)
+        if attr is None:
+            self._extra[key] = value
+        else:
+            setattr(self, attr, value)
+        if key not in self._keys:
+            self._keys.append(key)
+
+    def __contains__(self, key):
+        try:
+            self[key]
+        except KeyError:
+            return False
+        return True
+
+    def get(self, key, default=None):
+        try:
+            return self[key]
+        except KeyError:
+            return default
+
+    def keys(self):
+        return [k for k in self._keys if k in self]
+
+    def to_dict(self):
+        """Plain dict in the original JSON key order."""
+        return {k: self._json_value(k) for k in self.keys()}
+
+    def _json_value(self, key):
+        return self[key]
+
+    @classmethod
+    def from_dict(cls, data):
+        obj = cls.__new__(cls)
+        obj._keys = []
+        obj._extra = {}
+        for key, value in data.items():
+            obj[key] = value
+        return obj
+
+
+class Question(_Record):
+    """One exam question."""
+
+    __slots__ = ('id', 'type', 'text', 'options', 'statements',
+                 'correct_indices', 'explanation', '_keys', '_extra')
+    KEYS = {
+        'id': 'id', 'type': 'type', 'text': 'text', 'options': 'options',
+        'statements': 'statements', 'correctIndices': 'correct_indices',
+        'explanation': 'explanation',
+    }
+    DEFAULT_ORDER = ('id', 'type', 'text', 'options', 'statements',
+                     'correctIndices', 'explanation')
+
+    def __init__(self, id, type, text='', options=None, statements=None,
+                 correct_indices=None, explanation=''):
+        self._keys = list(self.DEFAULT_ORDER)
+        self._extra = {}
+        self.id = id
+        self.type = type
+        self.text = text
+        self.options = options if options is not None else []
+        self.statements = statements if statements is not None else []
+        self.correct_indices = correct_indices if correct_indices is not None else []
+        self.explanation = explanation
+
+    def __repr__(self):
+        return f"Question({self.get('id')!r}, {self.get('type')!r})"
+
+
+def as_question(obj):
+    """Return obj as a Question (plain dicts are converted)."""
+    return obj if isinstance(obj, Question) else Question.from_dict(obj)
+
+
+class Exam(_Record):
+    """One exam: metadata plus its question list."""
+
+    __slots__ = ('id', 'year', 'month', '_questions', 'gruppe',
+                 '_keys', '_extra', '_index')
+    KEYS = {'id': 'id', 'year': 'year', 'month': 'month',
+            'questions': 'questions', 'gruppe': 'gruppe'}
+    DEFAULT_ORDER = ('id', 'year', 'month', 'questions', 'gruppe')
+
+    def __init__(self, id, year, month, questions=None, gruppe='A'):
+        self._keys = list(self.DEFAULT_ORDER)
+        self._extra = {}
+        self._index = None
+        self.id = id
+        self.year = year
+        self.month = month
+        self.questions = questions if questions is not None else []
+        self.gruppe = gruppe
+
+    @property
+    def questions(self):
+        return self._questions
+
+    @questions.setter
+    def questions(self, value):
+        self._questions = [as_question(q) for q in value]
+        self._index = None
+
+    @classmethod
+    def from_dict(cls, data):
+        obj = cls.__new__(cls)
+        obj._index = None
+        obj._keys = []
+        obj._extra = {}
+        for key, value in data.items():
+            obj[key] = value
+        return obj
+
+    def _json_value(self, key):
+        if key == 'questions':
+            return [q.to_dict() if isinstance(q, Question) else q
+                    for q in self._questions]
+        return self[key]
+
+    def _reindex(self):
+        qs = self._questions
+        index = {}
+        for pos, q in enumerate(qs):
+            if not isinstance(q, Question):
+                qs[pos] = q = as_question(q)
+            index.setdefault(q.get('id'), pos)
+        self._index = index
+
+    def question(self, qid):
+        """The first question with this id, or None. O(1) amortized."""
+        qs = self._questions
+        if self._index is not None:
+            pos = self._index.get(qid)
+            if pos is not None and pos < len(qs):
+                q = qs[pos]
+                if isinstance(q, Question) and q.get('id') == qid:
+                    return q
+        # Unknown id or stale index (questions added, removed or reordered)
+        self._reindex()
+        pos = self._index.get(qid)
+        return qs[pos] if pos is not None else None
+
+    def __repr__(self):
+        return f"Exam({self.get('id')!r}, {len(self._questions)} questions)"
+
+
+def _fingerprint(obj):
+    return hashlib.sha1(json.dumps(obj, ensure_ascii=False).encode('utf-8')).digest()
+
+
+class Corpus:
+    """All exams of exams.json with O(1) lookups and change tracking."""
+
+    def __init__(self, exams, path=EXAMS_JSON, original_sha=None):
+        self.exams = [e if isinstance(e, Exam) else Exam.from_dict(e) for e in exams]
+        self.path = path
+        self._original_sha = original_sha
+        self._index = None
+        self._fingerprints = self._exam_fingerprints()
+
+    def __iter__(self):
+        return iter(self.exams)
+
+    def __len__(self):
+        return len(self.exams)
+
+    def _exam_fingerprints(self):
+        groups = {}
+        for exam in self.exams:
+            groups.setdefault(exam.get('id'), []).append(exam.to_dict())
+        return {eid: _fingerprint(dicts) for eid, dicts in groups.items()}
+
+    def exam(self, exam_id):
+        """The first exam with this id, or None. O(1) amortized."""
+        if self._index is not None:
+            pos = self._index.get(exam_id)
+            if (pos is not None and pos < len(self.exams)
+                    and self.exams[pos].get('id') == exam_id):
+                return self.exams[pos]
+        # Rebuild in place: scripts hold on to corpus.exams and mutate it
+        self._index = {}
+        for pos, exam in enumerate(self.exams):
+            if not isinstance(exam, Exam):
+                self.exams[pos] = exam = Exam.from_dict(exam)
+            self._index.setdefault(exam.get('id'), pos)
+        pos = self._index.get(exam_id)
+        return self.exams[pos] if pos is not None else None
+
+    def question(self, exam_id, qid):
+        """Question qid of exam exam_id, or None."""
+        exam = self.exam(exam_id)
+        return exam.question(qid) if exam is not None else None
+
+    def changed_exam_ids(self):
+        """Ids of exams added, removed or modified since load (or last save)."""
+        current = self._exam_fingerprints()
+        ids = set(current) | set(self._fingerprints)
+        return sorted(eid for eid in ids
+                      if current.get(eid) != self._fingerprints.get(eid))
+
+    def is_dirty(self):
+        return bool(self.changed_exam_ids())
+
+    def snapshot(self):
+        """{(exam_id, question_id): fingerprint} for every question.
+
+        (exam_id, None) holds the exam's own fields. Compare two snapshots
+        with diff_snapshots() to count what a piece of code changed.
+        """
+        snap = {}
+        for exam in self.exams:
+            if not isinstance(exam, Exam):
+                exam = Exam.from_dict(exam)
+            eid = exam.get('id')
+            meta = {k: exam[k] for k in exam.keys() if k != 'questions'}
+            snap.setdefault((eid, None), _fingerprint(meta))
+            for q in exam.get('questions', []):
+                d = q.to_dict() if isinstance(q, Question) else q
+                snap.setdefault((eid, d.get('id')), _fingerprint(d))
+        return snap
+
+    def to_list(self):
+        return [e.to_dict() if isinstance(e, Exam) else e for e in self.exams]
+
+    def to_json(self):
+        return json.dumps(self.to_list(), ensure_ascii=False, indent=2)
+
+    def save(self, path=None):
+        """Write the corpus atomically if its content changed.
+
+        Returns True if the file was written.
+        """
+        path = path or self.path
+        text = self.to_json()
+        data = text.encode('utf-8')
+        sha = hashlib.sha256(data).hexdigest()
+        if path == self.path and sha == self._original_sha:
+            return False
+
+        directory = os.path.dirname(os.path.abspath(path))
+        tmp = os.path.join(directory, f".{os.path.basename(path)}.{os.getpid()}.tmp")
+        with open(tmp, 'wb') as f:
+            f.write(data)
+        os.replace(tmp, path)
+
+        if path == self.path:
+            self._original_sha = sha
+            self._fingerprints = self._exam_fingerprints()
+        return True
+
+
+def diff_snapshots(before, after):
+    """Return (changed, added, removed) question counts between two snapshots."""
+    changed = sum(1 for k in before.keys() & after.keys()
+                  if k[1] is not None and before[k] != after[k])
+    added = sum(1 for k in after.keys() - before.keys() if k[1] is not None)
+    removed = sum(1 for k in before.keys() - after.keys() if k[1] is not None)
+    return changed, added, removed
+
+
+def load_corpus(path=EXAMS_JSON):
+    """Load exams.json into a Corpus."""
+    with open(path, 'rb') as f:
+        data = f.read()
+    exams = json.loads(data.decode('utf-8'))
+    return Corpus(exams, path, hashlib.sha256(data).hexdigest())
@@ -6,23 +6,25 @@ Two operations:
 2. Strip A)/B)/C)/D)/E) or A./B./C./D./E. prefixes from existing options
 """
 
-import json
 import re
-import fitz  # PyMuPDF
-import os
 
-FRAGEN_DIR = "fragen"
-EXAMS_JSON = "app/src/main/assets/exams.json"
+from corpus import load_corpus
+from pdf_catalog import pdf_for_exam
+from pdf_text import get_text
+from pdf_tokens import option_sequences
+
+
+# Cleanup of extracted option text
+NEXT_QUESTION_RE = re.compile(r'\n\s*\n\s*\d{1,2}\s')
+DOUBLE_BLANK_LINE_RE = re.compile(r'\n\s*\n\s*\n')
+NEWLINE_RE = re.compile(r'\s*\n\s*')
+SPACES_RE = re.compile(r'\s+')
+PAGE_HEADER_RE = re.compile(r'Heilpraktiker(?:über)?prüfung.*?(?:Gruppe [AB]|$)')
 
 
 def extract_text_from_pdf(pdf_path):
-    """Extract all text from a PDF file."""
-    doc = fitz.open(pdf_path)
-    full_text = ""
-    for page in doc:
-        full_text += page.get_text() + "\n"
-    doc.close()
-    return full_text
+    """Extract all text from a PDF file (cached, see pdf_text)."""
+    return get_text(pdf_path, "fitz")
 
 
 def clean_text(text):
@@ -36,84 +38,37 @@ def clean_text(text):
 def find_option_blocks(text):
     """Find all complete A...B...C...D...E option blocks.
 
-    Handles both "X)" and "X." format markers.
+    Handles both "X)" and "X." format markers (see pdf_tokens.option_sequences
+    for how markers are paired up).
     Returns list of dicts: {'start', 'options': [5 strings]}
     """
     blocks = []
 
-    # Detect which format this text uses: "A)" vs "A."
-    # Count occurrences of each
-    a_paren_count = len(re.findall(r'\bA\)\s', text))
-    a_dot_count = len(re.findall(r'\bA\.\s', text))
-
-    if a_paren_count >= a_dot_count:
-        marker_pattern = r'[A-E]\)\s'
-        marker_re = lambda letter: re.compile(r'\b' + letter + r'\)\s')
-        strip_len = 2  # "X)"
-    else:
-        marker_pattern = r'[A-E]\.\s'
-        marker_re = lambda letter: re.compile(r'\b' + letter + r'\.\s')
-        strip_len = 2  # "X."
-
-    # Find all A positions
-    a_re = marker_re('A')
-    a_positions = [(m.start(), m.end()) for m in a_re.finditer(text)]
-
-    for a_start, a_end in a_positions:
-        search_region = text[a_start:a_start + 4000]
-
-        # Find B, C, D, E in order after A
-        option_markers = [('A', 0, a_end - a_start)]
-        current_pos = a_end - a_start
-
-        found_all = True
-        for letter in ['B', 'C', 'D', 'E']:
-            lre = marker_re(letter)
-            m = lre.search(search_region, current_pos)
-            if m:
-                option_markers.append((letter, m.start(), m.end()))
-                current_pos = m.end()
-            else:
-                found_all = False
-                break
-
-        if not found_all:
-            continue
-
-        # Check gaps aren't too large (max 800 chars between options)
-        valid = True
-        for i in range(1, len(option_markers)):
-            gap = option_markers[i][1] - option_markers[i-1][1]
-            if gap > 800:
-                valid = False
-                break
-        if not valid:
-            continue
-
+    for a_start, option_markers, window_end in option_sequences(text):
         # Extract option texts
         options = []
-        for i, (letter, mark_start, mark_end) in enumerate(option_markers):
+        for i, (mark_start, mark_end) in enumerate(option_markers):
             if i + 1 < len(option_markers):
-                text_end = option_markers[i + 1][1]
+                text_end = option_markers[i + 1][0]
             else:
                 # For E), find end
-                remaining = search_region[mark_end:mark_end + 500]
-                end_match = re.search(r'\n\s*\n\s*\d{1,2}\s', remaining)
+                remaining = text[mark_end:min(mark_end + 500, window_end)]
+                end_match = NEXT_QUESTION_RE.search(remaining)
                 if end_match:
                     text_end = mark_end + end_match.start()
                 else:
-                    end_match2 = re.search(r'\n\s*\n\s*\n', remaining)
+                    end_match2 = DOUBLE_BLANK_LINE_RE.search(remaining)
                     if end_match2:
                         text_end = mark_end + end_match2.start()
                     else:
                         text_end = mark_end + min(300, len(remaining))
 
-            opt_text = search_region[mark_end:text_end].strip()
+            opt_text = text[mark_end:text_end].strip()
             # Clean multiline
-            opt_text = re.sub(r'\s*\n\s*', ' ', opt_text)
-            opt_text = re.sub(r'\s+', ' ', opt_text)
+            opt_text = NEWLINE_RE.sub(' ', opt_text)
+            opt_text = SPACES_RE.sub(' ', opt_text)
             # Remove page headers
-            opt_text = re.sub(r'Heilpraktiker(?:über)?prüfung.*?(?:Gruppe [AB]|$)', '', opt_text).strip()
+            opt_text = PAGE_HEADER_RE.sub('', opt_text).strip()
             options.append(opt_text)
 
         # Validate: all options should have some text
@@ -228,29 +183,6 @@ def match_exam_to_gruppe(exam, text_a, text_b):
     return 'B' if score_b > score_a else 'A'
 
 
-def get_pdf_for_exam(year, month_str):
-    """Find PDF file for exam."""
-    month_de = "Maerz" if month_str == "March" else "Oktober"
-
-    # Old format
-    old_path = os.path.join(FRAGEN_DIR, f"{month_de}-{year}.pdf")
-    if os.path.exists(old_path):
-        return old_path
-
-    # New format variants
-    for pattern in [
-        f"HPP_Pruefung_{month_de}_{year}_mit_Loesungen_.pdf",
-        f"HPP_Pruefung_{month_de}_{year}_mit_Loesungen.pdf",
-        f"HPP_Pruefung_{month_de}_{year}_.pdf",
-        f"HPP_Pruefung_{month_de}_{year}_mit_Loesungen_A_B.pdf",
-        f"HPP_Pruefung_{month_de}_{year}_Gruppe_A_mit_Loesungen.pdf",
-    ]:
-        path = os.path.join(FRAGEN_DIR, pattern)
-        if os.path.exists(path):
-            return path
-    return None
-
-
 def has_empty_options(q):
     """Check if question has empty options."""
     opts = q.get('options', [])
@@ -266,9 +198,9 @@ def strip_option_prefix(opt_text):
     return opt_text
 
 
-def main():
-    with open(EXAMS_JSON, 'r', encoding='utf-8') as f:
-        exams = json.load(f)
+def apply_fixes(corpus):
+    """Run both phases on a loaded corpus (in memory, no save)."""
+    exams = corpus.exams
 
     # Phase 1: Strip A)/B) prefixes from existing options
     prefix_stripped = 0
@@ -302,7 +234,7 @@ def main():
         if empty_count == 0:
             continue
 
-        pdf_path = get_pdf_for_exam(year, month)
+        pdf_path = pdf_for_exam(exam['id'])
         if not pdf_path:
             results.append(f"  {exam_id}: NO PDF ({empty_count} need options)")
             continue
@@ -351,15 +283,18 @@ def main():
         else:
             results.append(f"  {exam_id}: All {updated} questions OK")
 
-    # Save
-    with open(EXAMS_JSON, 'w', encoding='utf-8') as f:
-        json.dump(exams, f, ensure_ascii=False, indent=2)
-
     print(f"Phase 2: Extracted options for {total_extracted} questions from PDFs")
     print(f"\nPer-exam results:")
     for r in results:
         print(r)
 
 
+def main():
+    corpus = load_corpus()
+    apply_fixes(corpus)
+    # Save (skipped when nothing changed)
+    corpus.save()
+
+
 if __name__ == '__main__':
     main()
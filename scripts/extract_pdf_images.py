@@ -6,252 +6,364 @@ Output structure:
     q{N}.webp           - Question N image (cropped from PDF)
     a{N}.webp           - Answer matrix column for question N (grid PDFs)
     answer_key.webp     - Full answer key page (fallback)
+    page{N}.webp        - Full page N (scanned PDFs; blank pages are skipped)
+    q{N}@2x.webp, ...   - Double density tier of every image (--tiers 1x,2x)
+  app/src/main/assets/images/index.json
+                        - Tier index read by the app: file and pixel size of
+                          every variant, keyed by the 1x path
+  .cache/image-manifests/{output dir}.json
+                        - Build manifest of an output directory: source PDF
+                          hash, render settings, clip rectangles and output
+                          hash of every image. It is kept out of the assets,
+                          so it does not ship in the APK
+
+With --pack the loose files go to .cache/images/ instead and the app assets
+get one pack per exam next to index.json:
+  app/src/main/assets/images/{exam_id}.pack
+                        - All images of the exam in one file: the magic
+                          b"HPIMGPK1", a big-endian u32 entry count, then per
+                          entry a u16 name length, the UTF-8 file name
+                          ("q3@2x.webp"), u32 offset and u32 length of its
+                          WebP bytes (offsets from the start of the file),
+                          followed by the image data
+The app opens one pack per exam and reads images by offset, instead of
+opening one of thousands of small zip entries per image (see
+data/ImagePacks.kt). Packs are stored uncompressed in the APK. Switching
+modes cleans up after the other one: a --pack run deletes the loose images
+a plain run generated in the app assets, and a plain run deletes the packs.
+
+Every image is rasterized once, at the largest tier scale; the other tiers
+are downscaled from that bitmap. Question and answer key crops span the
+full page width and run down to the next question; they are trimmed to
+their ink (pixels darker than INK_THRESHOLD) plus TRIM_PADDING pixels
+before encoding. The manifest keeps the untrimmed size, so every run
+reports the pixels saved; with --report-trim it also encodes the untrimmed
+bitmap at fixed quality 60 to report the bytes saved (one extra encode per
+image).
+Each page is interpreted once per run and all images on it are rasterized
+from that display list (PageCache).
+
+Re-runs only render images whose manifest entry is out of date and delete
+images that an earlier run generated but the current plan no longer contains.
+A manifest of an older format is not trusted for skipping, but the images it
+lists are still deleted before the re-render. Files not recorded in the
+manifest are never touched.
+
+Usage: python3 scripts/extract_pdf_images.py [--jobs N] [--force]
+                                             [--dpi N] [--output DIR]
+  --jobs N      process N exams in parallel worker processes (default: 1)
+  --force       ignore the manifest and re-render everything
+  --dpi N       render resolution (default: 96); e.g. 300 for print exports
+  --output DIR  write images to DIR instead of the app assets
+  --encoder adaptive|fixed
+                adaptive (default) picks the smallest WebP encoding that meets
+                the SSIM/PSNR thresholds of the image's asset class (see
+                image_encoder); fixed is lossy WebP at quality 60. adaptive
+                walks a grayscale chain and a lossy quality chain and stops
+                each at the first candidate that passes or grows past the
+                best so far: usually two or three encodes, each checked
+                against the rendering. A full run takes about 4x as long as
+                with fixed; use fixed for quick development runs
+  --min-ssim F, --min-psnr DB
+                override the adaptive encoder thresholds for all classes
+  --tiers LIST  comma-separated output tiers (default: 1x); 1x is always
+                written, --tiers 1x,2x adds sharper images for zooming in
+                ImageViewerDialog at about twice the APK image size
+  --pack        write per-exam packs to the app assets (see above); loose
+                images go to --output (default .cache/images)
+  --page-cache-mb N
+                memory budget of the per-process page cache (default: 128);
+                every page is interpreted once into a display list and all
+                its slices are rasterized from it (see PageCache)
+  --trim-padding N
+                white border in 1x pixels kept around the ink of trimmed
+                images (default: 8)
+  --no-trim     keep question and answer key crops at full page width
+  --report-trim also report the bytes trimming saves (encodes every trimmed
+                image a second time, untrimmed)
+Run from project root.
 """
 
+import argparse
+import contextlib
 import fitz
 import json
 import os
 import re
+import struct
 import sys
+import time
 from PIL import Image
 import io
-from collections import defaultdict
-
-FRAGEN_DIR = "fragen"
-EXAMS_JSON = "app/src/main/assets/exams.json"
-OUTPUT_DIR = "app/src/main/assets/images"
+import numpy as np
+from collections import OrderedDict, defaultdict
+from concurrent.futures import ProcessPoolExecutor
+
+import image_encoder
+import page_types
+from corpus import load_corpus
+from pdf_catalog import pdf_for_exam
+from pdf_layout import (answer_key_clip, find_answer_key_page, find_questions_on_pages,
+                        get_layout, layout_segments, question_positions, question_segments)
+from pdf_text import file_sha256
+from word_store import get_store
+
+ASSETS_DIR = "app/src/main/assets/images"
+OUTPUT_DIR = ASSETS_DIR
+PACK_BUILD_DIR = ".cache/images"  # --output default with --pack
+PACK_DIR = None  # ASSETS_DIR with --pack
+PACK_MAGIC = b"HPIMGPK1"
+MANIFEST_DIR = ".cache/image-manifests"
+MANIFEST_PATH = None  # manifest_path(OUTPUT_DIR), set by configure()
+MANIFEST_FORMAT = 2
+INDEX_PATH = os.path.join(OUTPUT_DIR, "index.json")
+INDEX_FORMAT = 1
 DPI = 96
-WEBP_QUALITY = 60
-
-QUESTION_TYPE_WORDS = {
-    "Einfachauswahl", "Aussagenkombination", "Mehrfachauswahl",
-    "Mehrfachauswahlaufgabe", "Aussagekombination"
+WEBP_QUALITY = 60  # --encoder fixed
+ENCODER = "adaptive"
+ENCODER_PROFILES = image_encoder.PROFILES
+# Bump when the rendering code changes in a way that alters output pixels
+RENDER_VERSION = 1
+# Memory budget of the per-document page cache (--page-cache-mb)
+PAGE_CACHE_BYTES = 128 * 1024 * 1024
+# Whitespace trimming of question and answer key crops: a pixel is ink if
+# any channel is below INK_THRESHOLD; TRIM_PADDING 1x pixels of white stay
+# around the ink (--trim-padding, None with --no-trim)
+INK_THRESHOLD = 250
+TRIM_PADDING = 8
+REPORT_TRIM_BYTES = False  # --report-trim
+
+# Output tiers: a scale relative to DPI. 1x keeps the plain file name the
+# app has always used; the others get an "@tier" suffix (q3@2x.webp).
+# Only 1x is written by default: 2x doubles the image assets in the APK.
+TIERS = {
+    '1x': {'scale': 1},
+    '2x': {'scale': 2},
 }
+DEFAULT_TIERS = ['1x']
+OUTPUT_TIERS = list(DEFAULT_TIERS)
 
+# Image colorspace name (page.get_images) -> components, for PageCache
+# size estimates; other colorspaces count as RGB
+COLORSPACE_COMPONENTS = {'DeviceGray': 1, 'DeviceRGB': 3, 'DeviceCMYK': 4}
 
-def get_pdf_for_exam(year, month):
-    """Find PDF file for an exam."""
-    month_de = "Maerz" if month == "March" else "Oktober"
-    for pattern in [
-        f"{month_de}-{year}.pdf",
-        f"HPP_Pruefung_{month_de}_{year}_mit_Loesungen_.pdf",
-        f"HPP_Pruefung_{month_de}_{year}_mit_Loesungen.pdf",
-        f"HPP_Pruefung_{month_de}_{year}_.pdf",
-        f"HPP_Pruefung_{month_de}_{year}_mit_Loesungen_A_B.pdf",
-        f"HPP_Pruefung_{month_de}_{year}_Gruppe_A_mit_Loesungen.pdf",
-        f"HPP_Pruefung_{month_de}_{year}_mit_Loesungen_Gruppe_A.pdf",
-    ]:
-        path = os.path.join(FRAGEN_DIR, pattern)
-        if os.path.exists(path):
-            return path
-    return None
+# Pixmap channel count -> PIL mode (get_pixmap() renders RGB without alpha)
+PIXMAP_MODES = {1: "L", 3: "RGB", 4: "RGBA"}
 
 
-def is_scanned_pdf(doc):
-    """Check if PDF has no extractable text (scanned)."""
-    total_text = 0
-    for i in range(min(5, doc.page_count)):
-        total_text += len(doc[i].get_text().strip())
-    return total_text < 100
+def pixmap_to_image(pix):
+    """PIL image over the pixmap's raw samples (no PNG encode/decode)."""
+    mode = PIXMAP_MODES[pix.n]
+    return Image.frombuffer(mode, (pix.width, pix.height), pix.samples,
+                            "raw", mode, pix.stride, 1)
 
 
-def find_answer_key_page(doc):
-    """Find the Gruppe A answer key page. Returns (page_idx, is_gruppe_b_only).
-
-    Prefers Gruppe A answer keys. Returns is_gruppe_b_only=True if only
-    Gruppe B answer key was found (should not be used for answer grid images).
-    """
-    candidates = []  # [(page_idx, has_gruppe_a, has_gruppe_b_only)]
-
-    for i in range(doc.page_count - 1, max(doc.page_count // 2 - 1, -1), -1):
-        text = doc[i].get_text()
-        is_answer_page = False
-        if "Lösungsschlüssel" in text or "Lösungschlüssel" in text:
-            is_answer_page = True
-        elif "Lösungen" in text and i >= doc.page_count - 4:
-            is_answer_page = True
-
-        if is_answer_page:
-            first_400 = text[:400]
-            has_gruppe_a = bool(re.search(r'Gruppe\s*A', first_400))
-            has_gruppe_b = bool(re.search(r'Gruppe\s*B', first_400))
-            candidates.append((i, has_gruppe_a, has_gruppe_b))
-
-    if not candidates:
-        return None, False
-
-    # Prefer pages explicitly labeled Gruppe A
-    for page_idx, has_a, has_b in candidates:
-        if has_a and not has_b:
-            return page_idx, False
-        if has_a:
-            return page_idx, False
-
-    # If no explicit Gruppe A, check if pages are Gruppe B only
-    for page_idx, has_a, has_b in candidates:
-        if not has_b:
-            return page_idx, False  # No Gruppe marker = assume A
-
-    # Only Gruppe B answer key found
-    return candidates[0][0], True
-
-
-def find_gruppe_b_page(doc):
-    """Find the page where Gruppe B section starts (if applicable)."""
-    full_text = ""
-    for page in doc:
-        full_text += page.get_text() + "\n"
-
-    b_count = len(re.findall(r'Gruppe\s*B', full_text))
-
-    if b_count == 0 or b_count >= 15:
-        return None  # No Gruppe B section, or it's just page headers
-
-    # Find the page where Gruppe B section starts (after first third of doc)
-    text_len = 0
-    threshold = len(full_text) * 0.25
-    for i in range(doc.page_count):
-        page_text = doc[i].get_text()
-        text_len += len(page_text)
-        if text_len > threshold and re.search(r'Gruppe\s*B', page_text):
-            # Verify this is a section header, not just a mention
-            # Check if "Gruppe B" appears near the top of the page
-            lines = page_text.strip().split('\n')
-            for line in lines[:5]:
-                if re.search(r'Gruppe\s*B', line):
-                    return i
-    return None
+class PageCache:
+    """Display lists of the recently rendered pages of one document.
 
+    page.get_pixmap() interprets the page's content stream again on every
+    call, and a page is rendered once per question slice on it (plus once
+    per tier scale). The cache interprets each page once into a display
+    list and rasterizes every clip from that. Rasterizing a clip of a
+    display list gives exactly the pixels of page.get_pixmap(clip=...);
+    cropping a full-page bitmap would not (image interpolation depends on
+    the clip origin) and would also rasterize margins no image uses.
 
-def find_questions_on_pages(doc, end_page):
-    """Find question positions using word-based search.
-    Returns: {question_num: (page_idx, y_top)}
+    Entries are evicted least recently used first once their estimated
+    size (content stream plus decoded images) exceeds max_bytes.
     """
-    questions = {}
 
-    for page_idx in range(end_page):
-        page = doc[page_idx]
-        words = page.get_text("words")
+    def __init__(self, doc, max_bytes=None):
+        self.doc = doc
+        self.max_bytes = PAGE_CACHE_BYTES if max_bytes is None else max_bytes
+        self.entries = OrderedDict()  # page_idx -> (display list, bytes)
+        self.bytes = 0
+        self.hits = self.misses = self.evictions = 0
+
+    @staticmethod
+    def estimate_bytes(page):
+        """Rough memory size of a page's display list.
+
+        Uses the content stream length and the image sizes from the page
+        resources, which (unlike get_image_info) does not run the content
+        stream through a device a second time.
+        """
+        contents = page.read_contents()
+        size = len(contents)
+        images = {}
+        for img in page.get_images(full=True):
+            xref, smask, width, height, _, colorspace, _, name, _, referencer = img
+            # Scanned PDFs often share one resource dict listing every
+            # page's image; count only the ones this page draws
+            if referencer == 0 and f"/{name}".encode() not in contents:
+                continue
+            images[xref] = width * height * (COLORSPACE_COMPONENTS.get(colorspace, 3) + bool(smask))
+        return size + sum(images.values())
+
+    def display_list(self, page_idx):
+        entry = self.entries.get(page_idx)
+        if entry is not None:
+            self.entries.move_to_end(page_idx)
+            self.hits += 1
+            return entry[0]
+        self.misses += 1
+        page = self.doc[page_idx]
+        dl = page.get_displaylist()
+        size = self.estimate_bytes(page)
+        self.entries[page_idx] = (dl, size)
+        self.bytes += size
+        while self.bytes > self.max_bytes and len(self.entries) > 1:
+            _, (_, evicted) = self.entries.popitem(last=False)
+            self.bytes -= evicted
+            self.evictions += 1
+        return dl
+
+    def get_pixmap(self, page_idx, matrix, clip=None):
+        """Same as doc[page_idx].get_pixmap(matrix=matrix, clip=clip)."""
+        return self.display_list(page_idx).get_pixmap(matrix=matrix, clip=clip, alpha=False)
+
+    def stats(self):
+        return (f"page cache: {self.misses} pages interpreted, {self.hits} reused, "
+                f"{self.evictions} evicted")
+
+
+def segment_size(doc, page_idx, clip, mat):
+    """Pixel (width, height) get_pixmap() will produce for a page slice."""
+    page = doc[page_idx]
+    rect = page.rect if clip is None else page.rect & clip
+    irect = (rect * mat).irect
+    return irect.width, irect.height
 
-        for i, w in enumerate(words):
-            word = w[4].strip()
 
-            is_type = word in QUESTION_TYPE_WORDS
+def stitched_size(sizes):
+    return max(w for w, _ in sizes), sum(h for _, h in sizes)
 
-            # Handle split "Aussagen kombination" / "Aussage kombination"
-            if not is_type and word in ("Aussagen", "Aussage"):
-                if i + 1 < len(words):
-                    next_w = words[i + 1][4].strip().lower()
-                    if next_w.startswith("kombination"):
-                        is_type = True
 
-            if is_type and i > 0:
-                prev = words[i - 1]
-                try:
-                    n = int(prev[4].strip())
-                    if 1 <= n <= 28 and n not in questions:
-                        questions[n] = (page_idx, prev[1] - 2)
-                except ValueError:
-                    pass
+def render_segments(doc, segments, dpi=None, cache=None):
+    """Render planned page slices and stitch them vertically into one image.
+
+    The canvas is sized up front from the clip rectangles and every slice is
+    pasted as soon as it is rendered, so at most one slice bitmap is alive
+    next to the canvas however many pages a question spans. Pages come from
+    cache (a PageCache of doc) if given.
+    """
+    dpi = dpi or DPI
+    mat = fitz.Matrix(dpi / 72, dpi / 72)
+    cache = cache or PageCache(doc, 0)
+    if len(segments) == 1:
+        page_idx, clip = segments[0]
+        return pixmap_to_image(cache.get_pixmap(page_idx, mat, clip))
+
+    sizes = [segment_size(doc, page_idx, clip, mat) for page_idx, clip in segments]
+    img = Image.new("RGB", stitched_size(sizes), (255, 255, 255))
+    y_offset = 0
+    for (page_idx, clip), (_, height) in zip(segments, sizes):
+        pix = cache.get_pixmap(page_idx, mat, clip)
+        img.paste(pixmap_to_image(pix), (0, y_offset))
+        y_offset += height
+        del pix
+    return img
+
+
+def tier_filename(name, tier):
+    """File name of one tier of a planned image: q3.webp -> q3@2x.webp."""
+    if tier == '1x':
+        return name
+    stem, ext = os.path.splitext(name)
+    return f"{stem}@{tier}{ext}"
+
+
+def render_tiers(doc, segments, tiers, cache=None):
+    """Rasterize segments once and derive every tier from that bitmap.
+
+    The render happens at the largest requested scale. The other tiers get
+    the exact size a direct render would have and are box-filtered (plain
+    pixel averaging, i.e. supersampling).
+    Returns {tier: image}.
+    """
+    base_scale = max(TIERS[t]['scale'] for t in tiers)
+    base = render_segments(doc, segments, DPI * base_scale, cache)
+    images = {}
+    for tier in tiers:
+        spec = TIERS[tier]
+        if spec['scale'] == base_scale:
+            images[tier] = base
+        else:
+            mat = fitz.Matrix(DPI * spec['scale'] / 72, DPI * spec['scale'] / 72)
+            size = stitched_size([segment_size(doc, page_idx, clip, mat)
+                                  for page_idx, clip in segments])
+            images[tier] = base.resize(size, Image.BOX)
+    return images
+
+
+def ink_bbox(img, threshold=None):
+    """(left, top, right, bottom) of the pixels darker than threshold, or None if blank."""
+    pixels = np.asarray(img)
+    if pixels.ndim == 3:
+        pixels = pixels.min(axis=2)
+    ink = pixels < (INK_THRESHOLD if threshold is None else threshold)
+    rows = np.flatnonzero(ink.any(axis=1))
+    if not len(rows):
+        return None
+    cols = np.flatnonzero(ink.any(axis=0))
+    return int(cols[0]), int(rows[0]), int(cols[-1]) + 1, int(rows[-1]) + 1
 
-    return questions
 
+def trim_tiers(images, padding):
+    """Crop every tier to the ink of the base tier plus padding (in 1x pixels).
 
-def extract_question_image(doc, questions, qnum, output_path):
+    images is render_tiers() output. The crop box is found on the base
+    bitmap and aligned to whole 1x pixels, so every tier is cut at the same
+    place and keeps its scale.
+    Returns images unchanged if there is nothing to trim.
+    """
+    scales = {tier: TIERS[tier]['scale'] for tier in images}
+    base_tier = max(scales, key=scales.get)
+    base, base_scale = images[base_tier], scales[base_tier]
+    bbox = ink_bbox(base)
+    if bbox is None:
+        return images
+    pad = padding * base_scale
+    left, top = [max(0, (v - pad) // base_scale * base_scale) for v in bbox[:2]]
+    right = min(base.width, -(-(bbox[2] + pad) // base_scale) * base_scale)
+    bottom = min(base.height, -(-(bbox[3] + pad) // base_scale) * base_scale)
+    if (left, top, right, bottom) == (0, 0, base.width, base.height):
+        return images
+    trimmed = {}
+    for tier, img in images.items():
+        ratio = img.width / base.width
+        box = (round(left * ratio), round(top * ratio),
+               min(img.width, max(round(left * ratio) + 1, round(right * ratio))),
+               min(img.height, max(round(top * ratio) + 1, round(bottom * ratio))))
+        trimmed[tier] = img.crop(box)
+    return trimmed
+
+
+def extract_question_image(doc, questions, qnum, output_path, cache=None):
     """Extract and save image for a single question."""
-    if qnum not in questions:
+    segments = question_segments(doc, questions, qnum)
+    if segments is None:
         return False
 
-    page_idx, y_top = questions[qnum]
-    page = doc[page_idx]
-    page_rect = page.rect
-    mat = fitz.Matrix(DPI / 72, DPI / 72)
-
-    # Find where this question ends
-    next_q_page = None
-    next_q_y = None
-    for nq in range(qnum + 1, 30):
-        if nq in questions:
-            next_q_page, next_q_y = questions[nq]
-            break
-
-    if next_q_page is not None and next_q_page == page_idx:
-        # Next question on same page
-        clip = fitz.Rect(0, max(0, y_top), page_rect.width, next_q_y - 3)
-        pix = page.get_pixmap(matrix=mat, clip=clip)
-        img = Image.open(io.BytesIO(pix.tobytes("png")))
-    elif next_q_page is not None and next_q_page > page_idx:
-        # Question spans multiple pages - stitch
-        images = []
-
-        # Current page from y_top to bottom
-        clip1 = fitz.Rect(0, max(0, y_top), page_rect.width, page_rect.height)
-        pix1 = page.get_pixmap(matrix=mat, clip=clip1)
-        images.append(Image.open(io.BytesIO(pix1.tobytes("png"))))
-
-        # Intermediate full pages (rare)
-        for mid_idx in range(page_idx + 1, next_q_page):
-            mid_page = doc[mid_idx]
-            pix_mid = mid_page.get_pixmap(matrix=mat)
-            images.append(Image.open(io.BytesIO(pix_mid.tobytes("png"))))
-
-        # Next question's page from top to its y_top
-        next_page = doc[next_q_page]
-        clip2 = fitz.Rect(0, 0, next_page.rect.width, next_q_y - 3)
-        pix2 = next_page.get_pixmap(matrix=mat, clip=clip2)
-        images.append(Image.open(io.BytesIO(pix2.tobytes("png"))))
-
-        # Stitch vertically
-        total_height = sum(im.height for im in images)
-        max_width = max(im.width for im in images)
-        img = Image.new("RGB", (max_width, total_height), (255, 255, 255))
-        y_offset = 0
-        for im in images:
-            img.paste(im, (0, y_offset))
-            y_offset += im.height
-    else:
-        # Last question or no next found - take rest of page
-        clip = fitz.Rect(0, max(0, y_top), page_rect.width, page_rect.height)
-        pix = page.get_pixmap(matrix=mat, clip=clip)
-        img = Image.open(io.BytesIO(pix.tobytes("png")))
-
+    img = render_segments(doc, segments, cache=cache)
     os.makedirs(os.path.dirname(output_path), exist_ok=True)
-    img.save(output_path, "WebP", quality=WEBP_QUALITY)
+    save_image(img, output_path)
     return True
 
 
-def detect_grid_sections(page):
+def detect_grid_sections(doc, page_idx):
     """Detect answer grid sections on the answer key page.
     Returns list of sections: [{items: [...], y_top, y_bottom, ...}]
     """
-    words = page.get_text("words")
+    page = doc[page_idx]
+    store = get_store(doc.name)
 
-    # Find all standalone number words
-    num_words = []
-    for w in words:
-        txt = w[4].strip()
-        try:
-            n = int(txt)
-            if 1 <= n <= 28:
-                num_words.append({
-                    'x0': w[0], 'y0': w[1], 'x1': w[2], 'y1': w[3], 'num': n
-                })
-        except ValueError:
-            pass
-
-    # Group by approximate y position
-    y_groups = defaultdict(list)
-    for nw in num_words:
-        y_key = round(nw['y0'] / 8) * 8
-        y_groups[y_key].append(nw)
-
-    # Find header rows (groups with 8+ numbers in a horizontal line)
+    # Header rows: 8+ question numbers on one line
     header_rows = []
-    for y_key in sorted(y_groups.keys()):
-        group = y_groups[y_key]
-        if len(group) >= 8:
-            group.sort(key=lambda x: x['x0'])
-            header_rows.append(group)
+    for row in store.number_rows(page_idx, 8):
+        header_rows.append([{'x0': float(store.x0[i]), 'y0': float(store.y0[i]),
+                             'x1': float(store.x1[i]), 'y1': float(store.y1[i]),
+                             'num': int(store.number[i])} for i in row])
 
     if len(header_rows) < 2:
         return None
@@ -273,13 +385,12 @@ def detect_grid_sections(page):
     # Section 1 ends where section 2 begins (with some margin)
     sections[0]['y_bottom'] = sections[1]['y_top'] - 3
 
-    # Section 2 ends at the last E row
-    # Find all 'E' letter words below the second header
+    # Section 2 ends at the last E row below the second header
+    words = store.page_words(page_idx)
+    e_rows = words[store.is_text('E')[words] & (store.y0[words] > sections[1]['y_top'])]
     e_y_max = sections[1]['y_top'] + 150  # default
-    for w in words:
-        if w[4].strip() == 'E' and w[1] > sections[1]['y_top']:
-            if w[3] > e_y_max:
-                e_y_max = w[3]
+    if len(e_rows):
+        e_y_max = max(e_y_max, float(store.y1[e_rows].max()))
     sections[1]['y_bottom'] = e_y_max + 8
 
     # Limit y_bottom to Gruppe B answer section if present below grid
@@ -305,8 +416,9 @@ def extract_answer_grid_images(doc, answer_page_idx, output_dir):
     page = doc[answer_page_idx]
     mat = fitz.Matrix(DPI / 72, DPI / 72)
     page_rect = page.rect
+    cache = PageCache(doc)
 
-    sections = detect_grid_sections(page)
+    sections = detect_grid_sections(doc, answer_page_idx)
     if sections is None:
         return False
 
@@ -331,123 +443,578 @@ def extract_answer_grid_images(doc, answer_page_idx, output_dir):
             )
             if clip.width < 5 or clip.height < 5:
                 continue
-            pix = page.get_pixmap(matrix=mat, clip=clip)
-            img = Image.open(io.BytesIO(pix.tobytes("png")))
+            img = pixmap_to_image(cache.get_pixmap(answer_page_idx, mat, clip))
 
             path = os.path.join(output_dir, f"a{n}.webp")
-            img.save(path, "WebP", quality=WEBP_QUALITY)
+            save_image(img, path)
             count += 1
 
     return count > 0
 
 
+def answer_key_segments(doc, answer_page_idx):
+    """Plan the answer key image: the Gruppe A part of the page, else the full page."""
+    return [(answer_page_idx, answer_key_clip(doc[answer_page_idx]))]
+
+
 def extract_answer_key_full_page(doc, answer_page_idx, output_dir):
     """Save the full answer key page as a single image."""
-    page = doc[answer_page_idx]
-    mat = fitz.Matrix(DPI / 72, DPI / 72)
+    img = render_segments(doc, answer_key_segments(doc, answer_page_idx))
+    path = os.path.join(output_dir, "answer_key.webp")
+    save_image(img, path)
+    return True
 
-    # Try to crop to just the Gruppe A section (only if Gruppe B is a real section, not header)
-    gruppe_b = page.search_for("Gruppe B")
-    clip = None
-    if gruppe_b:
-        # Only crop if "Gruppe B" appears below the top quarter of the page
-        # (not a page header)
-        for gb in gruppe_b:
-            if gb.y0 > page.rect.height * 0.25:
-                clip = fitz.Rect(0, 0, page.rect.width, gb.y0 - 5)
-                break
 
-    if clip and clip.height > 50:
-        pix = page.get_pixmap(matrix=mat, clip=clip)
-    else:
-        pix = page.get_pixmap(matrix=mat)
+def encode_image(img, name):
+    """Encode an output image as WebP; returns an image_encoder.Encoded."""
+    if ENCODER == "fixed":
+        return image_encoder.encode_fixed(img, WEBP_QUALITY)
+    return image_encoder.encode_adaptive(img, ENCODER_PROFILES[image_encoder.asset_class(name)])
+
+
+def save_image(img, path):
+    """Encode img for its asset class and write it to path."""
+    encoded = encode_image(img, os.path.basename(path))
+    with open(path, 'wb') as f:
+        f.write(encoded.data)
+    return encoded
+
+
+def encoder_settings():
+    if ENCODER == "fixed":
+        return {'mode': 'fixed', 'webp_quality': WEBP_QUALITY}
+    return {'mode': 'adaptive', 'profiles': ENCODER_PROFILES,
+            'lossless_method': image_encoder.LOSSLESS_METHOD}
 
-    img = Image.open(io.BytesIO(pix.tobytes("png")))
-    path = os.path.join(output_dir, "answer_key.webp")
-    img.save(path, "WebP", quality=WEBP_QUALITY)
-    return True
 
+def render_settings():
+    """Settings that invalidate every image of an exam when they change."""
+    return {'dpi': DPI, 'encoder': encoder_settings(), 'render_version': RENDER_VERSION,
+            'tiers': {tier: TIERS[tier] for tier in OUTPUT_TIERS},
+            'trim': None if TRIM_PADDING is None else {'padding': TRIM_PADDING,
+                                                       'ink_threshold': INK_THRESHOLD}}
 
-def process_exam(exam):
-    """Process a single exam: extract question and answer images."""
+
+def output_variants(outputs):
+    """All variant entries of a manifest 'outputs' mapping."""
+    return [v for o in outputs.values() for v in o.get('variants', {}).values()]
+
+
+def encoding_savings(outputs):
+    """(bytes, fixed quality-60 bytes) of a manifest 'outputs' mapping."""
+    variants = output_variants(outputs)
+    size = sum(v['bytes'] for v in variants)
+    baseline = sum(v['baseline_bytes'] for v in variants)
+    return size, baseline
+
+
+def trim_savings(outputs):
+    """(pixels, untrimmed pixels, fixed-q60 bytes, untrimmed fixed-q60 bytes) of
+    the trimmed variants of a manifest 'outputs' mapping.
+
+    The byte totals only cover variants rendered with --report-trim.
+    """
+    totals = [0, 0, 0, 0]
+    for v in output_variants(outputs):
+        untrimmed = v.get('untrimmed')
+        if untrimmed:
+            totals[0] += v['width'] * v['height']
+            totals[1] += untrimmed['width'] * untrimmed['height']
+            if 'baseline_bytes' in untrimmed:
+                totals[2] += v['baseline_bytes']
+                totals[3] += untrimmed['baseline_bytes']
+    return tuple(totals)
+
+
+def generated_files(outputs):
+    """File names recorded in a manifest 'outputs' mapping of any format.
+
+    Format 1 keyed one file per output by its name; later formats list the
+    files of every tier variant.
+    """
+    files = []
+    for name, output in outputs.items():
+        if 'variants' in output:
+            files.extend(v['file'] for v in output['variants'].values())
+        else:
+            files.append(name)
+    return files
+
+
+def manifest_path(output_dir):
+    """Build manifest path of an output directory, e.g. app_src_main_assets_images.json."""
+    name = re.sub(r'[^\w.-]+', '_', os.path.relpath(output_dir)).strip('_')
+    return os.path.join(MANIFEST_DIR, f"{name}.json")
+
+
+def read_manifest(output_dir):
+    """Raw manifest of an output directory, or None.
+
+    Falls back to the manifest.json that earlier versions wrote into the
+    output directory itself.
+    """
+    for path in (manifest_path(output_dir), os.path.join(output_dir, "manifest.json")):
+        try:
+            with open(path) as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            continue
+    return None
+
+
+def remove_generated(manifest, output_dir):
+    """Delete the images a manifest records; returns the number removed."""
+    removed = 0
+    for exam_id, entry in manifest.get('exams', {}).items():
+        if entry is None:
+            continue
+        for name in generated_files(entry.get('outputs', {})):
+            path = os.path.join(output_dir, exam_id, name)
+            if os.path.exists(path):
+                os.remove(path)
+                removed += 1
+        with contextlib.suppress(OSError):
+            os.rmdir(os.path.join(output_dir, exam_id))  # only if empty
+    return removed
+
+
+def segments_spec(segments):
+    """JSON-serializable form of planned segments for the manifest."""
+    return [[page_idx, None if clip is None else [round(v, 2) for v in clip]]
+            for page_idx, clip in segments]
+
+
+def load_manifest():
+    manifest = read_manifest(OUTPUT_DIR)
+    if manifest is None:
+        return {'format': MANIFEST_FORMAT, 'exams': {}}
+    if manifest.get('format') != MANIFEST_FORMAT:
+        # Everything is re-rendered; without this the old files the new
+        # plan no longer names would never be pruned
+        removed = remove_generated(manifest, OUTPUT_DIR)
+        print(f"Manifest format changed: removed {removed} images of the previous run")
+        return {'format': MANIFEST_FORMAT, 'exams': {}}
+    return manifest
+
+
+def save_manifest(manifest):
+    os.makedirs(MANIFEST_DIR, exist_ok=True)
+    tmp = MANIFEST_PATH + ".tmp"
+    with open(tmp, 'w') as f:
+        json.dump(manifest, f, indent=1, sort_keys=True)
+    os.replace(tmp, MANIFEST_PATH)
+    # Manifests of earlier versions sat in the output directory
+    with contextlib.suppress(FileNotFoundError):
+        os.remove(os.path.join(OUTPUT_DIR, "manifest.json"))
+
+
+def save_index(manifest):
+    """Write the tier index the app reads: 1x path -> {tier: file and size}."""
+    images = {}
+    for exam_id, entry in sorted(manifest['exams'].items()):
+        for name, output in sorted(entry['outputs'].items()):
+            images[f"{exam_id}/{name}"] = {
+                tier: {'file': f"{exam_id}/{v['file']}", 'width': v['width'], 'height': v['height']}
+                for tier, v in output['variants'].items()}
+    tmp = INDEX_PATH + ".tmp"
+    with open(tmp, 'w') as f:
+        json.dump({'format': INDEX_FORMAT, 'images': images}, f,
+                  sort_keys=True, separators=(',', ':'))
+    os.replace(tmp, INDEX_PATH)
+
+
+def pack_name(exam_id):
+    return f"{exam_id}.pack"
+
+
+def pack_bytes(files):
+    """Pack file contents for [(name, data)] (format: see module docstring)."""
+    header = [PACK_MAGIC, struct.pack(">I", len(files))]
+    names = [name.encode('utf-8') for name, _ in files]
+    offset = len(PACK_MAGIC) + 4 + sum(2 + len(n) + 8 for n in names)
+    for name, (_, data) in zip(names, files):
+        header.append(struct.pack(">H", len(name)) + name + struct.pack(">II", offset, len(data)))
+        offset += len(data)
+    return b"".join(header + [data for _, data in files])
+
+
+def read_pack(path):
+    """{name: data} of a pack file."""
+    with open(path, 'rb') as f:
+        blob = f.read()
+    if blob[:len(PACK_MAGIC)] != PACK_MAGIC:
+        raise ValueError(f"{path}: not an image pack")
+    pos = len(PACK_MAGIC)
+    count, = struct.unpack_from(">I", blob, pos)
+    pos += 4
+    files = {}
+    for _ in range(count):
+        name_len, = struct.unpack_from(">H", blob, pos)
+        name = blob[pos + 2:pos + 2 + name_len].decode('utf-8')
+        offset, length = struct.unpack_from(">II", blob, pos + 2 + name_len)
+        pos += 2 + name_len + 8
+        files[name] = blob[offset:offset + length]
+    return files
+
+
+def write_pack(exam_id, output_dir, outputs):
+    """Pack the exam's variant files into PACK_DIR; returns (files, bytes).
+
+    The pack is only rewritten when its content changes.
+    """
+    files = []
+    for variant in sorted(output_variants(outputs), key=lambda v: v['file']):
+        with open(os.path.join(output_dir, variant['file']), 'rb') as f:
+            files.append((variant['file'], f.read()))
+    data = pack_bytes(files)
+    path = os.path.join(PACK_DIR, pack_name(exam_id))
+    try:
+        with open(path, 'rb') as f:
+            unchanged = f.read() == data
+    except OSError:
+        unchanged = False
+    if not unchanged:
+        tmp = path + ".tmp"
+        with open(tmp, 'wb') as f:
+            f.write(data)
+        os.replace(tmp, path)
+    return len(files), len(data)
+
+
+def remove_loose_assets():
+    """Delete loose images a non-pack run generated in the app assets.
+
+    Uses that run's manifest, so hand-made assets stay; the manifest goes
+    too, since the packs now hold the images.
+    """
+    manifest = read_manifest(PACK_DIR)
+    if manifest is None:
+        return
+    removed = remove_generated(manifest, PACK_DIR)
+    for path in (manifest_path(PACK_DIR), os.path.join(PACK_DIR, "manifest.json")):
+        with contextlib.suppress(FileNotFoundError):
+            os.remove(path)
+    print(f"Removed {removed} loose images from {PACK_DIR} (now in packs)")
+
+
+def remove_packs():
+    """Delete the packs a --pack run wrote to the app assets.
+
+    ImagePacks reads a pack before the loose file, so once a run writes
+    loose images to the assets again, stale packs would hide them. Only
+    files that start with PACK_MAGIC are removed; index.json is rewritten
+    by this run.
+    """
+    removed = 0
+    for name in sorted(os.listdir(ASSETS_DIR)):
+        path = os.path.join(ASSETS_DIR, name)
+        if not name.endswith(".pack") or not os.path.isfile(path):
+            continue
+        with open(path, 'rb') as f:
+            if f.read(len(PACK_MAGIC)) != PACK_MAGIC:
+                continue
+        os.remove(path)
+        removed += 1
+    if removed:
+        print(f"Removed {removed} packs from {ASSETS_DIR} (now loose images)")
+
+
+def render_plan(doc, plan, output_dir, previous, pdf_sha, force=False, trim=False):
+    """Render the planned images that are out of date; prune stale outputs.
+
+    plan:     {filename: segments}
+    previous: the exam's manifest entry from the last run (or None)
+    trim:     trim the images to their ink (unless --no-trim)
+    Returns (outputs, rendered, skipped, removed) where outputs is the new
+    manifest 'outputs' mapping.
+    """
+    previous = previous or {}
+    prev_outputs = previous.get('outputs', {})
+    settings_ok = (not force and previous.get('pdf_sha256') == pdf_sha and
+                   all(previous.get(k) == v for k, v in render_settings().items()))
+
+    def intact(variant):
+        path = os.path.join(output_dir, variant['file'])
+        return os.path.exists(path) and file_sha256(path) == variant['sha256']
+
+    outputs = {}
+    rendered = skipped = 0
+    cache = PageCache(doc)
+    for name, segments in plan.items():
+        spec = segments_spec(segments)
+        old = prev_outputs.get(name)
+        if (settings_ok and old and old['segments'] == spec and
+                all(intact(v) for v in old['variants'].values())):
+            outputs[name] = old
+            skipped += 1
+            continue
+        variants = {}
+        images = render_tiers(doc, segments, OUTPUT_TIERS, cache)
+        trimmed = trim_tiers(images, TRIM_PADDING) if trim and TRIM_PADDING is not None else images
+        for tier, img in trimmed.items():
+            filename = tier_filename(name, tier)
+            path = os.path.join(output_dir, filename)
+            encoded = save_image(img, path)
+            variants[tier] = {'file': filename, 'width': img.width, 'height': img.height,
+                              'sha256': file_sha256(path), 'encoding': encoded.choice,
+                              'bytes': len(encoded.data),
+                              'baseline_bytes': encoded.baseline_size}
+            if img is not images[tier]:
+                full = images[tier]
+                untrimmed = variants[tier]['untrimmed'] = {'width': full.width,
+                                                           'height': full.height}
+                if REPORT_TRIM_BYTES:
+                    untrimmed['baseline_bytes'] = len(image_encoder.webp_bytes(
+                        full, quality=image_encoder.BASELINE_QUALITY))
+        outputs[name] = {'segments': spec, 'variants': variants}
+        rendered += 1
+
+    if rendered:
+        print(f"  {cache.stats()}")
+
+    # Only delete files an earlier run generated; hand-made assets stay
+    keep = {v['file'] for v in output_variants(outputs)}
+    removed = 0
+    for variant in output_variants(prev_outputs):
+        path = os.path.join(output_dir, variant['file'])
+        if variant['file'] not in keep and os.path.exists(path):
+            os.remove(path)
+            removed += 1
+
+    return outputs, rendered, skipped, removed
+
+
+def process_exam(exam, previous=None, force=False):
+    """Process a single exam: extract question and answer images.
+
+    previous is the exam's manifest entry from the last run; images whose
+    entry is still valid are skipped. Returns (image_count, manifest_entry).
+    """
     exam_id = exam['id']
     year = exam['year']
     month = exam['month']
 
-    pdf_path = get_pdf_for_exam(year, month)
+    pdf_path = pdf_for_exam(exam_id)
     if not pdf_path:
         print(f"  No PDF found")
-        return 0
+        return 0, previous
 
     output_dir = os.path.join(OUTPUT_DIR, exam_id)
     os.makedirs(output_dir, exist_ok=True)
 
+    pdf_sha = file_sha256(pdf_path)
     doc = fitz.open(pdf_path)
     print(f"  PDF: {os.path.basename(pdf_path)} ({doc.page_count} pages)")
 
-    if is_scanned_pdf(doc):
-        print(f"  Scanned PDF - saving page images")
-        mat = fitz.Matrix(DPI / 72, DPI / 72)
-        count = doc.page_count
-        for page_idx in range(count):
-            pix = doc[page_idx].get_pixmap(matrix=mat)
-            img = Image.open(io.BytesIO(pix.tobytes("png")))
-            path = os.path.join(output_dir, f"page{page_idx + 1}.webp")
-            img.save(path, "WebP", quality=WEBP_QUALITY)
+    def finish(plan, count, trim=False):
+        outputs, rendered, skipped, removed = render_plan(
+            doc, plan, output_dir, previous, pdf_sha, force, trim)
+        print(f"  Rendered {rendered}, up to date {skipped}, removed {removed}")
+        size, baseline = encoding_savings(outputs)
+        if baseline:
+            choices = defaultdict(int)
+            for variant in output_variants(outputs):
+                choices[variant['encoding']] += 1
+            print(f"  Encoded {size/1024:.0f}K (fixed q{image_encoder.BASELINE_QUALITY}: "
+                  f"{baseline/1024:.0f}K), saved {(baseline - size)/1024:.0f}K "
+                  f"({1 - size/baseline:.0%}); "
+                  + ", ".join(f"{c} {n}" for c, n in sorted(choices.items())))
+        pixels, full_pixels, trimmed_bytes, full_bytes = trim_savings(outputs)
+        if full_pixels:
+            print(f"  Trimmed to {pixels/1e6:.1f} of {full_pixels/1e6:.1f} Mpx "
+                  f"({1 - pixels/full_pixels:.0%} saved)"
+                  + (f"; fixed q{image_encoder.BASELINE_QUALITY}: "
+                     f"{trimmed_bytes/1024:.0f}K instead of {full_bytes/1024:.0f}K, saved "
+                     f"{(full_bytes - trimmed_bytes)/1024:.0f}K" if full_bytes else ""))
         doc.close()
-        return count
-
-    # Determine page ranges
-    answer_page, is_gruppe_b_only = find_answer_key_page(doc)
-    gruppe_b_page = find_gruppe_b_page(doc)
-
-    questions_end = doc.page_count
-    if answer_page is not None:
-        questions_end = min(questions_end, answer_page)
-    if gruppe_b_page is not None:
-        questions_end = min(questions_end, gruppe_b_page)
+        if PACK_DIR:
+            files, size = write_pack(exam_id, output_dir, outputs)
+            print(f"  Packed {files} images into {pack_name(exam_id)} ({size/1024:.0f}K)")
+        entry = {'pdf': os.path.basename(pdf_path), 'pdf_sha256': pdf_sha,
+                 'outputs': outputs, **render_settings()}
+        return count, entry
+
+    if page_types.is_scanned(pdf_path):
+        print(f"  Scanned PDF - saving page images")
+        blank = set(page_types.pages_of_type(pdf_path, page_types.BLANK))
+        plan = {f"page{page_idx + 1}.webp": [(page_idx, None)]
+                for page_idx in range(doc.page_count) if page_idx not in blank}
+        return finish(plan, len(plan))
+
+    # Page ranges and question positions from the layout index
+    layout = get_layout(pdf_path)
+    answer_key = layout['answer_key']
+    answer_page = answer_key['page'] if answer_key else None
+    gruppe_b_page = layout['gruppe_b_page']
+    questions_end = layout['questions_end']
 
     answer_info = ""
     if answer_page is not None:
         answer_info = f", answer key: page {answer_page}"
-        if is_gruppe_b_only:
+        if answer_key['gruppe_b_only']:
             answer_info += " (GRUPPE B - skipping!)"
     print(f"  Question pages: 0-{questions_end - 1}" + answer_info +
           (f", Gruppe B starts: page {gruppe_b_page}" if gruppe_b_page else ""))
 
-    # Find and extract question images
-    questions = find_questions_on_pages(doc, questions_end)
+    questions = question_positions(layout)
     print(f"  Found {len(questions)} questions: {sorted(questions.keys())}")
 
-    q_count = 0
+    plan = {}
     for n in range(1, 29):
-        path = os.path.join(output_dir, f"q{n}.webp")
-        if extract_question_image(doc, questions, n, path):
-            q_count += 1
+        if n in layout['questions']:
+            plan[f"q{n}.webp"] = layout_segments(layout['questions'][n]['segments'])
+    q_count = len(plan)
 
     # Extract answer key - always save full page
     if answer_page is not None:
-        extract_answer_key_full_page(doc, answer_page, output_dir)
-        print(f"  Saved full answer key page")
+        plan["answer_key.webp"] = layout_segments([[answer_page, answer_key['clip']]])
+        print(f"  Planned full answer key page")
     else:
         print(f"  No answer key page found")
 
     print(f"  Result: {q_count} question images")
-    doc.close()
-    return q_count
+    return finish(plan, q_count, trim=True)
+
+
+def configure(dpi, output_dir, encoder="adaptive", min_ssim=None, min_psnr=None,
+              tiers=None, pack=False, page_cache_mb=None, trim_padding=TRIM_PADDING,
+              report_trim=False):
+    """Set resolution, output directory, encoder, tiers, packing, page cache size and trimming (also in workers)."""
+    global DPI, OUTPUT_DIR, MANIFEST_PATH, INDEX_PATH, ENCODER, ENCODER_PROFILES, OUTPUT_TIERS
+    global PACK_DIR, PAGE_CACHE_BYTES, TRIM_PADDING, REPORT_TRIM_BYTES
+    DPI = dpi
+    TRIM_PADDING = trim_padding
+    REPORT_TRIM_BYTES = report_trim
+    if page_cache_mb is not None:
+        PAGE_CACHE_BYTES = page_cache_mb * 1024 * 1024
+    OUTPUT_DIR = output_dir
+    PACK_DIR = ASSETS_DIR if pack else None
+    MANIFEST_PATH = manifest_path(output_dir)
+    INDEX_PATH = os.path.join(PACK_DIR or output_dir, "index.json")
+    OUTPUT_TIERS = [t for t in TIERS if t == '1x' or t in (tiers or DEFAULT_TIERS)]
+    ENCODER = encoder
+    ENCODER_PROFILES = image_encoder.profiles(min_ssim, min_psnr)
+
+
+def run_exam(job):
+    """Process one exam, capturing its log so parallel output stays ordered.
+
+    job is (exam, previous_manifest_entry, force).
+    Returns (exam_id, image_count, manifest_entry, log_text, seconds).
+    """
+    exam, previous, force = job
+    buf = io.StringIO()
+    start = time.perf_counter()
+    with contextlib.redirect_stdout(buf):
+        print(f"\n{'='*50}")
+        print(f"Processing {exam['id']}...")
+        count, entry = process_exam(exam, previous, force)
+    return exam['id'], count, entry, buf.getvalue(), time.perf_counter() - start
 
 
 def main():
-    with open(EXAMS_JSON) as f:
-        exams = json.load(f)
+    parser = argparse.ArgumentParser(description="Extract question/answer images from exam PDFs.")
+    parser.add_argument('--jobs', type=int, default=1,
+                        help="number of exams to process in parallel (default: 1)")
+    parser.add_argument('--force', action='store_true',
+                        help="ignore the build manifest and re-render everything")
+    parser.add_argument('--dpi', type=int, default=DPI,
+                        help=f"render resolution (default: {DPI})")
+    parser.add_argument('--output',
+                        help=f"output directory (default: {ASSETS_DIR}, "
+                             f"with --pack: {PACK_BUILD_DIR})")
+    parser.add_argument('--encoder', choices=("adaptive", "fixed"), default=ENCODER,
+                        help=f"WebP encoding strategy (default: {ENCODER}); adaptive tries "
+                             "grayscale and lossy candidates until one meets the thresholds "
+                             "(usually two or three encodes, each checked by SSIM/PSNR), "
+                             "so a full run takes about 4x as long as with fixed; use "
+                             "fixed for quick development runs")
+    parser.add_argument('--min-ssim', type=float,
+                        help="minimum SSIM for the adaptive encoder (all asset classes)")
+    parser.add_argument('--min-psnr', type=float,
+                        help="minimum PSNR in dB for the adaptive encoder (all asset classes)")
+    parser.add_argument('--tiers', default=",".join(DEFAULT_TIERS),
+                        help=f"comma-separated output tiers of {','.join(TIERS)} "
+                             f"(default: {','.join(DEFAULT_TIERS)}; 2x doubles the APK images)")
+    parser.add_argument('--pack', action='store_true',
+                        help=f"write one image pack per exam to {ASSETS_DIR}")
+    parser.add_argument('--page-cache-mb', type=int, default=PAGE_CACHE_BYTES // (1024 * 1024),
+                        help="memory budget of the page cache per process in MB "
+                             f"(default: {PAGE_CACHE_BYTES // (1024 * 1024)})")
+    parser.add_argument('--trim-padding', type=int, default=TRIM_PADDING,
+                        help="white border in 1x pixels kept around the ink of question and "
+                             f"answer key images (default: {TRIM_PADDING})")
+    parser.add_argument('--no-trim', action='store_true',
+                        help="keep question and answer key images at full page width")
+    parser.add_argument('--report-trim', action='store_true',
+                        help="also report the bytes trimming saves (one extra encode per image)")
+    args = parser.parse_args()
+    tiers = [t.strip() for t in args.tiers.split(",") if t.strip()]
+    unknown = [t for t in tiers if t not in TIERS]
+    if unknown:
+        parser.error(f"unknown tier(s) {', '.join(unknown)}; available: {', '.join(TIERS)}")
+    output = args.output or (PACK_BUILD_DIR if args.pack else ASSETS_DIR)
+    if args.pack and os.path.abspath(output) == os.path.abspath(ASSETS_DIR):
+        parser.error("--pack needs an --output directory outside the app assets")
+    settings = (args.dpi, output, args.encoder, args.min_ssim, args.min_psnr, tiers, args.pack,
+                args.page_cache_mb, None if args.no_trim else args.trim_padding, args.report_trim)
+    configure(*settings)
+
+    exams = load_corpus().exams
 
     os.makedirs(OUTPUT_DIR, exist_ok=True)
+    if PACK_DIR:
+        os.makedirs(PACK_DIR, exist_ok=True)
+        remove_loose_assets()
+    elif os.path.abspath(OUTPUT_DIR) == os.path.abspath(ASSETS_DIR):
+        remove_packs()
+    manifest = load_manifest()
+    previous_entries = manifest['exams']
 
     total_images = 0
-    for exam in exams:
-        print(f"\n{'='*50}")
-        print(f"Processing {exam['id']}...")
-        total_images += process_exam(exam)
+    exam_times = {}
+    entries = {}
+    jobs = [(exam, previous_entries.get(exam['id']), args.force) for exam in exams]
+    wall_start = time.perf_counter()
+    if args.jobs > 1:
+        # map() yields in submission order, so logs print in exam order
+        with ProcessPoolExecutor(max_workers=args.jobs, initializer=configure,
+                                 initargs=settings) as pool:
+            for exam_id, count, entry, log, seconds in pool.map(run_exam, jobs):
+                sys.stdout.write(log)
+                sys.stdout.flush()
+                total_images += count
+                exam_times[exam_id] = seconds
+                entries[exam_id] = entry
+    else:
+        for exam, previous, force in jobs:
+            start = time.perf_counter()
+            print(f"\n{'='*50}")
+            print(f"Processing {exam['id']}...")
+            count, entry = process_exam(exam, previous, force)
+            total_images += count
+            exam_times[exam['id']] = time.perf_counter() - start
+            entries[exam['id']] = entry
+    wall_time = time.perf_counter() - wall_start
+
+    # Exams dropped from exams.json: remove the images we generated for them
+    for exam_id, entry in previous_entries.items():
+        if exam_id in entries:
+            continue
+        for variant in output_variants(entry.get('outputs', {})):
+            path = os.path.join(OUTPUT_DIR, exam_id, variant['file'])
+            if os.path.exists(path):
+                os.remove(path)
+        print(f"Removed generated images of dropped exam {exam_id}")
+    if PACK_DIR:
+        for name in os.listdir(PACK_DIR):
+            if name.endswith(".pack") and name[:-len(".pack")] not in entries:
+                os.remove(os.path.join(PACK_DIR, name))
+                print(f"Removed pack of dropped exam {name}")
+
+    manifest['exams'] = {eid: e for eid, e in entries.items() if e is not None}
+    save_manifest(manifest)
+    save_index(manifest)
 
     # Summary
     total_size = 0
@@ -456,19 +1023,43 @@ def main():
         dir_path = os.path.join(OUTPUT_DIR, exam_dir)
         if os.path.isdir(dir_path):
             files = [f for f in os.listdir(dir_path) if f.endswith('.webp')]
-            q_files = [f for f in files if f.startswith('q')]
+            q_files = [f for f in files if f.startswith('q') and '@' not in f]
             a_files = [f for f in files if re.match(r'a\d+\.webp$', f)]
             dir_size = sum(os.path.getsize(os.path.join(dir_path, f)) for f in files)
             total_size += dir_size
             exam_stats.append((exam_dir, len(q_files), len(a_files), dir_size))
 
-    print(f"\n{'='*60}")
-    print(f"{'Exam':<20} {'Questions':>10} {'Answers':>10} {'Size':>10}")
-    print(f"{'-'*60}")
+    saved = {eid: encoding_savings(e.get('outputs', {}))
+             for eid, e in manifest['exams'].items()}
+    print(f"\n{'='*80}")
+    print(f"{'Exam':<20} {'Questions':>10} {'Answers':>10} {'Size':>10} {'Saved':>9} {'Time':>9}")
+    print(f"{'-'*80}")
     for eid, qc, ac, sz in exam_stats:
-        print(f"{eid:<20} {qc:>10} {ac:>10} {sz/1024:>9.0f}K")
-    print(f"{'-'*60}")
-    print(f"{'TOTAL':<20} {sum(s[1] for s in exam_stats):>10} {sum(s[2] for s in exam_stats):>10} {total_size/1024/1024:>8.1f}M")
+        t = f"{exam_times[eid]:.1f}s" if eid in exam_times else "-"
+        size, baseline = saved.get(eid, (0, 0))
+        sv = f"{(baseline - size)/1024:.0f}K" if baseline else "-"
+        print(f"{eid:<20} {qc:>10} {ac:>10} {sz/1024:>9.0f}K {sv:>9} {t:>9}")
+    print(f"{'-'*80}")
+    size = sum(v[0] for v in saved.values())
+    baseline = sum(v[1] for v in saved.values())
+    print(f"{'TOTAL':<20} {sum(s[1] for s in exam_stats):>10} {sum(s[2] for s in exam_stats):>10} "
+          f"{total_size/1024/1024:>8.1f}M {(baseline - size)/1024/1024:>8.1f}M {wall_time:>8.1f}s")
+    if baseline:
+        print(f"Generated images: {size/1024/1024:.1f}M, {baseline/1024/1024:.1f}M with fixed "
+              f"quality {image_encoder.BASELINE_QUALITY} ({1 - size/baseline:.0%} saved)")
+    trim = [sum(t) for t in zip(*(trim_savings(e.get('outputs', {}))
+                                  for e in manifest['exams'].values()))]
+    if trim and trim[1]:
+        print(f"Trimmed images: {trim[0]/1e6:.1f} of {trim[1]/1e6:.1f} Mpx "
+              f"({1 - trim[0]/trim[1]:.0%} saved)"
+              + (f", fixed quality {image_encoder.BASELINE_QUALITY} "
+                 f"{trim[2]/1024/1024:.1f}M instead of {trim[3]/1024/1024:.1f}M" if trim[3] else ""))
+    if PACK_DIR:
+        packs = [f for f in os.listdir(PACK_DIR) if f.endswith(".pack")]
+        pack_size = sum(os.path.getsize(os.path.join(PACK_DIR, f)) for f in packs)
+        print(f"Packs: {len(packs)} files, {pack_size/1024/1024:.1f}M in {PACK_DIR}")
+    print(f"Wall time {wall_time:.1f}s with {args.jobs} job(s), "
+          f"sum of exam times {sum(exam_times.values()):.1f}s")
 
 
 if __name__ == "__main__":
@@ -1,9 +1,9 @@
 #!/usr/bin/env python3
 """Fix the 2002-october exam: add question texts, statements, and fix corrupted options."""
 
-import json
+import copy
 
-EXAMS_PATH = "app/src/main/assets/exams.json"
+from corpus import load_corpus
 
 # Full questions transcribed from Oktober-2002.pdf
 QUESTIONS_2002_OCT = [
@@ -529,22 +529,25 @@ QUESTIONS_2002_OCT = [
     }
 ]
 
-def main():
-    with open(EXAMS_PATH, "r", encoding="utf-8") as f:
-        exams = json.load(f)
-
-    for exam in exams:
-        if exam["id"] == "2002-october":
-            exam["questions"] = QUESTIONS_2002_OCT
-            print(f"Replaced 2002-october: {len(QUESTIONS_2002_OCT)} questions")
-            break
-    else:
+def apply_fixes(corpus):
+    """Replace 2002-october in a loaded corpus. Returns False if it is missing."""
+    exam = corpus.exam("2002-october")
+    if exam is None:
         print("ERROR: 2002-october not found!")
+        return False
+    exam["questions"] = copy.deepcopy(QUESTIONS_2002_OCT)
+    print(f"Replaced 2002-october: {len(QUESTIONS_2002_OCT)} questions")
+    return True
+
+def main():
+    corpus = load_corpus()
+    if not apply_fixes(corpus):
         return
 
-    with open(EXAMS_PATH, "w", encoding="utf-8") as f:
-        json.dump(exams, f, ensure_ascii=False, indent=2)
-    print("Saved.")
+    if corpus.save():
+        print("Saved.")
+    else:
+        print("Already up to date, nothing saved.")
 
 if __name__ == "__main__":
     main()
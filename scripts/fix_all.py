@@ -9,14 +9,22 @@
 7. Fix 4-option questions missing 5th option
 """
 
-import json
+import itertools
 import re
-import fitz
-import os
 import sys
 
-EXAMS_JSON = "app/src/main/assets/exams.json"
-FRAGEN_DIR = "fragen"
+from corpus import Question, load_corpus
+from pdf_catalog import pdf_for_exam
+from pdf_text import find_gruppe_b_page, get_page_texts, get_text, iter_pages
+from pdf_tokens import OPTION, option_sequences, tokenize
+
+
+# Cleanup of extracted question/option text
+NEWLINE_RE = re.compile(r'\s*\n\s*')
+SPACES_RE = re.compile(r'\s+')
+BLANK_LINE_RE = re.compile(r'\n\s*\n')
+PAGE_HEADER_RE = re.compile(r'Heilpraktiker.*?Gruppe [AB]\s*\d*')
+INSTRUCTION_RE = re.compile(r'\s*W.hlen Sie.*?Antwort.*?!?\s*$')
 
 
 # ===== ANSWER KEYS (from fix_exams.py) =====
@@ -76,29 +84,19 @@ def build_answer_keys():
 
 
 # ===== PDF TEXT EXTRACTION =====
-def get_pdf_text(pdf_path):
-    doc = fitz.open(pdf_path)
-    text = ""
-    for page in doc:
-        text += page.get_text() + "\n"
-    doc.close()
+def clean_pdf_text(text):
     return text.replace('\xa0', ' ').replace('\x01', '').replace('\x02', '')
 
 
+def get_pdf_text(pdf_path):
+    return clean_pdf_text(get_text(pdf_path, "fitz"))
+
+
 def extract_questions_from_pdf(text):
     """Extract all questions from PDF text."""
     questions = {}
-    q_starts = list(re.finditer(
-        r'(?:^|\n)\s*(\d{1,2})\s+(Einfachauswahl|Aussage\s*n?\s*kombination|Mehrfachauswahl(?:aufgabe)?)', text))
-    q_starts2 = list(re.finditer(
-        r'(?:^|\n)\s*(\d{1,2})\s*\n\s*(Einfachauswahl|Aussage\s*n?\s*kombination|Mehrfachauswahl(?:aufgabe)?)', text))
-
-    all_starts = {}
-    for m in q_starts + q_starts2:
-        num = int(m.group(1))
-        if 1 <= num <= 28:
-            if num not in all_starts or m.start() < all_starts[num][0]:
-                all_starts[num] = (m.start(), m.end(), m.group(2))
+    stream = tokenize(text)
+    all_starts = stream.question_starts()
 
     sorted_nums = sorted(all_starts.keys())
     for i, qnum in enumerate(sorted_nums):
@@ -110,60 +108,57 @@ def extract_questions_from_pdf(text):
         if 'ombination' in qtype and qtype != 'Aussagenkombination':
             qtype = 'Aussagenkombination'
 
-        # Extract options
+        # Extract options (offsets relative to q_region; a marker ends after
+        # the whitespace that follows "A)")
         options = []
-        for fmt in [r'([A-E])\)\s', r'([A-E])\.\s']:
-            opt_matches = list(re.finditer(fmt, q_region))
+        for delim in ')', '.':
+            opt_matches = stream.markers(end, next_start, OPTION, delim, spaced=True)
             if len(opt_matches) >= 5:
                 for j in range(len(opt_matches) - 4):
-                    letters = [m.group(1) for m in opt_matches[j:j+5]]
+                    letters = [t.key for t in opt_matches[j:j+5]]
                     if letters == ['A', 'B', 'C', 'D', 'E']:
                         for k in range(5):
-                            m = opt_matches[j+k]
+                            m_end = opt_matches[j+k].end + 1 - end
                             if k+1 < 5:
-                                opt_end = opt_matches[j+k+1].start()
+                                opt_end = opt_matches[j+k+1].start - end
                             else:
-                                remaining = q_region[m.end():m.end()+500]
+                                remaining = q_region[m_end:m_end+500]
                                 skip = 0
                                 while skip < len(remaining) and remaining[skip] in ' \n\t\r':
                                     skip += 1
-                                end_m = re.search(r'\n\s*\n', remaining[skip:])
-                                opt_end = m.end() + skip + (end_m.start() if end_m else min(300, len(remaining) - skip))
-                            opt_text = q_region[m.end():opt_end].strip()
-                            opt_text = re.sub(r'\s*\n\s*', ' ', opt_text)
-                            opt_text = re.sub(r'\s+', ' ', opt_text)
-                            opt_text = re.sub(r'Heilpraktiker.*?Gruppe [AB]\s*\d*', '', opt_text).strip()
+                                end_m = BLANK_LINE_RE.search(remaining, skip)
+                                opt_end = m_end + skip + (end_m.start() - skip if end_m else min(300, len(remaining) - skip))
+                            opt_text = q_region[m_end:opt_end].strip()
+                            opt_text = NEWLINE_RE.sub(' ', opt_text)
+                            opt_text = SPACES_RE.sub(' ', opt_text)
+                            opt_text = PAGE_HEADER_RE.sub('', opt_text).strip()
                             options.append(opt_text)
                         break
                 if options:
                     break
 
         # Extract statements and text
-        first_opt = None
-        for fmt in [r'[A-E]\)\s', r'[A-E]\.\s']:
-            m = re.search(fmt, q_region)
-            if m and (first_opt is None or m.start() < first_opt):
-                first_opt = m.start()
+        spaced = stream.markers(end, next_start, OPTION, spaced=True)
+        first_opt = spaced[0].start - end if spaced else None
         pre_opts = q_region[:first_opt] if first_opt else q_region
 
         statements = []
         q_text = ""
         if qtype == 'Aussagenkombination':
-            stmt_matches = list(re.finditer(r'(?:^|\n)\s*(\d)[.)]\s*(.*?)(?=\n\s*\d[.)]\s|\n\s*[A-E][.)]\s|\Z)',
-                                           pre_opts, re.DOTALL))
+            stmt_matches = stream.numbered_blocks(end, end + len(pre_opts))
             if stmt_matches:
-                q_text = pre_opts[:stmt_matches[0].start()].strip()
+                q_text = pre_opts[:stmt_matches[0].start - end].strip()
                 for sm in stmt_matches:
-                    statements.append(re.sub(r'\s+', ' ', sm.group(2).strip()))
+                    statements.append(SPACES_RE.sub(' ', text[sm.body_start:sm.body_end].strip()))
             else:
                 q_text = pre_opts.strip()
         else:
             q_text = pre_opts.strip()
 
-        q_text = re.sub(r'\s*\n\s*', ' ', q_text)
-        q_text = re.sub(r'\s+', ' ', q_text)
-        q_text = re.sub(r'Heilpraktiker.*?Gruppe [AB]\s*\d*', '', q_text).strip()
-        q_text = re.sub(r'\s*W.hlen Sie.*?Antwort.*?!?\s*$', '', q_text).strip()
+        q_text = NEWLINE_RE.sub(' ', q_text)
+        q_text = SPACES_RE.sub(' ', q_text)
+        q_text = PAGE_HEADER_RE.sub('', q_text).strip()
+        q_text = INSTRUCTION_RE.sub('', q_text).strip()
 
         questions[qnum] = {'type': qtype, 'text': q_text, 'statements': statements, 'options': options}
 
@@ -173,47 +168,23 @@ def extract_questions_from_pdf(text):
 def find_option_blocks(text):
     """Find A-E option blocks for bulk extraction."""
     blocks = []
-    a_paren = len(re.findall(r'\bA\)\s', text))
-    a_dot = len(re.findall(r'\bA\.\s', text))
-    if a_paren >= a_dot:
-        marker_re = lambda l: re.compile(r'\b' + l + r'\)\s')
-    else:
-        marker_re = lambda l: re.compile(r'\b' + l + r'\.\s')
-
-    for a_start, a_end in [(m.start(), m.end()) for m in marker_re('A').finditer(text)]:
-        search = text[a_start:a_start+4000]
-        markers = [('A', 0, a_end-a_start)]
-        pos = a_end-a_start
-        ok = True
-        for letter in 'BCDE':
-            m = marker_re(letter).search(search, pos)
-            if m:
-                markers.append((letter, m.start(), m.end()))
-                pos = m.end()
-            else:
-                ok = False
-                break
-        if not ok:
-            continue
-        if any(markers[i+1][1]-markers[i][1] > 800 for i in range(4)):
-            continue
-
+    for a_start, markers, limit in option_sequences(text):
         options = []
-        for k, (_, ms, me) in enumerate(markers):
+        for k, (ms, me) in enumerate(markers):
             if k+1 < 5:
-                oe = markers[k+1][1]
+                oe = markers[k+1][0]
             else:
-                remaining = search[me:me+500]
+                remaining = text[me:min(me+500, limit)]
                 # Skip initial whitespace to avoid matching immediately
                 skip = 0
                 while skip < len(remaining) and remaining[skip] in ' \n\t\r':
                     skip += 1
-                end_m = re.search(r'\n\s*\n', remaining[skip:])
-                oe = me + skip + (end_m.start() if end_m else min(300, len(remaining) - skip))
-            ot = search[me:oe].strip()
-            ot = re.sub(r'\s*\n\s*', ' ', ot)
-            ot = re.sub(r'\s+', ' ', ot)
-            ot = re.sub(r'Heilpraktiker.*?Gruppe [AB]\s*\d*', '', ot).strip()
+                end_m = BLANK_LINE_RE.search(remaining, skip)
+                oe = me + skip + (end_m.start() - skip if end_m else min(300, len(remaining) - skip))
+            ot = text[me:oe].strip()
+            ot = NEWLINE_RE.sub(' ', ot)
+            ot = SPACES_RE.sub(' ', ot)
+            ot = PAGE_HEADER_RE.sub('', ot).strip()
             options.append(ot)
 
         if all(o.strip() for o in options) and len(options) == 5:
@@ -248,37 +219,17 @@ def associate_blocks(text, blocks):
     return questions
 
 
-def get_pdf_for_exam(year, month):
-    month_de = "Maerz" if month == "March" else "Oktober"
-    for pattern in [
-        f"{month_de}-{year}.pdf",
-        f"HPP_Pruefung_{month_de}_{year}_mit_Loesungen_.pdf",
-        f"HPP_Pruefung_{month_de}_{year}_mit_Loesungen.pdf",
-        f"HPP_Pruefung_{month_de}_{year}_.pdf",
-        f"HPP_Pruefung_{month_de}_{year}_mit_Loesungen_A_B.pdf",
-        f"HPP_Pruefung_{month_de}_{year}_Gruppe_A_mit_Loesungen.pdf",
-    ]:
-        path = os.path.join(FRAGEN_DIR, pattern)
-        if os.path.exists(path):
-            return path
-    return None
-
-
-def get_gruppe_section(text, gruppe):
+def get_gruppe_section(pdf_path, gruppe):
+    """Cleaned PDF text of the Gruppe A or B section (all text if there is none)."""
+    # Lazy pages: the search stops at the Gruppe B page
+    gruppe_b = find_gruppe_b_page(iter_pages(pdf_path))
+    if not gruppe_b:
+        return get_pdf_text(pdf_path)
     if gruppe == 'A':
-        # Return text before Gruppe B starts (if any)
-        b_matches = list(re.finditer(r'Gruppe\s*B', text))
-        for m in b_matches:
-            if m.start() > len(text) * 0.3:
-                return text[:m.start()]
-        return text
+        pages = itertools.islice(iter_pages(pdf_path), gruppe_b)
     else:
-        # Return text from Gruppe B start
-        b_matches = list(re.finditer(r'Gruppe\s*B', text))
-        for m in b_matches:
-            if m.start() > len(text) * 0.3:
-                return text[m.start():]
-        return text
+        pages = get_page_texts(pdf_path, "fitz")[gruppe_b:]
+    return clean_pdf_text("".join(page + "\n" for page in pages))
 
 
 def has_empty_options(q):
@@ -286,11 +237,14 @@ def has_empty_options(q):
     return not opts or all(o == '' for o in opts)
 
 
-# ===== MAIN =====
-def main():
-    with open(EXAMS_JSON, 'r') as f:
-        exams = json.load(f)
-    print(f"Loaded {len(exams)} exams")
+# ===== FIXES =====
+def apply_fixes(corpus):
+    """Run fix steps 1-7 on a loaded corpus (in memory, no save)."""
+    exams = corpus.exams
+
+    def exam_questions(eid):
+        exam = corpus.exam(eid)
+        return exam['questions'] if exam else []
 
     # 1. Remove duplicate exams
     seen = set()
@@ -445,7 +399,7 @@ def main():
         if not empty_qs:
             continue
 
-        pdf_path = get_pdf_for_exam(exam['year'], exam['month'])
+        pdf_path = pdf_for_exam(exam['id'])
         if not pdf_path:
             continue
 
@@ -500,7 +454,7 @@ def main():
         if not missing_stmts:
             continue
 
-        pdf_path = get_pdf_for_exam(exam['year'], exam['month'])
+        pdf_path = pdf_for_exam(exam['id'])
         if not pdf_path:
             continue
 
@@ -541,7 +495,7 @@ def main():
         if len(existing_ids) >= 28:
             continue
 
-        pdf_path = get_pdf_for_exam(exam['year'], exam['month'])
+        pdf_path = pdf_for_exam(exam['id'])
         if not pdf_path:
             continue
 
@@ -618,44 +572,40 @@ def main():
 
     def fix_q(eid, qid, options=None, add_option=None, insert_option=None):
         nonlocal manual_fixes
-        for e in exams:
-            if e['id'] == eid:
-                for q in e['questions']:
-                    if q['id'] == qid:
-                        if options:
-                            q['options'] = options
-                            manual_fixes += 1
-                        if add_option and len(q.get('options', [])) < 5:
-                            q['options'].append(add_option)
-                            manual_fixes += 1
-                        if insert_option is not None and len(q.get('options', [])) < 5:
-                            q['options'].insert(0, insert_option)
-                            manual_fixes += 1
-                        return
+        q = corpus.question(eid, qid)
+        if q is None:
+            return
+        if options:
+            q['options'] = options
+            manual_fixes += 1
+        if add_option and len(q.get('options', [])) < 5:
+            q['options'].append(add_option)
+            manual_fixes += 1
+        if insert_option is not None and len(q.get('options', [])) < 5:
+            q['options'].insert(0, insert_option)
+            manual_fixes += 1
 
     # Fix 2019-March Q1 (missing E option)
     fix_q('2019-march', 1, add_option="Die Blutwerte zeigen bei Demenz spezifische Ver\u00e4nderungen")
     # Fix 2019-March Q2 (garbled text with embedded option, merged statements)
-    for e in exams:
-        if e['id'] == '2019-march':
-            for q in e['questions']:
-                if q['id'] == 2:
-                    q['text'] = "Welche der folgenden Aussagen trifft (treffen) zu? Negativsymptome eines schizophrenen Residuums ist/sind:"
-                    q['statements'] = [
-                        "Psychomotorische Verlangsamung",
-                        "Affektverflachung",
-                        u"Passivit\u00e4t und Initiativemangel",
-                        "Akustische und optische Halluzinationen",
-                        "Negativismus"
-                    ]
-                    q['options'] = [
-                        "Nur die Aussage 5 ist richtig",
-                        "Nur die Aussagen 1 und 4 sind richtig",
-                        "Nur die Aussagen 1, 2 und 3 sind richtig",
-                        "Nur die Aussagen 1, 2, 3 und 5 sind richtig",
-                        "Alle Aussagen sind richtig"
-                    ]
-                    manual_fixes += 1
+    for q in exam_questions('2019-march'):
+        if q['id'] == 2:
+            q['text'] = "Welche der folgenden Aussagen trifft (treffen) zu? Negativsymptome eines schizophrenen Residuums ist/sind:"
+            q['statements'] = [
+                "Psychomotorische Verlangsamung",
+                "Affektverflachung",
+                u"Passivit\u00e4t und Initiativemangel",
+                "Akustische und optische Halluzinationen",
+                "Negativismus"
+            ]
+            q['options'] = [
+                "Nur die Aussage 5 ist richtig",
+                "Nur die Aussagen 1 und 4 sind richtig",
+                "Nur die Aussagen 1, 2 und 3 sind richtig",
+                "Nur die Aussagen 1, 2, 3 und 5 sind richtig",
+                "Alle Aussagen sind richtig"
+            ]
+            manual_fixes += 1
     # Fix 2024-March Q7, Q8, Q9 (missing E option)
     for qid in [7, 8, 9]:
         fix_q('2024-march', qid, add_option="Alle Aussagen sind richtig.")
@@ -679,19 +629,17 @@ def main():
         "Die Verhaltenstherapie ist stets direktiv ausgerichtet, das zugrunde liegende Problem wird vom Behandler erarbeitet und von ihm gesteuert bearbeitet."
     ])
     # Fix 2024-March Q12 (garbled text, truncated statements)
-    for e in exams:
-        if e['id'] == '2024-march':
-            for q in e['questions']:
-                if q['id'] == 12:
-                    q['text'] = "Welche Aussagen zu organisch bedingten psychischen St\u00f6rungen sind richtig?"
-                    q['statements'] = [
-                        "Bei den organisch bedingten psychischen St\u00f6rungen unterscheiden wir akute von chronischen Erkrankungen",
-                        "Nur die chronisch organisch bedingten psychischen St\u00f6rungen gehen mit einer Bewusstseinsst\u00f6rung einher",
-                        "Akute organisch bedingte psychische St\u00f6rungen k\u00f6nnen durch Drogen oder Arzneimittel ausgel\u00f6st werden",
-                        "Bei einer akuten organisch bedingten psychischen St\u00f6rung handelt es sich immer um einen Notfall",
-                        "Krankheitszeichen einer auf Dauer bestehenden organisch bedingten psychischen St\u00f6rung sind z.B. Ged\u00e4chtnis- und Orientierungsst\u00f6rungen"
-                    ]
-                    manual_fixes += 1
+    for q in exam_questions('2024-march'):
+        if q['id'] == 12:
+            q['text'] = "Welche Aussagen zu organisch bedingten psychischen St\u00f6rungen sind richtig?"
+            q['statements'] = [
+                "Bei den organisch bedingten psychischen St\u00f6rungen unterscheiden wir akute von chronischen Erkrankungen",
+                "Nur die chronisch organisch bedingten psychischen St\u00f6rungen gehen mit einer Bewusstseinsst\u00f6rung einher",
+                "Akute organisch bedingte psychische St\u00f6rungen k\u00f6nnen durch Drogen oder Arzneimittel ausgel\u00f6st werden",
+                "Bei einer akuten organisch bedingten psychischen St\u00f6rung handelt es sich immer um einen Notfall",
+                "Krankheitszeichen einer auf Dauer bestehenden organisch bedingten psychischen St\u00f6rung sind z.B. Ged\u00e4chtnis- und Orientierungsst\u00f6rungen"
+            ]
+            manual_fixes += 1
     # Fix 2020-October Q18
     fix_q('2020-october', 18, options=[
         "Geschlechtsinkongruenz", "Fetischismus", "Sadismus", "P\u00e4dophilie", "Anorgasmie"])
@@ -709,30 +657,26 @@ def main():
         "Generalisierter Strafreiz",
         "Positive Vermeidung"])
     # Fix 2025-March Q20 (truncated option B)
-    for e in exams:
-        if e['id'] == '2025-march':
-            for q in e['questions']:
-                if q['id'] == 20:
-                    opts = q.get('options', [])
-                    if len(opts) >= 2 and opts[1].endswith(' und ein'):
-                        opts[1] = "Leichtere Gesichtsanomalien wie z.B. eine schmale Oberlippe und ein glattes Philtrum"
-                        manual_fixes += 1
+    for q in exam_questions('2025-march'):
+        if q['id'] == 20:
+            opts = q.get('options', [])
+            if len(opts) >= 2 and opts[1].endswith(' und ein'):
+                opts[1] = "Leichtere Gesichtsanomalien wie z.B. eine schmale Oberlippe und ein glattes Philtrum"
+                manual_fixes += 1
     # Fix 2025-March Q4 (options merged into 1 string)
-    for e in exams:
-        if e['id'] == '2025-march':
-            for q in e['questions']:
-                if q['id'] == 4 and len(q.get('options', [])) == 1:
-                    raw = q['options'][0]
-                    parts = re.split(r'\s*[B-E]\)\s*', raw)
-                    if len(parts) >= 5:
-                        q['options'] = [p.strip() for p in parts[:5]]
-                        manual_fixes += 1
-                if q['id'] == 24 and len(q.get('options', [])) == 1:
-                    raw = q['options'][0]
-                    parts = re.split(r'\s*[B-E]\)\s*', raw)
-                    if len(parts) >= 5:
-                        q['options'] = [p.strip().replace('\xa0', ' ') for p in parts[:5]]
-                        manual_fixes += 1
+    for q in exam_questions('2025-march'):
+        if q['id'] == 4 and len(q.get('options', [])) == 1:
+            raw = q['options'][0]
+            parts = re.split(r'\s*[B-E]\)\s*', raw)
+            if len(parts) >= 5:
+                q['options'] = [p.strip() for p in parts[:5]]
+                manual_fixes += 1
+        if q['id'] == 24 and len(q.get('options', [])) == 1:
+            raw = q['options'][0]
+            parts = re.split(r'\s*[B-E]\)\s*', raw)
+            if len(parts) >= 5:
+                q['options'] = [p.strip().replace('\xa0', ' ') for p in parts[:5]]
+                manual_fixes += 1
 
     # Fix 2011-March Q2, 2013-March Q19, 2013-October Q6, 2017-March Q1, 2005-March extras
     fix_q('2011-march', 2, options=["9 Jahren","61 Jahren","43 Jahren","55 Jahren","22 Jahren"])
@@ -740,69 +684,61 @@ def main():
     fix_q('2013-october', 6, options=["1 Monat","6 Monate","1 Jahr","2 Jahre","5 Jahre"])
 
     # 2013-October Q3 - missing statements
-    for e in exams:
-        if e['id'] == '2013-october':
-            for q in e['questions']:
-                if q['id'] == 3 and not q.get('statements'):
-                    q['statements'] = ["Ataxie", "Desorientierung", "Konfabulationen",
-                                       "Bewusstseinsst\u00f6rungen", "Ged\u00e4chtnisst\u00f6rungen"]
-                    manual_fixes += 1
+    for q in exam_questions('2013-october'):
+        if q['id'] == 3 and not q.get('statements'):
+            q['statements'] = ["Ataxie", "Desorientierung", "Konfabulationen",
+                               "Bewusstseinsst\u00f6rungen", "Ged\u00e4chtnisst\u00f6rungen"]
+            manual_fixes += 1
 
     # 2011-March Q26 - statements use 1) format, PDF extraction may miss them
-    for e in exams:
-        if e['id'] == '2011-march':
-            for q in e['questions']:
-                if q['id'] == 26 and not q.get('statements'):
-                    q['statements'] = [
-                        "St\u00f6rungen im Neurotransmittersystem wirken entscheidend bei der Entstehung affektiver Erkrankungen mit",
-                        "Wichtige Transmitter hei\u00dfen Adrenalin, Noradrenalin und Serotonin",
-                        "Synapse nennt man den Bereich, in dem ein Reiz mittels Neurotransmittern von einer Nervenzelle auf eine andere \u00fcbertragen wird",
-                        "Johanniskraut hat als pflanzliches Medikament keine Wirkung auf das Neurotransmittersystem",
-                        "Ein \u00dcberangebot von Neurotransmittern f\u00fchrt h\u00e4ufig zu vaskul\u00e4rer Demenz"]
-                    manual_fixes += 1
+    for q in exam_questions('2011-march'):
+        if q['id'] == 26 and not q.get('statements'):
+            q['statements'] = [
+                "St\u00f6rungen im Neurotransmittersystem wirken entscheidend bei der Entstehung affektiver Erkrankungen mit",
+                "Wichtige Transmitter hei\u00dfen Adrenalin, Noradrenalin und Serotonin",
+                "Synapse nennt man den Bereich, in dem ein Reiz mittels Neurotransmittern von einer Nervenzelle auf eine andere \u00fcbertragen wird",
+                "Johanniskraut hat als pflanzliches Medikament keine Wirkung auf das Neurotransmittersystem",
+                "Ein \u00dcberangebot von Neurotransmittern f\u00fchrt h\u00e4ufig zu vaskul\u00e4rer Demenz"]
+            manual_fixes += 1
 
     # 2005-March Q5 - garbled OCR, reconstructed from context (bipolare affektive St\u00f6rung)
-    for e in exams:
-        if e['id'] == '2005-march':
-            for q in e['questions']:
-                if q['id'] == 5 and not q.get('statements'):
-                    q['statements'] = [
-                        "Es handelt sich um eine St\u00f6rung, die durch wenigstens zwei Episoden charakterisiert ist, in denen Stimmung und Aktivit\u00e4tsniveau des Betroffenen deutlich gest\u00f6rt sind",
-                        "Es besteht manchmal angehobene Stimmung, vermehrter Antrieb und Aktivit\u00e4t",
-                        "Es besteht manchmal Stimmungssenkung, verminderter Antrieb und verminderte Aktivit\u00e4t",
-                        "Depressive Episoden kommen nicht vor",
-                        "Depressiver Wahn kann auftreten"]
-                    manual_fixes += 1
-                if q['id'] == 12 and not q.get('statements'):
-                    q['statements'] = [
-                        "Es gibt erfolglose Versuche oder den bleibenden Wunsch, den Substanzgebrauch zu regulieren oder zu reduzieren",
-                        "Intoxikations- oder Entzugssymptome k\u00f6nnen auftreten",
-                        "Es findet sich eine deutliche Toleranzentwicklung",
-                        "F\u00fcr die Beschaffung der Substanz, die Einnahme oder die notwendige Erholung nach Gebrauch der Substanz wird viel Zeit aufgewendet",
-                        "Wichtige Aktivit\u00e4ten in Beruf und/oder Freizeit leiden nicht unter einem Suchtverhalten"]
-                    manual_fixes += 1
-                if q['id'] == 15 and not q.get('statements'):
-                    q['statements'] = [
-                        "Die Betreuung kann ggf. auch nur einen Aufgabenkreis betreffen",
-                        "Das Vormundschaftsgericht kann anordnen, dass bei dem Betreuten zwei Betreuer einzelne der festgelegten Aufgabenkreise \u00fcbernehmen",
-                        "Beim Einwilligungsvorbehalt handelt es sich um ein Vetorecht in allen Angelegenheiten, das jedem Betreuten zusteht",
-                        "Das Gesetz regelt u.a. die Betreuung k\u00f6rperlich Behinderter",
-                        "Beim Betreuungsgesetz handelt es sich um eine l\u00e4ndergesetzliche Regelung"]
-                    manual_fixes += 1
+    for q in exam_questions('2005-march'):
+        if q['id'] == 5 and not q.get('statements'):
+            q['statements'] = [
+                "Es handelt sich um eine St\u00f6rung, die durch wenigstens zwei Episoden charakterisiert ist, in denen Stimmung und Aktivit\u00e4tsniveau des Betroffenen deutlich gest\u00f6rt sind",
+                "Es besteht manchmal angehobene Stimmung, vermehrter Antrieb und Aktivit\u00e4t",
+                "Es besteht manchmal Stimmungssenkung, verminderter Antrieb und verminderte Aktivit\u00e4t",
+                "Depressive Episoden kommen nicht vor",
+                "Depressiver Wahn kann auftreten"]
+            manual_fixes += 1
+        if q['id'] == 12 and not q.get('statements'):
+            q['statements'] = [
+                "Es gibt erfolglose Versuche oder den bleibenden Wunsch, den Substanzgebrauch zu regulieren oder zu reduzieren",
+                "Intoxikations- oder Entzugssymptome k\u00f6nnen auftreten",
+                "Es findet sich eine deutliche Toleranzentwicklung",
+                "F\u00fcr die Beschaffung der Substanz, die Einnahme oder die notwendige Erholung nach Gebrauch der Substanz wird viel Zeit aufgewendet",
+                "Wichtige Aktivit\u00e4ten in Beruf und/oder Freizeit leiden nicht unter einem Suchtverhalten"]
+            manual_fixes += 1
+        if q['id'] == 15 and not q.get('statements'):
+            q['statements'] = [
+                "Die Betreuung kann ggf. auch nur einen Aufgabenkreis betreffen",
+                "Das Vormundschaftsgericht kann anordnen, dass bei dem Betreuten zwei Betreuer einzelne der festgelegten Aufgabenkreise \u00fcbernehmen",
+                "Beim Einwilligungsvorbehalt handelt es sich um ein Vetorecht in allen Angelegenheiten, das jedem Betreuten zusteht",
+                "Das Gesetz regelt u.a. die Betreuung k\u00f6rperlich Behinderter",
+                "Beim Betreuungsgesetz handelt es sich um eine l\u00e4ndergesetzliche Regelung"]
+            manual_fixes += 1
 
     # 2017-March Q1 - clean embedded options from text
-    for e in exams:
-        if e['id'] == '2017-march':
-            for q in e['questions']:
-                if q['id'] == 1:
-                    m = re.search(r'\n\s*A[.)]\s', q.get('text', ''))
-                    if m:
-                        q['text'] = q['text'][:m.start()].strip()
-                    q['options'] = [
-                        "Eine Migr\u00e4neerkrankung", "Eine akute paranoide Psychose",
-                        "Eine Bluthochdruckerkrankung", "Ein Schlafapnoesyndrom",
-                        "Eine psychosomatische Erkrankung"]
-                    manual_fixes += 1
+    for q in exam_questions('2017-march'):
+        if q['id'] == 1:
+            m = re.search(r'\n\s*A[.)]\s', q.get('text', ''))
+            if m:
+                q['text'] = q['text'][:m.start()].strip()
+            q['options'] = [
+                "Eine Migr\u00e4neerkrankung", "Eine akute paranoide Psychose",
+                "Eine Bluthochdruckerkrankung", "Ein Schlafapnoesyndrom",
+                "Eine psychosomatische Erkrankung"]
+            manual_fixes += 1
 
     # 2005-March missing options
     fix_q('2005-march', 5, options=["Nur die Aussage 1 ist richtig","Nur die Aussagen 1, 2 und 3 sind richtig","Nur die Aussagen 1, 3 und 5 sind richtig","Nur die Aussagen 1, 2, 3 und 4 sind richtig","Nur die Aussagen 1, 2, 3 und 5 sind richtig"])
@@ -827,26 +763,24 @@ def main():
         "Der Therapeut hilft dem Patienten dabei, problematische Gef\u00fchle (z.B. be\u00e4ngstigende Gedanken) zu verst\u00e4rken"])
 
     # 2005-March Q27 - garbled text/statements/options (page number "28" merged into text)
-    for e in exams:
-        if e['id'] == '2005-march':
-            for q in e['questions']:
-                if q['id'] == 27:
-                    q['text'] = "Welche der folgenden Aussagen treffen zu? Merkmale der sog. voll funktionsf\u00e4higen Person (fully functioning person) nach Rogers sind:"
-                    q['statements'] = [
-                        "Unverzerrte Realit\u00e4tswahrnehmung und reife, befriedigende soziale Interaktionen",
-                        "Offenheit gegen\u00fcber Erfahrungen",
-                        "Totale \u00dcbereinstimmung von Selbstbild und Idealbild",
-                        "Wertsch\u00e4tzung des eigenen Selbst",
-                        "\u00dcbereinstimmung von Selbstbild und Erfahrung"
-                    ]
-                    q['options'] = [
-                        "Nur die Aussagen 1 und 4 sind richtig",
-                        "Nur die Aussagen 1, 2 und 4 sind richtig",
-                        "Nur die Aussagen 1, 3 und 5 sind richtig",
-                        "Nur die Aussagen 1, 2, 4 und 5 sind richtig",
-                        "Alle Aussagen sind richtig"
-                    ]
-                    manual_fixes += 1
+    for q in exam_questions('2005-march'):
+        if q['id'] == 27:
+            q['text'] = "Welche der folgenden Aussagen treffen zu? Merkmale der sog. voll funktionsf\u00e4higen Person (fully functioning person) nach Rogers sind:"
+            q['statements'] = [
+                "Unverzerrte Realit\u00e4tswahrnehmung und reife, befriedigende soziale Interaktionen",
+                "Offenheit gegen\u00fcber Erfahrungen",
+                "Totale \u00dcbereinstimmung von Selbstbild und Idealbild",
+                "Wertsch\u00e4tzung des eigenen Selbst",
+                "\u00dcbereinstimmung von Selbstbild und Erfahrung"
+            ]
+            q['options'] = [
+                "Nur die Aussagen 1 und 4 sind richtig",
+                "Nur die Aussagen 1, 2 und 4 sind richtig",
+                "Nur die Aussagen 1, 3 und 5 sind richtig",
+                "Nur die Aussagen 1, 2, 4 und 5 sind richtig",
+                "Alle Aussagen sind richtig"
+            ]
+            manual_fixes += 1
 
     print(f"Step 6: {manual_fixes} manual fixes")
 
@@ -855,19 +789,13 @@ def main():
 
     def add_q(eid, qid, qtype, text, options, statements=None):
         nonlocal added_missing
-        for e in exams:
-            if e['id'] == eid:
-                if any(q['id'] == qid for q in e['questions']):
-                    return  # Already exists
-                ci = answer_keys.get(eid, {}).get(qid, [])
-                e['questions'].append({
-                    'id': qid, 'type': qtype, 'text': text,
-                    'options': options, 'statements': statements or [],
-                    'correctIndices': ci, 'explanation': ''
-                })
-                e['questions'].sort(key=lambda q: q['id'])
-                added_missing += 1
-                return
+        e = corpus.exam(eid)
+        if e is None or e.question(qid) is not None:
+            return  # Unknown exam or already exists
+        ci = answer_keys.get(eid, {}).get(qid, [])
+        e['questions'].append(Question(qid, qtype, text, options, statements or [], ci))
+        e['questions'].sort(key=lambda q: q['id'])
+        added_missing += 1
 
     # 2003-march Q24
     add_q('2003-march', 24, 'Aussagenkombination',
@@ -1892,9 +1820,21 @@ def main():
 
     print(f"Step 7: Added {added_missing} missing questions")
 
+
+# ===== MAIN =====
+def main():
+    corpus = load_corpus()
+    exams = corpus.exams
+    print(f"Loaded {len(exams)} exams")
+
+    apply_fixes(corpus)
+
     # SAVE
-    with open(EXAMS_JSON, 'w') as f:
-        json.dump(exams, f, ensure_ascii=False, indent=2)
+    changed = corpus.changed_exam_ids()
+    if corpus.save():
+        print(f"Saved {corpus.path} ({len(changed)} exams changed)")
+    else:
+        print(f"No changes, {corpus.path} left untouched")
 
     # FINAL AUDIT
     print(f"\n=== FINAL AUDIT ===")
@@ -2,11 +2,11 @@
 """
 Fix exams.json - correct answer indices, fix structural issues.
 """
-import json
 import copy
 import sys
 
-JSON_PATH = "app/src/main/assets/exams.json"
+from corpus import load_corpus
+
 
 def letter_to_index(letter):
     """Convert answer letter to 0-based index: A=0, B=1, C=2, D=3, E=4"""
@@ -371,10 +371,12 @@ def fix_duplicate_ids(exams):
 
     return len(to_remove)
 
-def main():
-    # Read JSON
-    with open(JSON_PATH, 'r', encoding='utf-8') as f:
-        exams = json.load(f)
+def apply_fixes(corpus):
+    """Apply answer-key and duplicate fixes to a loaded corpus.
+
+    Returns (correctIndices changes, duplicates removed).
+    """
+    exams = corpus.exams
 
     print(f"Loaded {len(exams)} exams")
 
@@ -416,11 +418,18 @@ def main():
 
         print(f"  {eid}: {num_q}q - {status}")
 
-    # Write output
-    with open(JSON_PATH, 'w', encoding='utf-8') as f:
-        json.dump(exams, f, ensure_ascii=False, indent=2)
+    return ci_changes, dup_changes
+
+def main():
+    # Read JSON
+    corpus = load_corpus()
+    ci_changes, dup_changes = apply_fixes(corpus)
 
-    print(f"\nWrote corrected JSON to {JSON_PATH}")
+    # Write output (only if something actually changed)
+    if corpus.save():
+        print(f"\nWrote corrected JSON to {corpus.path}")
+    else:
+        print(f"\nNo changes, {corpus.path} left untouched")
     print(f"Total changes: {ci_changes} correctIndices + {dup_changes} duplicates removed")
 
 if __name__ == "__main__":
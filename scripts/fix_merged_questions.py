@@ -2,39 +2,32 @@
 """Fix exams with merged questions (10+ options) by splitting them
 and adding missing questions from PDF extraction."""
 
-import json
 import re
-import fitz
 
-EXAMS_JSON = "app/src/main/assets/exams.json"
+from corpus import load_corpus
+from pdf_text import get_text
+from pdf_tokens import OPTION, tokenize
+
+# Question types spelled exactly (no "Aussage n kombination" variants)
+STRICT_TYPES = ('Einfachauswahl', 'Aussagenkombination', 'Mehrfachauswahl', 'Mehrfachauswahlaufgabe')
+
+# Cleanup of extracted question/option text
+NEWLINE_RE = re.compile(r'\s*\n\s*')
+SPACES_RE = re.compile(r'\s+')
+BLANK_LINE_RE = re.compile(r'\n\s*\n')
+PAGE_HEADER_RE = re.compile(r'Heilpraktiker.*?Gruppe [AB]\s*\d*')
+INSTRUCTION_RE = re.compile(r'\s*W.hlen Sie.*?Antwort.*?!?\s*$')
 
 def get_full_text(pdf_path):
-    doc = fitz.open(pdf_path)
-    text = ""
-    for page in doc:
-        text += page.get_text() + "\n"
-    doc.close()
+    text = get_text(pdf_path, "fitz")
     return text.replace('\xa0', ' ').replace('\x01', '').replace('\x02', '')
 
 def extract_questions(text):
     """Extract questions from text."""
     questions = {}
 
-    q_starts = list(re.finditer(
-        r'(?:^|\n)\s*(\d{1,2})\s+(Einfachauswahl|Aussagenkombination|Mehrfachauswahl(?:aufgabe)?)',
-        text
-    ))
-    q_starts2 = list(re.finditer(
-        r'(?:^|\n)\s*(\d{1,2})\s*\n\s*(Einfachauswahl|Aussagenkombination|Mehrfachauswahl(?:aufgabe)?)',
-        text
-    ))
-
-    all_starts = {}
-    for m in q_starts + q_starts2:
-        num = int(m.group(1))
-        if 1 <= num <= 28:
-            if num not in all_starts or m.start() < all_starts[num][0]:
-                all_starts[num] = (m.start(), m.end(), m.group(2))
+    stream = tokenize(text)
+    all_starts = stream.question_starts(types=STRICT_TYPES)
 
     sorted_nums = sorted(all_starts.keys())
 
@@ -51,27 +44,28 @@ def extract_questions(text):
         if 'Mehrfach' in qtype:
             qtype = 'Mehrfachauswahl'
 
-        # Extract options
+        # Extract options (offsets relative to q_region; a marker ends after
+        # the whitespace that follows "A)")
         options = []
-        for fmt in [r'([A-E])\)\s', r'([A-E])\.\s']:
-            opt_matches = list(re.finditer(fmt, q_region))
+        for delim in ')', '.':
+            opt_matches = stream.markers(end, next_start, OPTION, delim, spaced=True)
             if len(opt_matches) >= 5:
                 for j in range(len(opt_matches) - 4):
-                    letters = [m.group(1) for m in opt_matches[j:j+5]]
+                    letters = [t.key for t in opt_matches[j:j+5]]
                     if letters == ['A', 'B', 'C', 'D', 'E']:
                         for k in range(5):
-                            m = opt_matches[j+k]
+                            m_end = opt_matches[j+k].end + 1 - end
                             if k + 1 < 5:
-                                opt_end = opt_matches[j+k+1].start()
+                                opt_end = opt_matches[j+k+1].start - end
                             else:
-                                remaining = q_region[m.end():m.end()+500]
-                                end_m = re.search(r'\n\s*\n', remaining)
-                                opt_end = m.end() + (end_m.start() if end_m else min(300, len(remaining)))
-
-                            opt_text = q_region[m.end():opt_end].strip()
-                            opt_text = re.sub(r'\s*\n\s*', ' ', opt_text)
-                            opt_text = re.sub(r'\s+', ' ', opt_text)
-                            opt_text = re.sub(r'Heilpraktiker.*?Gruppe [AB]\s*\d*', '', opt_text).strip()
+                                remaining = q_region[m_end:m_end+500]
+                                end_m = BLANK_LINE_RE.search(remaining)
+                                opt_end = m_end + (end_m.start() if end_m else min(300, len(remaining)))
+
+                            opt_text = q_region[m_end:opt_end].strip()
+                            opt_text = NEWLINE_RE.sub(' ', opt_text)
+                            opt_text = SPACES_RE.sub(' ', opt_text)
+                            opt_text = PAGE_HEADER_RE.sub('', opt_text).strip()
                             options.append(opt_text)
                         break
                 if options:
@@ -81,32 +75,27 @@ def extract_questions(text):
         statements = []
         q_text = ""
 
-        first_opt = None
-        for fmt in [r'[A-E]\)\s', r'[A-E]\.\s']:
-            m = re.search(fmt, q_region)
-            if m:
-                if first_opt is None or m.start() < first_opt:
-                    first_opt = m.start()
+        spaced = stream.markers(end, next_start, OPTION, spaced=True)
+        first_opt = spaced[0].start - end if spaced else None
 
         pre_opts = q_region[:first_opt] if first_opt else q_region
 
         if qtype == 'Aussagenkombination':
-            stmt_matches = list(re.finditer(r'(?:^|\n)\s*(\d)\.\s*(.*?)(?=\n\s*\d\.\s|\n\s*[A-E][.)]\s|\Z)',
-                                           pre_opts, re.DOTALL))
+            stmt_matches = stream.numbered_blocks(end, end + len(pre_opts), delims='.')
             if stmt_matches:
-                q_text = pre_opts[:stmt_matches[0].start()].strip()
+                q_text = pre_opts[:stmt_matches[0].start - end].strip()
                 for sm in stmt_matches:
-                    stmt = re.sub(r'\s+', ' ', sm.group(2).strip())
+                    stmt = SPACES_RE.sub(' ', text[sm.body_start:sm.body_end].strip())
                     statements.append(stmt)
             else:
                 q_text = pre_opts.strip()
         else:
             q_text = pre_opts.strip()
 
-        q_text = re.sub(r'\s*\n\s*', ' ', q_text)
-        q_text = re.sub(r'\s+', ' ', q_text)
-        q_text = re.sub(r'Heilpraktiker.*?Gruppe [AB]\s*\d*', '', q_text).strip()
-        q_text = re.sub(r'\s*W.hlen Sie.*?Antwort.*?!?\s*$', '', q_text).strip()
+        q_text = NEWLINE_RE.sub(' ', q_text)
+        q_text = SPACES_RE.sub(' ', q_text)
+        q_text = PAGE_HEADER_RE.sub('', q_text).strip()
+        q_text = INSTRUCTION_RE.sub('', q_text).strip()
 
         questions[qnum] = {
             'type': qtype,
@@ -241,9 +230,9 @@ def fix_exam(exam, pdf_questions):
     return fixed, added
 
 
-def main():
-    with open(EXAMS_JSON, 'r') as f:
-        exams = json.load(f)
+def apply_fixes(corpus):
+    """Split merged questions of a loaded corpus (in memory, no save)."""
+    exams = corpus.exams
 
     pdfs = {
         '2010-october': 'fragen/Oktober-2010.pdf',
@@ -279,12 +268,15 @@ def main():
 
         print(f"  {eid}: fixed {fixed} merged, added {added} missing -> {len(exam['questions'])} total")
 
-    # Save
-    with open(EXAMS_JSON, 'w') as f:
-        json.dump(exams, f, ensure_ascii=False, indent=2)
-
     print(f"\nTotal: {total_fixed} split, {total_added} added")
 
 
+def main():
+    corpus = load_corpus()
+    apply_fixes(corpus)
+    # Save (skipped when nothing changed)
+    corpus.save()
+
+
 if __name__ == '__main__':
     main()
@@ -0,0 +1,126 @@
+#!/usr/bin/env python3
+"""Run all exams.json fix scripts as one pipeline.
+
+Replaces running fix_exams, fix_all, extract_options, fix_merged_questions,
+fix_question_text, fix_manual_issues and fix_2002_october one after another.
+The corpus is loaded once, every pass edits it in memory (PDF text is
+extracted once per process and shared through pdf_text), and exams.json is
+written once at the end - or not at all if nothing changed.
+
+A pass is any function taking the corpus; add one by appending to PASSES.
+
+Usage: python3 scripts/fix_pipeline.py [--dry-run] [--quiet]
+                                       [--only PASS ...] [--skip PASS ...]
+  --dry-run   show a unified diff of exams.json instead of writing it
+  --quiet     hide the output of the individual passes
+Run from project root.
+"""
+
+import argparse
+import contextlib
+import difflib
+import io
+import sys
+import time
+
+import extract_options
+import fix_2002_october
+import fix_all
+import fix_exams
+import fix_manual_issues
+import fix_merged_questions
+import fix_question_text
+from corpus import diff_snapshots, load_corpus
+
+# (name, function(corpus)) in the order the scripts used to be run
+PASSES = [
+    ('fix_exams', fix_exams.apply_fixes),
+    ('fix_all', fix_all.apply_fixes),
+    ('extract_options', extract_options.apply_fixes),
+    ('fix_merged_questions', fix_merged_questions.apply_fixes),
+    ('fix_question_text', fix_question_text.apply_fixes),
+    ('fix_manual_issues', fix_manual_issues.apply_fixes),
+    ('fix_2002_october', fix_2002_october.apply_fixes),
+]
+
+
+def select_passes(only, skip):
+    names = [name for name, _ in PASSES]
+    for name in (only or []) + (skip or []):
+        if name not in names:
+            raise SystemExit(f"Unknown pass: {name} (available: {', '.join(names)})")
+    return [(name, fn) for name, fn in PASSES
+            if (not only or name in only) and name not in (skip or [])]
+
+
+def run_pass(corpus, fn, quiet):
+    """Run one pass; returns (seconds, (changed, added, removed))."""
+    before = corpus.snapshot()
+    start = time.perf_counter()
+    if quiet:
+        with contextlib.redirect_stdout(io.StringIO()):
+            fn(corpus)
+    else:
+        fn(corpus)
+    elapsed = time.perf_counter() - start
+    return elapsed, diff_snapshots(before, corpus.snapshot())
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Run all exams.json fixes in one pass.")
+    parser.add_argument('--dry-run', action='store_true',
+                        help="print a diff instead of writing exams.json")
+    parser.add_argument('--quiet', action='store_true',
+                        help="hide the output of the individual passes")
+    parser.add_argument('--only', nargs='+', metavar='PASS', help="run only these passes")
+    parser.add_argument('--skip', nargs='+', metavar='PASS', help="skip these passes")
+    args = parser.parse_args()
+
+    passes = select_passes(args.only, args.skip)
+
+    start = time.perf_counter()
+    corpus = load_corpus()
+    with open(corpus.path, 'r', encoding='utf-8') as f:
+        original = f.read()
+    print(f"Loaded {len(corpus.exams)} exams from {corpus.path}")
+
+    results = []
+    for i, (name, fn) in enumerate(passes, 1):
+        print(f"\n=== [{i}/{len(passes)}] {name} ===")
+        try:
+            elapsed, counts = run_pass(corpus, fn, args.quiet)
+        except Exception as e:
+            print(f"\nERROR: pass {name} failed: {e!r}")
+            print(f"Nothing written; rerun with --skip {name} to continue without it.")
+            sys.exit(1)
+        results.append((name, elapsed, counts))
+
+    print(f"\n{'Pass':<24} {'Time':>8} {'Changed':>8} {'Added':>6} {'Removed':>8}")
+    print("-" * 58)
+    for name, elapsed, (changed, added, removed) in results:
+        print(f"{name:<24} {elapsed:>7.2f}s {changed:>8} {added:>6} {removed:>8}")
+    print("-" * 58)
+    print(f"{'Total':<24} {sum(r[1] for r in results):>7.2f}s "
+          f"{sum(r[2][0] for r in results):>8} {sum(r[2][1] for r in results):>6} "
+          f"{sum(r[2][2] for r in results):>8}")
+
+    changed_exams = corpus.changed_exam_ids()
+    if args.dry_run:
+        diff = difflib.unified_diff(original.splitlines(keepends=True),
+                                    corpus.to_json().splitlines(keepends=True),
+                                    fromfile=f"a/{corpus.path}", tofile=f"b/{corpus.path}")
+        text = "".join(diff)
+        if text:
+            print(f"\nDry run - {len(changed_exams)} exams would change:\n")
+            sys.stdout.write(text if text.endswith("\n") else text + "\n")
+        else:
+            print("\nDry run - no changes")
+    elif corpus.save():
+        print(f"\nSaved {corpus.path} ({len(changed_exams)} exams changed: {', '.join(changed_exams)})")
+    else:
+        print(f"\nNo changes, {corpus.path} left untouched")
+    print(f"Wall time: {time.perf_counter() - start:.2f}s")
+
+
+if __name__ == '__main__':
+    main()
@@ -10,84 +10,62 @@ Usage: python3 scripts/fix_question_text.py [--dry-run]
 Run from project root.
 """
 
-import json
 import re
-import subprocess
-import os
 import sys
 
-EXAMS_JSON = "app/src/main/assets/exams.json"
-FRAGEN_DIR = "fragen"
-
-# Exams to skip (scanned/no text, answer-key-only, or empty)
+from corpus import load_corpus
+from page_types import is_scanned
+from pdf_catalog import pdf_for_exam
+from pdf_text import find_gruppe_b_page, get_text
+from pdf_tokens import OPTION, STATEMENT, TokenStream, tokenize
+
+
+# Content following an option marker
+NUR_DIE_AUSSAGE_RE = re.compile(r'\s*Nur\s+die\s+Aussage')
+ALLE_AUSSAGEN_RE = re.compile(r'\s*Alle\s+Aussagen\s+sind\s+richtig')
+
+# Cleanup of extracted question/statement text
+HEADER_RE = re.compile(r'Heilpraktiker.*?(?:Gruppe\s+[AB]|Psychotherapie)\s*(?:\d+\s*)?')
+BLOCK_HEADER_RE = re.compile(HEADER_RE.pattern + r'(?:\n|$)')
+NEWLINE_RE = re.compile(r'\s*\n\s*')
+SPACES_RE = re.compile(r'\s+')
+AUFGABE_RE = re.compile(r'^[Aa]ufgabe\s*')
+LEADING_INSTRUCTION_RE = re.compile(r'^Wählen Sie[^?!]*[?!]\s*')
+TRAILING_INSTRUCTION_RE = re.compile(r'\s*Wählen Sie[^?]*$')
+PAGE_NUMBER_RE = re.compile(r'^\d+\s+')
+
+# Exams to skip (answer-key-only or empty); scanned PDFs are detected
+# from their page types
 SKIP_EXAMS = {
-    "2007-october",  # scanned PDF
-    "2014-october",  # scanned PDF
     "2009-october",  # empty exam
     "2010-march",    # empty exam / answer-key-only
 }
 
 
-def get_pdf_for_exam(exam_id):
-    """Find PDF file for an exam ID."""
-    parts = exam_id.split('-')
-    year = parts[0]
-    month_eng = parts[1]
-    month_de = "Maerz" if month_eng == "march" else "Oktober"
-    for pattern in [
-        f"{month_de}-{year}.pdf",
-        f"HPP_Pruefung_{month_de}_{year}_mit_Loesungen_.pdf",
-        f"HPP_Pruefung_{month_de}_{year}_mit_Loesungen.pdf",
-        f"HPP_Pruefung_{month_de}_{year}_.pdf",
-        f"HPP_Pruefung_{month_de}_{year}_mit_Loesungen_A_B.pdf",
-        f"HPP_Pruefung_{month_de}_{year}_Gruppe_A_mit_Loesungen.pdf",
-        f"HPP_Pruefung_{month_de}_{year}_mit_Loesungen_Gruppe_A.pdf",
-    ]:
-        path = os.path.join(FRAGEN_DIR, pattern)
-        if os.path.exists(path):
-            return path
-    return None
-
-
 def extract_pdf_text(pdf_path):
-    """Extract text from PDF using pdftotext."""
-    result = subprocess.run(['pdftotext', pdf_path, '-'],
-                            capture_output=True, text=True)
-    return result.stdout
+    """Extract text from PDF using pdftotext (cached, see pdf_text)."""
+    return get_text(pdf_path, "pdftotext", sep="\f")
 
 
 def get_gruppe_a_section(text):
-    """Get Gruppe A section from PDF text (skip Gruppe B if present)."""
-    # Count Gruppe B occurrences
-    b_matches = list(re.finditer(r'Gruppe\s*B', text))
-    if len(b_matches) >= 17:
-        # "Gruppe B" is a page header, the whole PDF is Gruppe B - use all text
+    """Get Gruppe A section from PDF text (skip Gruppe B if present).
+
+    text is the extract_pdf_text output, one form feed after each page.
+    """
+    pages = text.split("\f")[:-1]
+    gruppe_b = find_gruppe_b_page(pages)
+    if not gruppe_b:
         return text
-    for m in b_matches:
-        # If Gruppe B appears after 30% of text, it's a section divider
-        if m.start() > len(text) * 0.3:
-            return text[:m.start()]
-    return text
+    return "".join(page + "\f" for page in pages[:gruppe_b])
 
 
 def extract_questions_from_pdf(text):
     """Extract questions with clean text and statements from PDF text."""
     questions = {}
 
-    # Find question start markers
-    q_pattern1 = re.compile(
-        r'(?:^|\n)\s*(\d{1,2})\s+(Einfachauswahl|Aussage\s*n?\s*kombination|Mehrfachauswahl(?:aufgabe)?)',
-        re.MULTILINE)
-    q_pattern2 = re.compile(
-        r'(?:^|\n)\s*(\d{1,2})\s*\n\s*(Einfachauswahl|Aussage\s*n?\s*kombination|Mehrfachauswahl(?:aufgabe)?)',
-        re.MULTILINE)
-
-    all_starts = {}
-    for m in list(q_pattern1.finditer(text)) + list(q_pattern2.finditer(text)):
-        num = int(m.group(1))
-        if 1 <= num <= 28:
-            if num not in all_starts or m.start() < all_starts[num][0]:
-                all_starts[num] = (m.start(), m.end(), m.group(2))
+    # Question start markers
+    stream = tokenize(text)
+    all_starts = stream.question_starts()
 
     sorted_nums = sorted(all_starts.keys())
 
@@ -104,37 +82,57 @@ def extract_questions_from_pdf(text):
         if 'ombination' in qtype and qtype != 'Aussagenkombination':
             qtype = 'Aussagenkombination'
 
-        # Find first A option marker to delimit question+statements region
+        options = stream.markers(end, next_start, OPTION)
+        numbered = stream.markers(end, next_start, STATEMENT)
+
+        def first_line_marker(markers, accept, hi=next_start):
+            """Offset (in q_region) of the first accepted marker starting a line."""
+            for t in markers:
+                if t.end <= hi and accept(t, hi):
+                    line = stream.line_start(t, end)
+                    if line is not None:
+                        return line - end
+            return None
+
+        def spaced(t, hi):
+            return t.end < hi and text[t.end].isspace()
+
+        def then_nur_die_aussage(t, hi):
+            return NUR_DIE_AUSSAGE_RE.match(text, t.end, hi) is not None
+
+        # Find first A option marker ("A)", "A.", "‚A)", "„A)" at line start)
+        # to delimit question+statements region
         first_opt = None
-        for fmt in [r'(?:^|\n)\s*A\)\s', r'(?:^|\n)\s*A\.\s',
-                     r'(?:^|\n)\s*\u201aA\)\s', r'(?:^|\n)\s*\u201eA\)\s']:
-            m = re.search(fmt, q_region)
-            if m and (first_opt is None or m.start() < first_opt):
-                first_opt = m.start()
+        for lead, delim in ('', ')'), ('', '.'), ('\u201a', ')'), ('\u201e', ')'):
+            pos = first_line_marker(
+                options, lambda t, hi: (t.key == 'A' and t.lead == lead
+                                        and t.delim == delim and spaced(t, hi)))
+            if pos is not None and (first_opt is None or pos < first_opt):
+                first_opt = pos
 
         # Also look for "Nur die Aussage" as option start indicator (A. or 1. format)
-        for fmt in [r'(?:^|\n)\s*(?:\u201a)?A[.)]\s*Nur\s+die\s+Aussage',
-                     r'(?:^|\n)\s*1[.)]\s*Nur\s+die\s+Aussage']:
-            m = re.search(fmt, q_region)
-            if m and (first_opt is None or m.start() < first_opt):
-                first_opt = m.start()
+        for pos in (first_line_marker(options, lambda t, hi: (t.key == 'A' and t.lead in ('', '\u201a')
+                                                              and then_nur_die_aussage(t, hi))),
+                    first_line_marker(numbered, lambda t, hi: t.key == '1' and then_nur_die_aussage(t, hi))):
+            if pos is not None and (first_opt is None or pos < first_opt):
+                first_opt = pos
         # Also look for "Alle Aussagen sind richtig" without A-E prefix
-        m = re.search(r'(?:^|\n)\s*\d[.)]\s*Alle\s+Aussagen\s+sind\s+richtig', q_region)
-        if m and first_opt is not None and m.start() > first_opt:
+        alle = first_line_marker(
+            numbered, lambda t, hi: ALLE_AUSSAGEN_RE.match(text, t.end, hi) is not None)
+        if alle is not None and first_opt is not None and alle > first_opt:
             pass  # already found earlier option start
-        elif m and (first_opt is None or m.start() < first_opt):
+        elif alle is not None and (first_opt is None or alle < first_opt):
             # Search backwards for the first numbered option
-            search_before = q_region[:m.start()]
-            num_opt = re.search(r'(?:^|\n)\s*1[.)]\s*Nur\s+die\s+Aussage', search_before)
-            if num_opt:
-                first_opt = num_opt.start()
+            num_opt = first_line_marker(
+                numbered, lambda t, hi: t.key == '1' and then_nur_die_aussage(t, hi),
+                hi=end + alle)
+            if num_opt is not None:
+                first_opt = num_opt
 
         pre_opts = q_region[:first_opt] if first_opt else q_region
 
         # Clean header junk from pre_opts
-        pre_opts = re.sub(
-            r'Heilpraktiker.*?(?:Gruppe\s+[AB]|Psychotherapie)\s*(?:\d+\s*)?(?:\n|$)',
-            '\n', pre_opts)
+        pre_opts = BLOCK_HEADER_RE.sub('\n', pre_opts)
 
         # Parse statements for Aussagenkombination
         statements = []
@@ -144,16 +142,15 @@ def extract_questions_from_pdf(text):
             # Find numbered statement markers (1. or 1))
             # Only match digits 1-9 at start of line or after newline
             # Allow zero or more spaces after delimiter (some PDFs have "1.Text")
-            stmt_matches = list(re.finditer(
-                r'(?:^|\n)\s*(\d)[.)]\s*', pre_opts))
+            stmt_matches = TokenStream(pre_opts).numbered_markers(0, len(pre_opts))
 
             # Filter: only keep matches with sequential or near-sequential numbers
             # to avoid false positives like "6. Lebensjahr" in running text
             if stmt_matches:
                 filtered = [stmt_matches[0]]
                 for sm in stmt_matches[1:]:
-                    prev_num = int(filtered[-1].group(1))
-                    curr_num = int(sm.group(1))
+                    prev_num = int(filtered[-1].key)
+                    curr_num = int(sm.key)
                     # Accept if number is sequential or close
                     if curr_num == prev_num + 1:
                         filtered.append(sm)
@@ -162,25 +159,23 @@ def extract_questions_from_pdf(text):
                         filtered.append(sm)
                 stmt_matches = filtered
 
-            if stmt_matches and int(stmt_matches[0].group(1)) == 1:
+            if stmt_matches and int(stmt_matches[0].key) == 1:
                 # Question text is everything before first statement
-                q_text = pre_opts[:stmt_matches[0].start()].strip()
+                q_text = pre_opts[:stmt_matches[0].start].strip()
 
                 # Extract each statement's full text
                 for j, sm in enumerate(stmt_matches):
-                    stmt_start = sm.end()
+                    stmt_start = sm.end
                     if j + 1 < len(stmt_matches):
-                        stmt_end = stmt_matches[j + 1].start()
+                        stmt_end = stmt_matches[j + 1].start
                     else:
                         stmt_end = len(pre_opts)
                     stmt_text = pre_opts[stmt_start:stmt_end].strip()
                     # Normalize whitespace (join multi-line)
-                    stmt_text = re.sub(r'\s*\n\s*', ' ', stmt_text)
-                    stmt_text = re.sub(r'\s+', ' ', stmt_text)
+                    stmt_text = NEWLINE_RE.sub(' ', stmt_text)
+                    stmt_text = SPACES_RE.sub(' ', stmt_text)
                     # Remove header artifacts
-                    stmt_text = re.sub(
-                        r'Heilpraktiker.*?(?:Gruppe\s+[AB]|Psychotherapie)\s*(?:\d+\s*)?',
-                        '', stmt_text).strip()
+                    stmt_text = HEADER_RE.sub('', stmt_text).strip()
                     if stmt_text:
                         statements.append(stmt_text)
             else:
@@ -189,20 +184,18 @@ def extract_questions_from_pdf(text):
             q_text = pre_opts.strip()
 
         # Clean question text
-        q_text = re.sub(r'\s*\n\s*', ' ', q_text)
-        q_text = re.sub(r'\s+', ' ', q_text)
-        q_text = re.sub(
-            r'Heilpraktiker.*?(?:Gruppe\s+[AB]|Psychotherapie)\s*(?:\d+\s*)?',
-            '', q_text).strip()
+        q_text = NEWLINE_RE.sub(' ', q_text)
+        q_text = SPACES_RE.sub(' ', q_text)
+        q_text = HEADER_RE.sub('', q_text).strip()
         # Remove "aufgabe" prefix
-        q_text = re.sub(r'^[Aa]ufgabe\s*', '', q_text).strip()
+        q_text = AUFGABE_RE.sub('', q_text).strip()
         # Remove "Wählen Sie..." instructions (can appear before or after text)
         # First remove leading "Wählen Sie..." (before question text)
-        q_text = re.sub(r'^Wählen Sie[^?!]*[?!]\s*', '', q_text).strip()
+        q_text = LEADING_INSTRUCTION_RE.sub('', q_text).strip()
         # Then remove trailing "Wählen Sie..." (after question mark)
-        q_text = re.sub(r'\s*Wählen Sie[^?]*$', '', q_text).strip()
+        q_text = TRAILING_INSTRUCTION_RE.sub('', q_text).strip()
         # Remove page numbers that crept in
-        q_text = re.sub(r'^\d+\s+', '', q_text).strip()
+        q_text = PAGE_NUMBER_RE.sub('', q_text).strip()
 
         questions[qnum] = {
             'type': qtype,
@@ -258,12 +251,9 @@ def text_similarity(a, b):
     return len(intersection) / max(len(words_a), len(words_b))
 
 
-def main():
-    dry_run = '--dry-run' in sys.argv
-
-    with open(EXAMS_JSON, 'r') as f:
-        exams = json.load(f)
-    print(f"Loaded {len(exams)} exams")
+def apply_fixes(corpus, dry_run=False):
+    """Re-extract question text/statements for a loaded corpus (in memory, no save)."""
+    exams = corpus.exams
 
     total_text_fixes = 0
     total_stmt_fixes = 0
@@ -277,9 +267,12 @@ def main():
         if not exam['questions']:
             continue
 
-        pdf_path = get_pdf_for_exam(eid)
+        pdf_path = pdf_for_exam(eid)
         if not pdf_path:
             continue
+        if is_scanned(pdf_path):
+            print(f"  {eid}: scanned PDF, skipping")
+            continue
 
         # Extract text from PDF
         pdf_text = extract_pdf_text(pdf_path)
@@ -386,10 +379,20 @@ def main():
         for eid in sorted(exam_fixes.keys()):
             print(f"  {eid}: {exam_fixes[eid]}")
 
+
+def main():
+    dry_run = '--dry-run' in sys.argv
+
+    corpus = load_corpus()
+    print(f"Loaded {len(corpus.exams)} exams")
+
+    apply_fixes(corpus, dry_run)
+
     if not dry_run:
-        with open(EXAMS_JSON, 'w') as f:
-            json.dump(exams, f, ensure_ascii=False, indent=2)
-        print(f"\nSaved to {EXAMS_JSON}")
+        if corpus.save():
+            print(f"\nSaved to {corpus.path}")
+        else:
+            print(f"\nNo changes, {corpus.path} left untouched")
     else:
         print(f"\nDry run - no changes written")
 
@@ -0,0 +1,169 @@
+#!/usr/bin/env python3
+"""Adaptive WebP encoding for the exam images.
+
+extract_pdf_images used to save every image as lossy WebP at quality 60.
+Question text, answer grids and scanned pages are nearly monochrome, so
+other encodings are often much smaller at the same visual quality:
+
+  lossy-qN   lossy WebP at quality N
+  lossless   lossless WebP
+  grayN      grayscale reduced to N levels, lossless WebP (which stores it
+             as a palette image)
+
+encode_adaptive() picks the smallest candidate of an asset class profile
+whose SSIM and PSNR against the rendered image meet the profile's
+thresholds. Lossless always qualifies, so there is always a result.
+Metrics are computed on all three RGB channels, so the grayscale
+candidates never qualify for coloured images.
+"""
+
+import io
+from collections import namedtuple
+
+import numpy as np
+from PIL import Image
+
+# The fixed encoding used before; bytes saved are reported against it
+BASELINE_QUALITY = 60
+LOSSLESS_METHOD = 4  # 6 is ~2-10% smaller but about 80x slower
+SSIM_WINDOW = 8
+
+# Candidates and quality thresholds per asset class (see asset_class())
+PROFILES = {
+    'question': {'qualities': [30, 45, 60, 75], 'gray_levels': [8, 16],
+                 'min_ssim': 0.997, 'min_psnr': 36.0},
+    'answer': {'qualities': [45, 60, 75], 'gray_levels': [8, 16],
+               'min_ssim': 0.997, 'min_psnr': 36.0},
+    'page': {'qualities': [30, 45, 60, 75], 'gray_levels': [8, 16],
+             'min_ssim': 0.995, 'min_psnr': 35.0},
+}
+
+# data: the WebP bytes; choice: candidate name; baseline_size: bytes the
+# fixed quality-60 encoding would have taken
+Encoded = namedtuple('Encoded', 'data choice ssim psnr baseline_size')
+
+
+def asset_class(filename):
+    """Profile name for an output file name (q3.webp, a3.webp, page2.webp...)."""
+    if filename.startswith('page'):
+        return 'page'
+    if filename.startswith('a'):  # a{N}.webp and answer_key.webp
+        return 'answer'
+    return 'question'
+
+
+def profiles(min_ssim=None, min_psnr=None):
+    """PROFILES with the thresholds of every class optionally overridden."""
+    result = {}
+    for name, profile in PROFILES.items():
+        profile = dict(profile)
+        if min_ssim is not None:
+            profile['min_ssim'] = min_ssim
+        if min_psnr is not None:
+            profile['min_psnr'] = min_psnr
+        result[name] = profile
+    return result
+
+
+def webp_bytes(img, **params):
+    buf = io.BytesIO()
+    img.save(buf, "WebP", **params)
+    return buf.getvalue()
+
+
+def psnr(ref, test):
+    """Peak signal-to-noise ratio in dB of two uint8 arrays (inf if equal)."""
+    mse = np.mean((ref.astype(np.float64) - test) ** 2)
+    return float('inf') if mse == 0 else float(10 * np.log10(255.0 ** 2 / mse))
+
+
+def ssim(ref, test, window=SSIM_WINDOW):
+    """Mean SSIM over non-overlapping window x window blocks of every channel."""
+    h = ref.shape[0] - ref.shape[0] % window
+    w = ref.shape[1] - ref.shape[1] % window
+    if not h or not w:
+        return 1.0 if np.array_equal(ref, test) else 0.0
+    shape = (h // window, window, w // window, window, -1)
+    a = ref[:h, :w].astype(np.float32).reshape(shape)
+    b = test[:h, :w].astype(np.float32).reshape(shape)
+    n = window * window
+
+    def block_mean(x):
+        return x.sum(axis=3).sum(axis=1) / n
+
+    mean_a = block_mean(a)
+    mean_b = block_mean(b)
+    var_a = block_mean(a * a) - mean_a * mean_a
+    var_b = block_mean(b * b) - mean_b * mean_b
+    cov = block_mean(a * b) - mean_a * mean_b
+    c1 = (0.01 * 255) ** 2
+    c2 = (0.03 * 255) ** 2
+    score = (((2 * mean_a * mean_b + c1) * (2 * cov + c2)) /
+             ((mean_a ** 2 + mean_b ** 2 + c1) * (var_a + var_b + c2)))
+    return float(score.mean())
+
+
+def gray_lut(levels):
+    """Lookup table mapping 0..255 to `levels` evenly spaced shades of gray."""
+    step = 255 / (levels - 1)
+    return [round(round(v / step) * step) for v in range(256)]
+
+
+def gray_levels(img, levels):
+    """img reduced to `levels` evenly spaced shades of gray (as RGB)."""
+    return img.convert("L").point(gray_lut(levels)).convert("RGB")
+
+
+def candidate_chains(img, profile):
+    """Two lazy chains of (name, encode()) ordered by fidelity.
+
+    Within a chain the output grows with fidelity, so the first candidate
+    that meets the thresholds is the smallest acceptable one of its chain.
+    The gray chain ends with lossless, which is exact.
+    """
+    gray = [(f'gray{levels}',
+             lambda levels=levels: webp_bytes(gray_levels(img, levels), lossless=True,
+                                              method=LOSSLESS_METHOD))
+            for levels in sorted(profile['gray_levels'])]
+    gray.append(('lossless', lambda: webp_bytes(img, lossless=True, method=LOSSLESS_METHOD)))
+    lossy = [(f'lossy-q{quality}', lambda quality=quality: webp_bytes(img, quality=quality))
+             for quality in sorted(profile['qualities'])]
+    return gray, lossy
+
+
+def encode_fixed(img, quality=BASELINE_QUALITY):
+    """The old behaviour: lossy WebP at one quality."""
+    data = webp_bytes(img, quality=quality)
+    return Encoded(data, f'lossy-q{quality}', None, None, len(data))
+
+
+def encode_adaptive(img, profile):
+    """Smallest candidate meeting the profile's SSIM/PSNR thresholds.
+
+    Each chain is walked until a candidate passes or gets larger than the
+    best result so far, so a typical image needs two or three encodes
+    instead of one per candidate.
+    """
+    img = img.convert("RGB")
+    ref = np.asarray(img)
+    encoded = {}
+    best = None
+    for chain in candidate_chains(img, profile):
+        for name, encode in chain:
+            data = encoded[name] = encode()
+            if best is not None and len(data) >= len(best.data):
+                break
+            if name == 'lossless':
+                best = Encoded(data, name, 1.0, float('inf'), None)
+                break
+            test = np.asarray(Image.open(io.BytesIO(data)).convert("RGB"))
+            s = ssim(ref, test)
+            p = psnr(ref, test) if s >= profile['min_ssim'] else None
+            if p is not None and (profile.get('min_psnr') is None or p >= profile['min_psnr']):
+                best = Encoded(data, name, s, p, None)
+                break
+
+    baseline = encoded.get(f'lossy-q{BASELINE_QUALITY}')
+    if baseline is None:
+        baseline = webp_bytes(img, quality=BASELINE_QUALITY)
+    return best._replace(baseline_size=len(baseline))
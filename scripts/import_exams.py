@@ -1,33 +1,99 @@
+#!/usr/bin/env python3
+"""Import exam PDFs from fragen/ into exams.json.
+
+Every PDF in fragen/ is one exam ("Maerz-2017.pdf", "HPP_Pruefung_Oktober_
+2024_...pdf" -> 2017-march, 2024-october). PDFs from 2019 on are parsed in
+memory with fitz (parse_pdf_modern), older ones from pdftotext -layout
+output (parse_pdf_old). Scanned PDFs are read from their OCR text
+(pdf_text "ocr" backend, see pdf_ocr): the check box noise in front of
+the markers is cleaned up line by line, then the shared pdf_tokens
+tokenizer parses the questions (parse_pdf_scanned). They need tesseract
+unless the OCR cache is warm, and their answer key is left to the
+existing exam.
+
+The import is incremental: the SHA-256 of every imported PDF is recorded in
+.cache/import/state.json, and PDFs whose hash matches the last import are
+not parsed again. Exams already in exams.json but not yet recorded (the
+hand-fixed corpus) are recorded without parsing, so a first run only adds
+new exams; --force re-imports them. Parsed exams are merged into exams.json
+by exam id: a re-imported exam replaces its questions (keeping explanations
+and answer keys the new ones lack), every other exam stays as it is.
+Freshly parsed questions lack the hand fixes of the fix scripts ("A) "
+option prefixes, merged questions), so the fix_pipeline passes run over
+the merged exams before the corpus is written (--no-fix skips them); all
+other exams are left byte-identical.
+
+PDFs are parsed in parallel worker processes.
+
+Usage: python3 scripts/import_exams.py [--jobs N] [--force] [--dry-run] [--no-fix] [PDF ...]
+  --jobs N    parallel worker processes (default: CPU count)
+  --force     re-import the given PDFs (default: all) even if unchanged
+  --dry-run   parse and report, but do not write exams.json or the state
+  --no-fix    do not run the fix_pipeline passes on the merged exams
+Imports the given PDFs (default: all of fragen/).
+Run from project root.
+"""
+
+import argparse
+import copy
 import os
 import re
 import json
 import subprocess
-from bs4 import BeautifulSoup
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+import fix_pipeline
+import page_types
+from answer_grid import (answer_key_pages, decode_answer_grid, question_group, text_group,
+                         word_boxes)
+from corpus import Exam, diff_snapshots, load_corpus
+from pdf_catalog import parse_pdf_name
+from pdf_text import file_sha256, find_gruppe_b_page, get_page_texts
+from pdf_tokens import MAX_QUESTIONS, OPTION, QUESTION_TYPES, tokenize
 
-FRAGEN_DIR = "/home/aroc/projects/Heilpraktikerpruefung/fragen"
-OUTPUT_JSON = "/home/aroc/projects/Heilpraktikerpruefung/app/src/main/assets/exams.json"
+FRAGEN_DIR = "fragen"
+STATE_PATH = ".cache/import/state.json"
+STATE_FORMAT = 1
+MODERN_FROM_YEAR = 2019  # first year of the text-layer PDFs with a key grid
 
 def get_exams_list():
     files = [f for f in os.listdir(FRAGEN_DIR) if f.endswith(".pdf")]
     return sorted(files)
 
-def parse_questions_from_html(main_html):
-    with open(main_html, 'r') as f:
-        soup = BeautifulSoup(f, 'html.parser')
-    
+# Question lines of the modern PDFs: "12 Einfachauswahl", "1. statement",
+# "A) option" (some years "A. option"). Lines may start with a bullet glyph
+# from the symbol font's private use area or a low quote.
+QUESTION_START_RE = re.compile(r'^(\d{1,2})\s+(' + QUESTION_TYPES + ')')
+STATEMENT_RE = re.compile(r'^(\d+)\.\s+(.*)')
+OPTION_RE = re.compile(r'^([A-E])(?:\)\s*|\.\s+)(.*)')
+LEADING_GLYPHS_RE = re.compile(r'^[\s\uf000-\uf8ff‚„]+')
+
+# OCR of the scanned PDFs: the question number and type are on separate
+# lines ("7 | |" then "Einfachauswahl"), and the answer check boxes come out
+# as noise in front of the option markers ("|] A)", "[1] c)", "| D Ein").
+OCR_NUMBER_LINE_RE = re.compile(r'^(\d{1,2})(?:\W*|\s.{0,3})$')
+OCR_TYPE_LINE_RE = re.compile(r'^(' + QUESTION_TYPES + r')\b')
+OCR_OPTION_RE = re.compile(r'^(?:[\W_\d]|[A-Za-z](?=[\[\]|])){0,6}?\s*[A-Za-z0-9©]{1,2}\)\s+')
+
+def page_lines(page_dict):
+    """Text lines of a page from its get_text("rawdict")."""
+    lines = []
+    for block in page_dict['blocks']:
+        for line in block.get('lines', []):
+            lines.append("".join(c['c'] for span in line['spans'] for c in span['chars']))
+    return lines
+
+def parse_questions_from_lines(lines):
     questions = []
-    # Identify question blocks. Usually start with a number followed by a type.
-    # Ex: "1 Einfachauswahl", "2 Aussagenkombination"
-    ps = soup.find_all('p')
     current_q = None
-    
-    for i, p in enumerate(ps):
-        text = p.get_text().strip()
-        # Regex for question start: "1 Einfachauswahl" or similar
-        match = re.search(r'^(\d+)\s+(Einfachauswahl|Aussagenkombination|Mehrfachauswahl)', text)
+
+    for line in lines:
+        text = LEADING_GLYPHS_RE.sub('', line).strip()
+        if not text:
+            continue
+        match = QUESTION_START_RE.search(text)
         if match:
-            if current_q:
-                questions.append(current_q)
             current_q = {
                 "id": int(match.group(1)),
                 "type": match.group(2).strip(),
@@ -37,158 +103,112 @@ def parse_questions_from_html(main_html):
                 "correctIndices": [],
                 "explanation": ""
             }
+            questions.append(current_q)
+            continue
+        if not current_q:
             continue
-            
-        if current_q:
-            # Check for statements (1. ..., 2. ...)
-            statement_match = re.match(r'^(\d+)\.\s+(.*)', text)
-            if statement_match and current_q["type"] == "Aussagenkombination":
-                current_q["statements"].append(statement_match.group(2).strip())
-                continue
-                
-            # Check for options (A) ..., B) ...)
-            option_match = re.match(r'^([A-E])\)\s*(.*)', text)
-            if option_match:
-                current_q["options"].append(f"{option_match.group(1)}) {option_match.group(2).strip()}")
-                continue
-            
-            # If it's not a statement or option, it's part of the question text
-            if text and not text.startswith("Wählen Sie"):
-                if current_q["options"]: # Already in options, maybe multi-line?
-                     # Handle multi-line options if needed
-                     pass
-                else:
-                     current_q["text"] += " " + text
-                     current_q["text"] = current_q["text"].strip()
-                     
-    if current_q:
-        questions.append(current_q)
-    return questions
-
-def parse_solutions_from_html(main_html):
-    with open(main_html, 'r') as f:
-        soup = BeautifulSoup(f, 'html.parser')
-    
-    ps = soup.find_all('p')
-    
-    # 1. Collect all elements in the solution area
-    grid_elements = []
-    found_key = False
-    for p in ps:
-        text = p.get_text().strip()
-        if "Lösungsschlüssel" in text or "Lösungsschluessel" in text:
-            found_key = True
-        if not found_key: continue
-        
-        style = p.get('style', '')
-        left_match = re.search(r'left:(\d+)px', style)
-        top_match = re.search(r'top:(\d+)px', style)
-        if not left_match or not top_match: continue
-        left = int(left_match.group(1))
-        top = int(top_match.group(1))
-        
-        grid_elements.append({
-            "text": text,
-            "left": left,
-            "top": top,
-            "class": p.get('class', [None])[0]
-        })
 
-    if not grid_elements: return {}
+        statement_match = STATEMENT_RE.match(text)
+        if statement_match and current_q["type"] == "Aussagenkombination" and not current_q["options"]:
+            current_q["statements"].append(statement_match.group(2).strip())
+            continue
+        option_match = OPTION_RE.match(text)
+        if option_match:
+            current_q["options"].append(f"{option_match.group(1)}) {option_match.group(2).strip()}")
+            continue
+        if text.startswith("Wählen Sie"):
+            continue
 
-    # 2. Group into rows by 'top'
-    rows = []
-    for el in sorted(grid_elements, key=lambda x: x["top"]):
-        if not rows or abs(el["top"] - rows[-1][0]["top"]) > 10:
-            rows.append([el])
+        # Anything else continues the last option, statement or the question text
+        if current_q["options"]:
+            current_q["options"][-1] += " " + text
+        elif current_q["statements"]:
+            current_q["statements"][-1] += " " + text
         else:
-            rows[-1].append(el)
-            
-    for row in rows:
-        row.sort(key=lambda x: x["left"])
+            current_q["text"] = (current_q["text"] + " " + text).strip()
 
-    # 3. Identify rows and detect correct class globally
-    letter_rows = []
-    
-    for row in rows:
-        row_text = " ".join([el["text"] for el in row])
-        if any(re.match(r'^[A-E](\s+[A-E])*$', el["text"].strip()) for el in row) or "A B C D E" in row_text.replace(" ", ""):
-            letter_rows.append(row)
-
-    # 4. Dynamically detect 'correct' class
-    class_counts = {}
-    for row in letter_rows:
-        for el in row:
-            letters = [c for c in el["text"] if c in "ABCDE"]
-            if letters:
-                cls = el["class"]
-                class_counts[cls] = class_counts.get(cls, 0) + len(letters)
-    
-    # Filter classes with too few occurrences (noise)
-    # A generic exam has ~60 questions. Correct class should have > 10 hits at least.
-    valid_classes = [c for c, count in class_counts.items() if count > 10]
-    
-    if not valid_classes: 
-        if class_counts:
-             valid_classes = list(class_counts.keys())
-        else:
-             return {}
+    return questions
 
-    # Sort valid classes by count
-    sorted_valid = sorted(valid_classes, key=lambda x: class_counts[x])
-    correct_class = sorted_valid[0] # Pick the valid class with the lowest count
+def ocr_question_lines(pages):
+    """Lines of OCR'd question pages with canonical question and option markers.
 
-    # 5. Extract solutions (Stateful Pass)
-    solutions = {}
-    current_q_centers = {}
-    
-    for row in rows:
-        row_text = " ".join([el["text"] for el in row])
-        nums = re.findall(r'\d+', row_text)
-        
-        # Check if Header Row (heuristic: at least 5 numbers)
-        if len(nums) >= 5: 
-            # Reset current centers for new block to avoid mixing with previous block
-            current_q_centers = {} 
-            
-            for el in row:
-                parts = el["text"].split()
-                current_left = el["left"]
-                for p in parts:
-                    if p.isdigit():
-                         q_id = int(p)
-                         current_q_centers[current_left + 10] = q_id
-                         current_left += 48
-
-        # Check if Letter Row (and extract if we have active centers)
-        elif any(re.match(r'^[A-E](\s+[A-E])*$', el["text"].strip()) for el in row) or "A B C D E" in row_text.replace(" ", ""):
-            if not current_q_centers: continue # No header seen yet?
-            
-            for el in row:
-                if el["class"] == correct_class:
-                    parts = el["text"].split()
-                    txt = el["text"].strip()
-                    clean_txt = "".join([c for c in txt if c in "ABCDE"])
-                    
-                    if not clean_txt: continue
-                    
-                    x = el["left"] + 10 # Center bias
-                    
-                    best_q = None
-                    min_dist = 20
-                    for cx, q_id in current_q_centers.items():
-                        if abs(cx - x) < min_dist:
-                            min_dist = abs(cx - x)
-                            best_q = q_id
-                    
-                    if best_q:
-                        print(f"DEBUG: MATCH Q{best_q} -> {clean_txt} at x={x} (center={cx}, dist={min_dist})")
-                        if best_q not in solutions: solutions[best_q] = []
-                        for char in clean_txt:
-                            if char not in solutions[best_q]:
-                                solutions[best_q].append(char)
-                                
-    return solutions
+    A question type line gets the number from the line before it, or the
+    previous number + 1 if that is missing or implausible. Up to five marker
+    lines after it become "A) " .. "E) " in order, whatever letter the OCR
+    read.
+    """
+    lines = []
+    last_id = 0
+    number = None
+    options = 5
+    for page in pages:
+        for line in page.split('\n'):
+            line = line.strip()
+            m = OCR_NUMBER_LINE_RE.match(line)
+            if m:
+                number = int(m.group(1))
+                continue
+            m = OCR_TYPE_LINE_RE.match(line)
+            if m:
+                last_id = number if number and last_id < number <= MAX_QUESTIONS else last_id + 1
+                line = f"{last_id} {m.group(1)}"
+                options = 0
+            elif options < 5:
+                m = (OCR_OPTION_RE.match(line) or
+                     re.match(r'^[\W_]{1,4}\s*' + 'ABCDE'[options] + r'\s+', line))
+                if m:
+                    line = f"{'ABCDE'[options]}) {line[m.end():]}"
+                    options += 1
+            if line:
+                number = None
+            lines.append(line)
+    return lines
+
+def _join_lines(text):
+    """Lines of a question part on one line, without the "Wählen Sie" instruction."""
+    lines = [line for line in text.split('\n') if not line.strip().startswith("Wählen Sie")]
+    return " ".join(" ".join(lines).split())
+
+def parse_token_questions(text):
+    """Questions of a question text, parsed from its pdf_tokens token stream.
+
+    Questions run from one "N Type" header to the next. Options are the
+    first A) .. E) markers at line starts, in order; a statement is a
+    numbered "N." block before them (Aussagenkombination only). Options
+    keep their "A) " prefix, as in parse_questions_from_lines.
+    """
+    stream = tokenize(text)
+    starts = stream.question_starts()
+    order = sorted(starts, key=lambda n: starts[n][0])
+    questions = []
+    for i, number in enumerate(order):
+        _, lo, kind = starts[number]
+        hi = starts[order[i + 1]][0] if i + 1 < len(order) else len(text)
+        options = []  # [(line start, body start)]
+        for t in stream.markers(lo, hi, OPTION, spaced=True):
+            if len(options) < 5 and t.key == 'ABCDE'[len(options)] and not t.lead:
+                line = stream.line_start(t, lo)
+                if line is not None:
+                    options.append((line, stream.skip_ws(t.end, hi)))
+        options_at = options[0][0] if options else hi
+        bodies = [text[body:options[k + 1][0] if k + 1 < len(options) else hi]
+                  for k, (_, body) in enumerate(options)]
+        statements, text_end = [], options_at
+        if kind.startswith("Aussage"):
+            blocks = stream.numbered_blocks(lo, options_at, delims='.')
+            if blocks:
+                text_end = blocks[0].start
+                statements = [_join_lines(text[b.body_start:b.body_end]) for b in blocks]
+        questions.append({
+            "id": number,
+            "type": kind,
+            "text": _join_lines(text[lo:text_end]),
+            "options": [f"{'ABCDE'[k]}) {_join_lines(body)}" for k, body in enumerate(bodies)],
+            "statements": statements,
+            "correctIndices": [],
+            "explanation": ""
+        })
+    return questions
 
 def parse_text_exam(text):
     # Split text into questions and solution key
@@ -245,63 +265,205 @@ def parse_pdf_old(pdf_path):
     return parse_text_exam(result.stdout)
 
 def parse_pdf_modern(pdf_path):
-    temp_dir = "temp_html"
-    os.makedirs(temp_dir, exist_ok=True)
-    base_name = os.path.basename(pdf_path).replace(".pdf", "")
-    html_file = os.path.join(temp_dir, f"{base_name}.html")
-    
+    """Questions and answer key of a modern (text layer) PDF, in memory.
+
+    One get_text("rawdict") pass per page feeds both the question lines and
+    the word boxes of the answer key grid. Questions end at the first key
+    page, or where the Gruppe B copy of the questions starts.
+    """
+    import fitz
+    key_pages = set(answer_key_pages(pdf_path))
+    lines = []
+    solutions = {}
+    with fitz.open(pdf_path) as doc:
+        group = question_group(doc)
+        texts = []  # lines of every page, empty for key pages
+        for page_idx, page in enumerate(doc):
+            page_dict = page.get_text("rawdict")
+            if page_idx in key_pages:
+                if not solutions:
+                    solutions = decode_answer_grid(word_boxes(page, page_dict), group)
+                texts.append([])
+            else:
+                texts.append(page_lines(page_dict))
+    end = min(key_pages) if key_pages else len(texts)
+    gruppe_b = find_gruppe_b_page("\n".join(page) for page in texts)
+    if gruppe_b:
+        end = min(end, gruppe_b)
+    questions = parse_questions_from_lines(line for page in texts[:end] for line in page)
+
+    # Merge solutions into questions
+    for q in questions:
+        if q["id"] in solutions:
+            q["correctIndices"] = [ord(l) - ord('A') for l in solutions[q["id"]]]
+    return questions
+
+def parse_pdf_scanned(pdf_path):
+    """Questions and group of a scanned PDF from its OCR text.
+
+    Questions end at the first answer key page or the Gruppe B copy. The key
+    grid is not decoded from OCR, so correctIndices stay empty.
+    """
+    pages = get_page_texts(pdf_path, "ocr")
+    end = next((i for i, text in enumerate(pages)
+                if page_types.is_answer_key_text(text, i, len(pages))), len(pages))
+    gruppe_b = find_gruppe_b_page(pages)
+    if gruppe_b:
+        end = min(end, gruppe_b)
+    # ocr_question_lines only rewrites the noisy markers; the shared
+    # tokenizer does the parsing, as for the text-layer PDFs
+    questions = parse_token_questions("\n".join(ocr_question_lines(pages[:end])))
+    return questions, text_group(pages[0]) if pages else 'A'
+
+def import_pdf(pdf_path):
+    """Parse one PDF in a worker.
+
+    Returns (questions, gruppe, error, seconds); error is a message or None.
+    """
+    import fitz
+    start = time.perf_counter()
+    questions, gruppe, error = [], 'A', None
     try:
-        subprocess.run(["pdftohtml", "-s", "-c", pdf_path, html_file], stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
-        main_html = html_file.replace(".html", "-html.html")
-        if not os.path.exists(main_html):
-            # Fallback to text for modern PDFs if HTML fails
-            return parse_pdf_old(pdf_path)
-            
-        questions = parse_questions_from_html(main_html)
-        solutions = parse_solutions_from_html(main_html)
-        
-        # Merge solutions into questions
-        for q in questions:
-             q_id = q["id"]
-             if q_id in solutions:
-                 correct_letters = solutions[q_id]
-                 q["correctIndices"] = [ord(l) - ord('A') for l in correct_letters]
-             
-        return questions
-    finally:
-        subprocess.run(["rm", "-rf", temp_dir])
-
-def run_import():
-    all_exams = []
-    pdf_files = get_exams_list()
-    
-    for pdf in pdf_files:
-        if "Oktober_2024_mit_Loesungen_A_B" not in pdf: continue
-        print(f"Processing {pdf}...")
-        match = re.search(r'(Maerz|Oktober).*?(\d{4})', pdf, re.I)
-        if match:
-            month_de = match.group(1).lower()
-            month = "March" if "maerz" in month_de else "October"
-            year = int(match.group(2))
-            exam_id = f"{year}-{month.lower()}"
-            
-            questions = []
-            full_path = os.path.join(FRAGEN_DIR, pdf)
-            if year >= 2019:
-                 questions = parse_pdf_modern(full_path)
+        _, year, _ = parse_pdf_name(pdf_path)
+        if page_types.is_scanned(pdf_path):
+            questions, gruppe = parse_pdf_scanned(pdf_path)
+        else:
+            with fitz.open(pdf_path) as doc:
+                gruppe = question_group(doc)
+            if year >= MODERN_FROM_YEAR:
+                questions = parse_pdf_modern(pdf_path)
             else:
-                 questions = parse_pdf_old(full_path)
-            
-            all_exams.append({
-                "id": exam_id,
-                "year": year,
-                "month": month,
-                "questions": questions
-            })
-            
-    with open(OUTPUT_JSON, 'w') as f:
-        json.dump(all_exams, f, indent=2, ensure_ascii=False)
-    print(f"Import complete. Generated {len(all_exams)} exam entries.")
+                questions = parse_pdf_old(pdf_path)
+        if not questions:
+            error = "no questions found"
+    except Exception as e:
+        error = f"{type(e).__name__}: {e}"
+    return questions, gruppe, error, time.perf_counter() - start
+
+def load_state():
+    try:
+        with open(STATE_PATH) as f:
+            state = json.load(f)
+    except (OSError, ValueError):
+        return {}
+    return state.get('pdfs', {}) if state.get('format') == STATE_FORMAT else {}
+
+def save_state(pdfs):
+    os.makedirs(os.path.dirname(STATE_PATH), exist_ok=True)
+    tmp = f"{STATE_PATH}.{os.getpid()}.tmp"
+    with open(tmp, 'w') as f:
+        json.dump({'format': STATE_FORMAT, 'pdfs': pdfs}, f, indent=1, sort_keys=True)
+    os.replace(tmp, STATE_PATH)
+
+def merge_exam(corpus, exam_id, year, month, questions, gruppe):
+    """Add or replace one exam of the corpus. Returns "added" or "replaced".
+
+    gruppe is only used for new exams; a replaced exam keeps its own.
+    """
+    exam = corpus.exam(exam_id)
+    if exam is None:
+        corpus.exams.append(Exam(exam_id, year, month, questions, gruppe))
+        return "added"
+    previous = {q['id']: q for q in exam['questions']}
+    for q in questions:
+        old = previous.get(q['id'])
+        if old is None:
+            continue
+        # Scanned PDFs have no decoded answer key
+        for key in ('explanation', 'correctIndices'):
+            if not q.get(key) and old.get(key):
+                q[key] = old[key]
+    exam['questions'] = questions
+    return "replaced"
+
+def apply_fix_passes(corpus, exam_ids):
+    """Run the fix_pipeline passes on the given exams; returns the questions they changed.
+
+    The passes work on the whole corpus and are not idempotent on the
+    committed exams.json, so every other exam is put back exactly as it
+    was before them.
+    """
+    order = [exam.get('id') for exam in corpus.exams]
+    untouched = {exam.get('id'): copy.deepcopy(exam) for exam in corpus.exams
+                 if exam.get('id') not in exam_ids}
+    before = corpus.snapshot()
+    for name, fn in fix_pipeline.PASSES:
+        try:
+            fix_pipeline.run_pass(corpus, fn, quiet=True)
+        except Exception as e:
+            print(f"  Fix pass {name} failed: {e!r}; run fix_pipeline.py once it works")
+    fixed = {exam.get('id'): exam for exam in corpus.exams if exam.get('id') in exam_ids}
+    corpus.exams[:] = [untouched[eid] if eid in untouched else fixed[eid]
+                       for eid in order if eid in untouched or eid in fixed]
+    return diff_snapshots(before, corpus.snapshot())[0]
+
+def run_import(pdfs=None, jobs=None, force=False, dry_run=False, fix=True):
+    corpus = load_corpus()
+    state = load_state()
+    pdf_files = pdfs or [os.path.join(FRAGEN_DIR, f) for f in get_exams_list()]
+
+    pending = []  # (pdf_path, name, sha, exam)
+    for pdf_path in pdf_files:
+        name = os.path.basename(pdf_path)
+        exam = parse_pdf_name(name)
+        if exam is None:
+            print(f"  {name:<55} no exam id in file name, skipping")
+            continue
+        sha = file_sha256(pdf_path)
+        recorded = state.get(name, {})
+        if not force and recorded.get('sha256') == sha and corpus.exam(exam[0]) is not None:
+            continue
+        if not force and not recorded and corpus.exam(exam[0]) is not None:
+            # Already in exams.json from before incremental imports: keep it
+            state[name] = {'sha256': sha, 'exam_id': exam[0]}
+            print(f"  {name:<55} {exam[0]:<14} already in exams.json, recorded")
+            continue
+        pending.append((pdf_path, name, sha, exam))
+    print(f"{len(pending)} of {len(pdf_files)} PDFs to import")
+
+    wall_start = time.perf_counter()
+    paths = [p[0] for p in pending]
+    if (jobs or os.cpu_count()) > 1 and len(pending) > 1:
+        with ProcessPoolExecutor(max_workers=jobs) as pool:
+            results = list(pool.map(import_pdf, paths))
+    else:
+        results = [import_pdf(p) for p in paths]
+    wall_time = time.perf_counter() - wall_start
+
+    merged = []  # exam ids
+    for (pdf_path, name, sha, (exam_id, year, month)), result in zip(pending, results):
+        questions, gruppe, error, seconds = result
+        if error:
+            print(f"  {name:<55} {exam_id:<14} {error} ({seconds:.2f}s)")
+            continue
+        action = merge_exam(corpus, exam_id, year, month, questions, gruppe)
+        state[name] = {'sha256': sha, 'exam_id': exam_id}
+        merged.append(exam_id)
+        print(f"  {name:<55} {exam_id:<14} {len(questions):>3} questions, "
+              f"{action} ({seconds:.2f}s)")
+    if merged and fix:
+        print(f"Fix passes: {apply_fix_passes(corpus, set(merged))} change(s)")
+
+    if dry_run:
+        print(f"Dry run: {len(merged)} exam(s) parsed in {wall_time:.1f}s, nothing written.")
+        return
+    written = corpus.save()
+    save_state(state)
+    print(f"Import complete: {len(merged)} exam(s) imported in {wall_time:.1f}s, "
+          f"{len(corpus)} exams in {corpus.path}" + ("" if written else " (unchanged)"))
+
+def main():
+    parser = argparse.ArgumentParser(description="Import exam PDFs into exams.json.")
+    parser.add_argument('pdfs', nargs='*', help="PDFs (default: all of fragen/)")
+    parser.add_argument('--jobs', type=int, help="parallel worker processes (default: CPU count)")
+    parser.add_argument('--force', action='store_true',
+                        help="re-import even if the PDF is unchanged since the last import")
+    parser.add_argument('--dry-run', action='store_true',
+                        help="parse and report without writing exams.json")
+    parser.add_argument('--no-fix', action='store_true',
+                        help="do not run the fix_pipeline passes on the merged exams")
+    args = parser.parse_args()
+    run_import(args.pdfs, args.jobs, args.force, args.dry_run, not args.no_fix)
 
 if __name__ == "__main__":
-    run_import()
+    main()
@@ -0,0 +1,168 @@
+#!/usr/bin/env python3
+"""Per-page classification of the exam PDFs, cached on disk.
+
+Which PDFs are scanned used to be decided by extracting the text of the
+first five pages (extract_pdf_images) or by hand-maintained exam lists
+(KNOWN_SCANNED, SKIP_EXAMS). classify_page() looks at cheap PyMuPDF
+signals instead - fonts on the page (no fonts, no text layer), length of
+the text layer, and the fraction of the page covered by images - and
+assigns one of:
+
+  text        text layer, no large images
+  scanned     no usable text layer, mostly image
+  mixed       large images plus a text layer (e.g. an OCR'd scan)
+  answer_key  text page in the second half of the PDF with the
+              "Lösungsschlüssel" heading, or "Lösungen" on one of the last
+              four pages (is_answer_key_text, shared with pdf_layout)
+  blank       neither text nor images
+
+The page-type map of a PDF is stored under .cache/page_types/, keyed by the
+SHA-256 of the PDF and CLASSIFIER_VERSION, so stages can route pages
+without opening the PDF again.
+
+Usage: python3 scripts/page_types.py [PDF ...]
+Prints the page-type map of the given PDFs (default: all of fragen/).
+Run from project root.
+"""
+
+import json
+import os
+import sys
+
+from pdf_text import file_sha256
+
+FRAGEN_DIR = "fragen"
+CACHE_DIR = ".cache/page_types"
+CACHE_FORMAT = 1
+# Bump when the classification rules or thresholds change
+CLASSIFIER_VERSION = 2
+
+TEXT = 'text'
+SCANNED = 'scanned'
+MIXED = 'mixed'
+ANSWER_KEY = 'answer_key'
+BLANK = 'blank'
+
+MIN_TEXT_CHARS = 50        # fewer stripped characters: no usable text layer
+MIN_IMAGE_COVERAGE = 0.2   # text pages only carry small logos (~1%)
+ANSWER_KEY_MARKERS = ("Lösungsschlüssel", "Lösungschlüssel")
+SOLUTIONS_MARKER = "Lösungen"  # older key pages: "Lösungen Gruppe A"
+SOLUTIONS_LAST_PAGES = 4       # ... which only counts near the end
+
+# One letter per type for the printed map
+TYPE_LETTERS = {TEXT: 'T', SCANNED: 'S', MIXED: 'M', ANSWER_KEY: 'K', BLANK: '.'}
+
+_memo = {}  # sha256 -> [page entry]
+
+
+def image_coverage(page):
+    """Fraction of the page area covered by images (overlaps count twice, capped at 1)."""
+    area = abs(page.rect)
+    if not area:
+        return 0.0
+    covered = 0.0
+    for info in page.get_image_info():
+        covered += abs(page.rect & info['bbox'])
+    return min(covered / area, 1.0)
+
+
+def is_answer_key_text(text, page_idx, page_count):
+    """True if the text of page page_idx (of page_count) is an answer key page.
+
+    The one answer key rule of the pipeline: classify_page, pdf_layout and
+    pdf_catalog all go through it.
+    """
+    if page_idx < page_count // 2:
+        return False
+    if any(marker in text for marker in ANSWER_KEY_MARKERS):
+        return True
+    return SOLUTIONS_MARKER in text and page_idx >= page_count - SOLUTIONS_LAST_PAGES
+
+
+def classify_page(page):
+    """Page entry {'type', 'chars', 'fonts', 'image_coverage'} for a fitz page."""
+    fonts = len(page.get_fonts())
+    text = page.get_text() if fonts else ""
+    chars = len(text.strip())
+    coverage = image_coverage(page)
+    if chars >= MIN_TEXT_CHARS:
+        if coverage >= MIN_IMAGE_COVERAGE:
+            kind = MIXED
+        elif is_answer_key_text(text, page.number, page.parent.page_count):
+            kind = ANSWER_KEY
+        else:
+            kind = TEXT
+    else:
+        kind = SCANNED if coverage >= MIN_IMAGE_COVERAGE else BLANK
+    return {'type': kind, 'chars': chars, 'fonts': fonts,
+            'image_coverage': round(coverage, 3)}
+
+
+def _cache_path(sha):
+    return os.path.join(CACHE_DIR, f"{sha}-v{CLASSIFIER_VERSION}.json")
+
+
+def get_page_map(pdf_path):
+    """[page entry] for every page of a PDF (see classify_page), cached."""
+    sha = file_sha256(pdf_path)
+    if sha in _memo:
+        return _memo[sha]
+    path = _cache_path(sha)
+    try:
+        with open(path, encoding='utf-8') as f:
+            data = json.load(f)
+        pages = data['pages'] if data.get('format') == CACHE_FORMAT else None
+    except (OSError, ValueError, KeyError):
+        pages = None
+    if pages is None:
+        import fitz
+        with fitz.open(pdf_path) as doc:
+            pages = [classify_page(page) for page in doc]
+        os.makedirs(CACHE_DIR, exist_ok=True)
+        tmp = f"{path}.{os.getpid()}.tmp"
+        with open(tmp, 'w', encoding='utf-8') as f:
+            json.dump({'format': CACHE_FORMAT, 'sha256': sha, 'pages': pages}, f)
+        os.replace(tmp, path)
+    _memo[sha] = pages
+    return pages
+
+
+def page_types(pdf_path):
+    """Type of every page of a PDF."""
+    return [p['type'] for p in get_page_map(pdf_path)]
+
+
+def pages_of_type(pdf_path, *types):
+    """Indices of the pages with one of the given types."""
+    return [i for i, kind in enumerate(page_types(pdf_path)) if kind in types]
+
+
+def has_answer_key(pdf_path):
+    """True if any page of a PDF is an answer key page (is_answer_key_text)."""
+    return ANSWER_KEY in page_types(pdf_path)
+
+
+def is_scanned(pdf_path):
+    """True if most non-blank pages are scans without a text layer.
+
+    Scanned exams with a typed answer key page still count as scanned;
+    OCR'd scans (mixed pages) do not.
+    """
+    types = [kind for kind in page_types(pdf_path) if kind != BLANK]
+    return bool(types) and types.count(SCANNED) * 2 > len(types)
+
+
+def main():
+    pdfs = sys.argv[1:]
+    if not pdfs:
+        pdfs = [os.path.join(FRAGEN_DIR, f) for f in sorted(os.listdir(FRAGEN_DIR))
+                if f.endswith('.pdf')]
+    for pdf_path in pdfs:
+        letters = "".join(TYPE_LETTERS[kind] for kind in page_types(pdf_path))
+        label = "scanned" if is_scanned(pdf_path) else ""
+        print(f"  {os.path.basename(pdf_path):<55} {letters:<24} {label}")
+    print("  " + ", ".join(f"{letter} {kind}" for kind, letter in TYPE_LETTERS.items()))
+
+
+if __name__ == '__main__':
+    main()
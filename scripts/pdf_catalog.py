@@ -0,0 +1,173 @@
+#!/usr/bin/env python3
+"""Catalog of the exam PDFs in fragen/, persisted and refreshed by mtime.
+
+Every stage used to resolve an exam to its PDF on its own, probing a list of
+file name patterns with os.path.exists or scanning os.listdir on every call
+(fix_all, extract_options, extract_pdf_images, fix_question_text,
+verify_with_pypdf, gap_analysis, generate_verification_report). The lists
+had drifted apart: some did not know the "_mit_Loesungen_Gruppe_A" name.
+
+The catalog scans fragen/ once and records per PDF:
+
+  exam_id, year, month   from the file name ("Maerz-2017.pdf" -> 2017-march)
+  gruppe                 group named on the title page (answer_grid)
+  has_solutions          has an answer key page (page_types.has_answer_key)
+  pages, scanned         page count, mostly scanned pages (page_types)
+  sha256                 content hash
+
+It is stored in .cache/pdf_catalog.json. On load only PDFs whose size or
+mtime changed are examined again; removed PDFs are dropped. Lookups by exam
+id are dict lookups. If several PDFs name the same exam, the first match
+of NAME_PATTERNS wins.
+
+Usage: python3 scripts/pdf_catalog.py
+Prints the catalog. Run from project root.
+"""
+
+import json
+import os
+import re
+
+import page_types
+from pdf_text import file_sha256
+
+FRAGEN_DIR = "fragen"
+CATALOG_PATH = ".cache/pdf_catalog.json"
+CATALOG_FORMAT = 1
+EXAM_NAME_RE = re.compile(r'(Maerz|Oktober).*?(\d{4})', re.I)
+
+# Preferred file names of an exam, best first ({m}: Maerz/Oktober, {y}: year)
+NAME_PATTERNS = [
+    "{m}-{y}.pdf",
+    "HPP_Pruefung_{m}_{y}_mit_Loesungen_.pdf",
+    "HPP_Pruefung_{m}_{y}_mit_Loesungen.pdf",
+    "HPP_Pruefung_{m}_{y}_.pdf",
+    "HPP_Pruefung_{m}_{y}_mit_Loesungen_A_B.pdf",
+    "HPP_Pruefung_{m}_{y}_Gruppe_A_mit_Loesungen.pdf",
+    "HPP_Pruefung_{m}_{y}_mit_Loesungen_Gruppe_A.pdf",
+]
+
+_catalog = None   # file name -> entry, once loaded in this process
+_by_exam = None   # exam id -> entry
+
+
+def parse_pdf_name(name):
+    """(exam_id, year, month) of a PDF file name, or None."""
+    match = EXAM_NAME_RE.search(os.path.basename(name))
+    if not match:
+        return None
+    month = "March" if match.group(1).lower() == "maerz" else "October"
+    year = int(match.group(2))
+    return f"{year}-{month.lower()}", year, month
+
+
+def name_rank(name, year, month):
+    """Position of a file name in NAME_PATTERNS (unknown names last)."""
+    m = "Maerz" if month == "March" else "Oktober"
+    for rank, pattern in enumerate(NAME_PATTERNS):
+        if name == pattern.format(m=m, y=year):
+            return rank
+    return len(NAME_PATTERNS)
+
+
+def describe_pdf(path):
+    """Catalog entry of one PDF (opens it once, classifies its pages)."""
+    import fitz
+    from answer_grid import question_group
+    name = os.path.basename(path)
+    exam_id, year, month = parse_pdf_name(name)
+    st = os.stat(path)
+    with fitz.open(path) as doc:
+        pages = doc.page_count
+        gruppe = question_group(doc)
+    return {
+        'path': path, 'exam_id': exam_id, 'year': year, 'month': month,
+        'gruppe': gruppe,
+        'has_solutions': page_types.has_answer_key(path),
+        'pages': pages, 'scanned': page_types.is_scanned(path),
+        'sha256': file_sha256(path), 'size': st.st_size, 'mtime_ns': st.st_mtime_ns,
+    }
+
+
+def _read_catalog():
+    try:
+        with open(CATALOG_PATH, encoding='utf-8') as f:
+            data = json.load(f)
+    except (OSError, ValueError):
+        return {}
+    if (data.get('format') != CATALOG_FORMAT or
+            data.get('classifier_version') != page_types.CLASSIFIER_VERSION):
+        return {}
+    return data.get('pdfs', {})
+
+
+def _write_catalog(pdfs):
+    os.makedirs(os.path.dirname(CATALOG_PATH), exist_ok=True)
+    tmp = f"{CATALOG_PATH}.{os.getpid()}.tmp"
+    with open(tmp, 'w', encoding='utf-8') as f:
+        json.dump({'format': CATALOG_FORMAT,
+                   'classifier_version': page_types.CLASSIFIER_VERSION,
+                   'pdfs': pdfs}, f, indent=1, sort_keys=True)
+    os.replace(tmp, CATALOG_PATH)
+
+
+def refresh():
+    """Rescan fragen/, re-examining only new or modified PDFs. Returns the catalog."""
+    global _catalog, _by_exam
+    stored = _read_catalog()
+    pdfs = {}
+    try:
+        names = sorted(n for n in os.listdir(FRAGEN_DIR) if n.endswith(".pdf"))
+    except FileNotFoundError:
+        names = []
+    for name in names:
+        if parse_pdf_name(name) is None:
+            continue
+        path = os.path.join(FRAGEN_DIR, name)
+        st = os.stat(path)
+        entry = stored.get(name)
+        if (entry is None or entry['size'] != st.st_size or
+                entry['mtime_ns'] != st.st_mtime_ns or entry['path'] != path):
+            entry = describe_pdf(path)
+        pdfs[name] = entry
+    if pdfs != stored:
+        _write_catalog(pdfs)
+
+    by_exam = {}
+    for name in sorted(pdfs, key=lambda n: (name_rank(n, pdfs[n]['year'], pdfs[n]['month']), n)):
+        by_exam.setdefault(pdfs[name]['exam_id'], pdfs[name])
+    _catalog, _by_exam = pdfs, by_exam
+    return pdfs
+
+
+def get_catalog():
+    """{file name: entry} of every exam PDF, refreshed once per process."""
+    if _catalog is None:
+        refresh()
+    return _catalog
+
+
+def pdf_info(exam_id):
+    """Catalog entry of the exam's PDF, or None."""
+    get_catalog()
+    return _by_exam.get(exam_id)
+
+
+def pdf_for_exam(exam_id):
+    """Path of the exam's PDF, or None."""
+    entry = pdf_info(exam_id)
+    return entry['path'] if entry else None
+
+
+def main():
+    catalog = get_catalog()
+    for name, e in sorted(catalog.items(), key=lambda item: item[1]['exam_id']):
+        flags = " ".join(flag for flag, on in (("scanned", e['scanned']),
+                                               ("solutions", e['has_solutions'])) if on)
+        print(f"  {e['exam_id']:<14} {name:<55} {e['pages']:>3} pages  "
+              f"Gruppe {e['gruppe']}  {flags}")
+    print(f"{len(catalog)} PDFs, {len(_by_exam)} exams ({CATALOG_PATH})")
+
+
+if __name__ == '__main__':
+    main()
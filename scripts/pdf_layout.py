@@ -0,0 +1,426 @@
+#!/usr/bin/env python3
+"""Layout index of an exam PDF: where every question, option and key is.
+
+The image stage located questions by walking every word of every page
+(find_questions_on_pages), the Gruppe B section and the answer key page
+by reading page texts again, and the text parsers found the same
+boundaries with their own regexes. build_layout() does this once per PDF
+from the word boxes of word_store and get_layout() caches the result under
+.cache/layout/, keyed by the SHA-256 of the PDF, LAYOUT_VERSION, the page
+classifier version and word_store.STORE_VERSION:
+
+  questions_end   first page after the questions (answer key or Gruppe B)
+  gruppe_b_page   first page of the Gruppe B copy, or None
+  answer_key      {'page', 'gruppe_b_only', 'clip'}: the Gruppe A answer
+                  key page and the part of it the key image shows
+  questions       {n: {'page', 'y_top', 'type', 'bbox', 'segments',
+                       'options', 'statements'}}
+
+segments are the page slices of the question as the image stage cuts
+them: [[page_idx, [x0, y0, x1, y1] or None for the full page]]. Options
+and statements are [{'label', 'text', 'boxes'}] with one box
+[page_idx, x0, y0, x1, y1] per page the item covers. They come from
+visual rows (words grouped by height) so that "E)" and its text set as
+separate lines still form one row; running headers and page numbers are
+left out. Scanned PDFs have no questions.
+
+Readers: extract_pdf_images takes its page ranges and image plans from the
+index, and verify_with_pypdf reads the solution key from the answer key
+page only. import_exams keeps its single rawdict pass (the index would
+open every PDF a second time). The fix passes and
+generate_verification_report match exams.json text against the whole PDF
+text and never locate questions, so there is no boundary logic of theirs
+to replace; moving the fix passes onto the index's options would change
+the corpus they write and is left for a separate change.
+
+Usage: python3 scripts/pdf_layout.py [--check] [PDF ...]
+  --check   compare option and statement counts with exams.json
+Prints the layout summary of the given PDFs (default: all of fragen/).
+Run from project root.
+"""
+
+import argparse
+import json
+import os
+import re
+from collections import Counter
+
+import fitz
+import numpy as np
+
+import page_types
+from pdf_text import file_sha256, find_gruppe_b_page, iter_pages
+import word_store
+from word_store import get_store
+
+FRAGEN_DIR = "fragen"
+CACHE_DIR = ".cache/layout"
+CACHE_FORMAT = 1
+# Bump when the layout rules change, including the row clustering
+# (answer_grid.cluster_1d) the word store queries use
+LAYOUT_VERSION = 2
+
+# Option and statement rows: "A) text" (some years "A. text" or "E ) text"),
+# "1. text" (some years "1.text", "1) text" or "4 text"). Rows may start with
+# a bullet glyph from the symbol font's private use area or a low quote.
+STATEMENT_RE = re.compile(r'^([1-9])(?:[.)]\s*|\s+)([^\d\s].*)')
+OPTION_RE = re.compile(r'^([A-E])(?:\s?\)\s*|\.\s+)(.*)')
+LEADING_GLYPHS_RE = re.compile(r'^[\s\uf000-\uf8ff‚„]+')
+
+MARGIN = 0.12           # running headers and footers sit in the top/bottom 12%
+ROW_TOLERANCE = 0.5     # rows split where word centres jump by half a word height
+
+_memo = {}  # sha256 -> layout
+
+QUESTION_TYPE_WORDS = {
+    "Einfachauswahl", "Aussagenkombination", "Mehrfachauswahl",
+    "Mehrfachauswahlaufgabe", "Aussagekombination"
+}
+
+
+def find_answer_key_page(doc):
+    """Find the Gruppe A answer key page. Returns (page_idx, is_gruppe_b_only).
+
+    Prefers Gruppe A answer keys. Returns is_gruppe_b_only=True if only
+    Gruppe B answer key was found (should not be used for answer grid images).
+    """
+    candidates = []  # [(page_idx, has_gruppe_a, has_gruppe_b_only)]
+
+    for i in range(doc.page_count - 1, max(doc.page_count // 2 - 1, -1), -1):
+        text = doc[i].get_text()
+        if page_types.is_answer_key_text(text, i, doc.page_count):
+            first_400 = text[:400]
+            has_gruppe_a = bool(re.search(r'Gruppe\s*A', first_400))
+            has_gruppe_b = bool(re.search(r'Gruppe\s*B', first_400))
+            candidates.append((i, has_gruppe_a, has_gruppe_b))
+
+    if not candidates:
+        return None, False
+
+    # Prefer pages explicitly labeled Gruppe A
+    for page_idx, has_a, has_b in candidates:
+        if has_a and not has_b:
+            return page_idx, False
+        if has_a:
+            return page_idx, False
+
+    # If no explicit Gruppe A, check if pages are Gruppe B only
+    for page_idx, has_a, has_b in candidates:
+        if not has_b:
+            return page_idx, False  # No Gruppe marker = assume A
+
+    # Only Gruppe B answer key found
+    return candidates[0][0], True
+
+
+def question_headers(doc, end_page):
+    """Question headers ("12 Einfachauswahl") on the pages before end_page.
+
+    Returns {question_num: (page_idx, y_top, type, bbox)}; y_top is 2pt
+    above the number, bbox spans the number and the type word.
+    """
+    store = get_store(doc.name)
+    stop = store.page_range(end_page - 1)[1] if end_page > 0 else 0
+    idx = np.arange(1, stop)
+    same_page = store.page[idx - 1] == store.page[idx]
+
+    # A type word, or a split "Aussagen kombination" / "Aussage kombination",
+    # right after a question number on the same page
+    is_type = store.is_text(*QUESTION_TYPE_WORDS)[idx]
+    kombination = np.char.startswith(np.char.lower(store.strings), "kombination")
+    next_text = store.text[np.minimum(idx + 1, len(store) - 1)]
+    is_split = (store.is_text("Aussagen", "Aussage")[idx] & (idx + 1 < len(store)) &
+                kombination[next_text] &
+                (store.page[np.minimum(idx + 1, len(store) - 1)] == store.page[idx]))
+    numbers = store.number[idx - 1]
+    found = idx[(is_type | is_split) & same_page & (numbers >= 1) & (numbers <= 28)]
+
+    questions = {}
+    for i in found:
+        n = int(store.number[i - 1])
+        if n in questions:
+            continue
+        kind = str(store.texts(i)) if is_type[i - 1] else "Aussagenkombination"
+        prev_y0 = float(store.y0[i - 1])
+        bbox = [float(store.x0[i - 1]), min(prev_y0, float(store.y0[i])),
+                float(store.x1[i]), max(float(store.y1[i - 1]), float(store.y1[i]))]
+        questions[n] = (int(store.page[i]), prev_y0 - 2, kind, bbox)
+    return questions
+
+
+def find_questions_on_pages(doc, end_page):
+    """Find question positions using word-based search.
+    Returns: {question_num: (page_idx, y_top)}
+    """
+    return {n: (page_idx, y_top)
+            for n, (page_idx, y_top, _, _) in question_headers(doc, end_page).items()}
+
+
+def question_segments(doc, questions, qnum):
+    """Plan the page slices that make up question qnum, top to bottom.
+
+    Returns [(page_idx, clip)] where clip is a fitz.Rect or None for the
+    full page, or None if the question was not found.
+    """
+    if qnum not in questions:
+        return None
+
+    page_idx, y_top = questions[qnum]
+    page_rect = doc[page_idx].rect
+
+    # Find where this question ends
+    next_q_page = None
+    next_q_y = None
+    for nq in range(qnum + 1, 30):
+        if nq in questions:
+            next_q_page, next_q_y = questions[nq]
+            break
+
+    if next_q_page is not None and next_q_page == page_idx:
+        # Next question on same page
+        return [(page_idx, fitz.Rect(0, max(0, y_top), page_rect.width, next_q_y - 3))]
+    elif next_q_page is not None and next_q_page > page_idx:
+        # Question spans multiple pages: current page from y_top to bottom,
+        # intermediate full pages (rare), next question's page down to its y_top
+        segments = [(page_idx, fitz.Rect(0, max(0, y_top), page_rect.width, page_rect.height))]
+        for mid_idx in range(page_idx + 1, next_q_page):
+            segments.append((mid_idx, None))
+        next_rect = doc[next_q_page].rect
+        segments.append((next_q_page, fitz.Rect(0, 0, next_rect.width, next_q_y - 3)))
+        return segments
+    else:
+        # Last question or no next found - take rest of page
+        return [(page_idx, fitz.Rect(0, max(0, y_top), page_rect.width, page_rect.height))]
+
+
+def answer_key_clip(page):
+    """Gruppe A part of an answer key page as a fitz.Rect, or None for the full page."""
+    # Only crop if "Gruppe B" is a real section below the top quarter of the
+    # page, not a page header
+    for gb in page.search_for("Gruppe B"):
+        if gb.y0 > page.rect.height * 0.25:
+            clip = fitz.Rect(0, 0, page.rect.width, gb.y0 - 5)
+            return clip if clip.height > 50 else None
+    return None
+
+
+def page_rows(store, page_idx, clip=None):
+    """Visual rows of a page, top to bottom: [(text, [x0, y0, x1, y1])].
+
+    With a clip rect only the words whose centre lies inside it count.
+    """
+    idx = store.page_words(page_idx) if clip is None else store.in_rect(page_idx, clip)
+    if not len(idx):
+        return []
+    heights = store.y1[idx] - store.y0[idx]
+    labels = store.rows(idx, gap=np.median(heights) * ROW_TOLERANCE)
+    # Row by row, left to right within a row
+    order = np.lexsort((store.x0[idx], labels))
+    idx, labels = idx[order], labels[order]
+    starts = np.flatnonzero(np.diff(labels, prepend=-1))
+    result = []
+    for row in np.split(idx, starts[1:]):
+        bbox = [float(store.x0[row].min()), float(store.y0[row].min()),
+                float(store.x1[row].max()), float(store.y1[row].max())]
+        result.append((" ".join(store.texts(row)), bbox))
+    return result
+
+
+def in_margin(page, bbox):
+    height = page.rect.height
+    return bbox[1] < height * MARGIN or bbox[3] > height * (1 - MARGIN)
+
+
+def margin_texts(doc, rows_by_page):
+    """Texts (digits masked) of rows repeated in the page margins: headers, page numbers."""
+    counts = Counter()
+    for page_idx, rows in rows_by_page.items():
+        seen = set()
+        for text, bbox in rows:
+            if in_margin(doc[page_idx], bbox):
+                seen.add(re.sub(r'\d+', '#', text))
+        counts.update(seen)
+    min_pages = max(2, len(rows_by_page) // 2)
+    return {text for text, n in counts.items() if n >= min_pages}
+
+
+def _rect(clip):
+    # Not rounded: the image stage renders these clips
+    return None if clip is None else list(clip)
+
+
+def question_items(kind, rows):
+    """Options and statements of a question from its rows [(page_idx, text, bbox)]."""
+    options, statements = [], []
+    current = None
+    for page_idx, text, bbox in rows:
+        text = LEADING_GLYPHS_RE.sub('', text).strip()
+        if not text:
+            continue
+        match = OPTION_RE.match(text)
+        statement = STATEMENT_RE.match(text)
+        if match:
+            current = {'label': match.group(1), 'text': match.group(2).strip(), 'boxes': []}
+            options.append(current)
+        elif statement and kind.startswith("Aussage") and not options:
+            current = {'label': statement.group(1), 'text': statement.group(2).strip(),
+                       'boxes': []}
+            statements.append(current)
+        elif text.startswith("Wählen Sie"):
+            current = None
+            continue
+        elif current is not None:
+            current['text'] += " " + text
+        else:
+            continue  # question text
+        box = current['boxes'][-1] if current['boxes'] else None
+        if box is not None and box[0] == page_idx:
+            box[1:] = [min(box[1], bbox[0]), min(box[2], bbox[1]),
+                       max(box[3], bbox[2]), max(box[4], bbox[3])]
+        else:
+            current['boxes'].append([page_idx] + [round(v, 2) for v in bbox])
+    for item in options + statements:
+        item['boxes'] = [[b[0]] + [round(v, 2) for v in b[1:]] for b in item['boxes']]
+    return options, statements
+
+
+def build_layout(pdf_path):
+    """Layout index of a PDF (see module docstring)."""
+    with fitz.open(pdf_path) as doc:
+        layout = {'pages': [[round(p.rect.width, 2), round(p.rect.height, 2)] for p in doc],
+                  'questions_end': doc.page_count, 'gruppe_b_page': None,
+                  'answer_key': None, 'questions': {}}
+        if page_types.is_scanned(pdf_path):
+            return layout
+
+        answer_page, gruppe_b_only = find_answer_key_page(doc)
+        gruppe_b_page = find_gruppe_b_page(iter_pages(pdf_path))
+        end = doc.page_count
+        for page_idx in (answer_page, gruppe_b_page):
+            if page_idx is not None:
+                end = min(end, page_idx)
+        layout['questions_end'] = end
+        layout['gruppe_b_page'] = gruppe_b_page
+        if answer_page is not None:
+            layout['answer_key'] = {'page': answer_page, 'gruppe_b_only': gruppe_b_only,
+                                    'clip': _rect(answer_key_clip(doc[answer_page]))}
+
+        headers = question_headers(doc, end)
+        positions = {n: (page_idx, y_top) for n, (page_idx, y_top, _, _) in headers.items()}
+        store = get_store(pdf_path)
+        rows_by_page = {page_idx: page_rows(store, page_idx) for page_idx in range(end)}
+        margins = margin_texts(doc, rows_by_page)
+        for n in sorted(headers):
+            page_idx, y_top, kind, bbox = headers[n]
+            segments = question_segments(doc, positions, n)
+            rows = []
+            for seg_page, clip in segments:
+                seg_rows = rows_by_page[seg_page] if clip is None else page_rows(store, seg_page, clip)
+                for text, row_bbox in seg_rows:
+                    if in_margin(doc[seg_page], row_bbox) and re.sub(r'\d+', '#', text) in margins:
+                        continue
+                    if seg_page == page_idx and row_bbox[3] <= bbox[3]:
+                        continue  # the header row itself
+                    rows.append((seg_page, text, row_bbox))
+            options, statements = question_items(kind, rows)
+            layout['questions'][n] = {
+                'page': page_idx, 'y_top': y_top, 'type': kind,
+                'bbox': [round(v, 2) for v in bbox],
+                'segments': [[seg_page, _rect(clip)] for seg_page, clip in segments],
+                'options': options, 'statements': statements,
+            }
+    return layout
+
+
+def _cache_path(sha):
+    return os.path.join(CACHE_DIR, f"{sha}-v{LAYOUT_VERSION}-c{page_types.CLASSIFIER_VERSION}"
+                                   f"-w{word_store.STORE_VERSION}.json")
+
+
+def get_layout(pdf_path):
+    """Layout index of a PDF, cached by content hash."""
+    sha = file_sha256(pdf_path)
+    if sha in _memo:
+        return _memo[sha]
+    path = _cache_path(sha)
+    try:
+        with open(path, encoding='utf-8') as f:
+            data = json.load(f)
+        layout = data['layout'] if data.get('format') == CACHE_FORMAT else None
+    except (OSError, ValueError, KeyError):
+        layout = None
+    if layout is None:
+        layout = build_layout(pdf_path)
+        os.makedirs(CACHE_DIR, exist_ok=True)
+        tmp = f"{path}.{os.getpid()}.tmp"
+        with open(tmp, 'w', encoding='utf-8') as f:
+            json.dump({'format': CACHE_FORMAT, 'sha256': sha, 'layout': layout},
+                      f, ensure_ascii=False)
+        os.replace(tmp, path)
+    else:
+        # JSON object keys are strings
+        layout['questions'] = {int(n): q for n, q in layout['questions'].items()}
+    _memo[sha] = layout
+    return layout
+
+
+def question_positions(layout):
+    """{question_num: (page_idx, y_top)} as find_questions_on_pages returns it."""
+    return {n: (q['page'], q['y_top']) for n, q in layout['questions'].items()}
+
+
+def layout_segments(segments):
+    """Index segments as (page_idx, fitz.Rect or None) slices."""
+    return [(page_idx, None if clip is None else fitz.Rect(clip)) for page_idx, clip in segments]
+
+
+def check(pdfs):
+    """Print questions whose option/statement counts differ from exams.json."""
+    from corpus import load_corpus
+    from pdf_catalog import parse_pdf_name
+    corpus = load_corpus()
+    total = differ = 0
+    for pdf_path in pdfs:
+        exam_id = (parse_pdf_name(pdf_path) or (None,))[0]
+        exam = corpus.exam(exam_id)
+        questions = get_layout(pdf_path)['questions']
+        if exam is None or not questions:
+            continue
+        for q in exam['questions']:
+            found = questions.get(q['id'])
+            if found is None:
+                continue
+            total += 1
+            counts = (len(found['options']), len(found['statements']))
+            expected = (len(q.get('options', [])), len(q.get('statements', [])))
+            if counts != expected:
+                differ += 1
+                print(f"  {exam_id:<14} Q{q['id']:<3} options/statements "
+                      f"PDF {counts[0]}/{counts[1]}, exams.json {expected[0]}/{expected[1]}")
+    print(f"{differ} of {total} questions differ")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Build the layout index of exam PDFs.")
+    parser.add_argument('pdfs', nargs='*', help="PDFs (default: all of fragen/)")
+    parser.add_argument('--check', action='store_true',
+                        help="compare option and statement counts with exams.json")
+    args = parser.parse_args()
+    pdfs = args.pdfs or [os.path.join(FRAGEN_DIR, f) for f in sorted(os.listdir(FRAGEN_DIR))
+                         if f.endswith('.pdf')]
+    if args.check:
+        check(pdfs)
+        return
+    for pdf_path in pdfs:
+        layout = get_layout(pdf_path)
+        questions = layout['questions']
+        options = sum(len(q['options']) for q in questions.values())
+        statements = sum(len(q['statements']) for q in questions.values())
+        key = layout['answer_key']
+        print(f"  {os.path.basename(pdf_path):<55} {len(questions):>3} questions "
+              f"{options:>4} options {statements:>4} statements  questions end: page "
+              f"{layout['questions_end']}" + (f", key: page {key['page']}" if key else ""))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,246 @@
+#!/usr/bin/env python3
+"""Local OCR for scanned exam pages, cached per page image.
+
+Scanned exams used to be transcribed by hand (the *_ocr.txt and
+*_transcribed.txt files in fragen/). This stage OCRs
+only the pages page_types classifies as scanned: each page is rendered at
+OCR_DPI in grayscale, and the text is cached under .cache/ocr/ keyed by
+the SHA-256 of the rendered image plus engine, engine version and
+language. Unchanged pages of a replaced PDF are cache hits; a per-PDF
+index of those keys lets re-runs skip even the rendering. The engine
+version is recorded in .cache/ocr/engines.json, and used when the engine
+is not installed, so a fully cached re-run does not need it.
+Cache misses run in parallel, one engine process per page.
+
+Engines are pluggable (ENGINES); the default is the tesseract CLI, which
+needs the German language data (apt install tesseract-ocr tesseract-ocr-deu).
+
+pdf_text exposes the result as the "ocr" backend: text-layer pages from
+fitz, scanned pages from OCR. So get_text(pdf, "ocr") feeds the same
+tokenizer and parsers as every other backend.
+
+Usage: python3 scripts/pdf_ocr.py [--jobs N] [--engine NAME] [--txt DIR] [PDF ...]
+  --jobs N    parallel OCR processes (default: CPU count)
+  --txt DIR   also write {name}_ocr.txt files ("--- Seite N ---" per page)
+OCRs the given PDFs (default: all scanned PDFs in fragen/).
+Run from project root.
+"""
+
+import argparse
+import hashlib
+import json
+import os
+import subprocess
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import page_types
+from pdf_text import file_sha256
+
+FRAGEN_DIR = "fragen"
+CACHE_DIR = ".cache/ocr"
+CACHE_FORMAT = 1
+VERSIONS_PATH = os.path.join(CACHE_DIR, "engines.json")  # engine -> last seen version
+OCR_DPI = 300
+OCR_LANG = "deu"
+TESSERACT_ARGS = ["--psm", "6"]  # one uniform block of text per page
+
+_version_memo = {}
+
+
+def _tesseract(image, lang):
+    # One thread per tesseract process; parallelism comes from the pool
+    env = dict(os.environ, OMP_THREAD_LIMIT="1")
+    try:
+        result = subprocess.run(["tesseract", "stdin", "stdout", "-l", lang] + TESSERACT_ARGS,
+                                input=image, capture_output=True, env=env)
+    except FileNotFoundError:
+        raise RuntimeError("tesseract not found; install tesseract-ocr and tesseract-ocr-deu")
+    if result.returncode != 0:
+        raise RuntimeError(f"tesseract failed: {result.stderr.decode(errors='replace').strip()}")
+    return result.stdout.decode('utf-8')
+
+
+def _tesseract_version():
+    try:
+        result = subprocess.run(["tesseract", "--version"], capture_output=True, text=True)
+    except FileNotFoundError:
+        raise RuntimeError("tesseract not found; install tesseract-ocr and tesseract-ocr-deu")
+    return (result.stdout or result.stderr).split('\n')[0].split()[-1]
+
+
+# name -> (ocr(image_bytes, lang) -> text, version() -> str); images are PGM
+ENGINES = {
+    "tesseract": (_tesseract, _tesseract_version),
+}
+
+
+def engine_version(engine):
+    """Installed engine version, or the recorded one if the engine is missing."""
+    if engine not in _version_memo:
+        try:
+            with open(VERSIONS_PATH) as f:
+                recorded = json.load(f)
+        except (OSError, ValueError):
+            recorded = {}
+        try:
+            version = ENGINES[engine][1]()
+        except RuntimeError:
+            if engine not in recorded:
+                raise
+            version = recorded[engine]
+        if recorded.get(engine) != version:
+            recorded[engine] = version
+            os.makedirs(CACHE_DIR, exist_ok=True)
+            tmp = f"{VERSIONS_PATH}.{os.getpid()}.tmp"
+            with open(tmp, 'w') as f:
+                json.dump(recorded, f, indent=1, sort_keys=True)
+            os.replace(tmp, VERSIONS_PATH)
+        _version_memo[engine] = version
+    return _version_memo[engine]
+
+
+def render_page(doc, page_idx, dpi=OCR_DPI):
+    """Grayscale PGM bytes of a page."""
+    import fitz
+    pix = doc[page_idx].get_pixmap(dpi=dpi, colorspace=fitz.csGRAY)
+    return pix.tobytes("pgm")
+
+
+def _settings(engine, lang):
+    return f"{engine}\0{engine_version(engine)}\0{lang}\0{TESSERACT_ARGS}\0{OCR_DPI}"
+
+
+def _cache_path(image, engine, lang):
+    key = hashlib.sha256(image)
+    key.update(b"\0" + _settings(engine, lang).encode())
+    return os.path.join(CACHE_DIR, f"{key.hexdigest()}.json")
+
+
+def _index_path(pdf_path, engine, lang):
+    """Per-PDF index {page_idx: text cache path} for the current settings."""
+    settings = hashlib.sha256(_settings(engine, lang).encode()).hexdigest()[:16]
+    return os.path.join(CACHE_DIR, "pdf", f"{file_sha256(pdf_path)}-{settings}.json")
+
+
+def _read_cache(path):
+    try:
+        with open(path, encoding='utf-8') as f:
+            data = json.load(f)
+    except (OSError, ValueError):
+        return None
+    return data['text'] if data.get('format') == CACHE_FORMAT else None
+
+
+def _write_cache(path, text):
+    os.makedirs(CACHE_DIR, exist_ok=True)
+    tmp = f"{path}.{os.getpid()}.tmp"
+    with open(tmp, 'w', encoding='utf-8') as f:
+        json.dump({'format': CACHE_FORMAT, 'text': text}, f, ensure_ascii=False)
+    os.replace(tmp, path)
+
+
+def ocr_pages(pdf_path, pages=None, engine="tesseract", lang=OCR_LANG, jobs=None):
+    """{page_idx: text} for the scanned pages of a PDF (or the given pages).
+
+    Returns (texts, cache_hits).
+    """
+    import fitz
+    if pages is None:
+        pages = page_types.pages_of_type(pdf_path, page_types.SCANNED)
+    if not pages:
+        return {}, 0
+    ocr = ENGINES[engine][0]
+    index_path = _index_path(pdf_path, engine, lang)
+    try:
+        with open(index_path) as f:
+            index = json.load(f)
+    except (OSError, ValueError):
+        index = {}
+    texts = {}
+    for page_idx in pages:
+        path = index.get(str(page_idx))
+        text = _read_cache(path) if path else None
+        if text is not None:
+            texts[page_idx] = text
+    hits = len(texts)
+
+    misses = []  # (page_idx, image, cache_path)
+    if len(texts) < len(pages):
+        with fitz.open(pdf_path) as doc:
+            for page_idx in pages:
+                if page_idx in texts:
+                    continue
+                image = render_page(doc, page_idx)
+                path = index[str(page_idx)] = _cache_path(image, engine, lang)
+                text = _read_cache(path)
+                if text is None:
+                    misses.append((page_idx, image, path))
+                else:
+                    texts[page_idx] = text
+                    hits += 1
+
+    def run(miss):
+        page_idx, image, path = miss
+        text = ocr(image, lang)
+        _write_cache(path, text)
+        return page_idx, text
+
+    # The engines run as subprocesses, so threads are enough to keep all
+    # CPUs busy
+    with ThreadPoolExecutor(max_workers=jobs or os.cpu_count()) as pool:
+        for page_idx, text in pool.map(run, misses):
+            texts[page_idx] = text
+    if hits < len(pages):
+        os.makedirs(os.path.dirname(index_path), exist_ok=True)
+        tmp = f"{index_path}.{os.getpid()}.tmp"
+        with open(tmp, 'w') as f:
+            json.dump(index, f)
+        os.replace(tmp, index_path)
+    return texts, hits
+
+
+def extract_pages(pdf_path, engine="tesseract"):
+    """Text of every page: OCR for scanned pages, the fitz text layer otherwise."""
+    from pdf_text import get_page_texts
+    texts = get_page_texts(pdf_path, "fitz")
+    ocr_texts, _ = ocr_pages(pdf_path, engine=engine)
+    return [ocr_texts.get(i, text) for i, text in enumerate(texts)]
+
+
+def ocr_version(engine="tesseract"):
+    """Version string for the pdf_text "ocr" backend cache key."""
+    return (f"{engine}-{engine_version(engine)}-{OCR_LANG}-{OCR_DPI}dpi"
+            f"-c{page_types.CLASSIFIER_VERSION}")
+
+
+def main():
+    from pdf_tokens import tokenize
+
+    parser = argparse.ArgumentParser(description="OCR the scanned pages of exam PDFs.")
+    parser.add_argument('pdfs', nargs='*', help="PDFs (default: scanned PDFs in fragen/)")
+    parser.add_argument('--jobs', type=int, help="parallel OCR processes (default: CPU count)")
+    parser.add_argument('--engine', choices=sorted(ENGINES), default="tesseract")
+    parser.add_argument('--txt', metavar='DIR', help="write {name}_ocr.txt files to DIR")
+    args = parser.parse_args()
+
+    pdfs = args.pdfs or [os.path.join(FRAGEN_DIR, f) for f in sorted(os.listdir(FRAGEN_DIR))
+                         if f.endswith('.pdf') and page_types.is_scanned(os.path.join(FRAGEN_DIR, f))]
+    for pdf_path in pdfs:
+        start = time.perf_counter()
+        texts, hits = ocr_pages(pdf_path, engine=args.engine, jobs=args.jobs)
+        seconds = time.perf_counter() - start
+        text = "".join(texts[i] + "\n" for i in sorted(texts))
+        questions = len(tokenize(text).question_starts())
+        print(f"  {os.path.basename(pdf_path):<45} {len(texts):>3} pages "
+              f"({hits} cached) {questions:>3} questions {seconds:>7.1f}s")
+        if args.txt:
+            os.makedirs(args.txt, exist_ok=True)
+            name = os.path.splitext(os.path.basename(pdf_path))[0] + "_ocr.txt"
+            with open(os.path.join(args.txt, name), 'w', encoding='utf-8') as f:
+                for i in sorted(texts):
+                    f.write(f"--- Seite {i + 1} ---\n{texts[i].strip()}\n\n")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,286 @@
+#!/usr/bin/env python3
+"""Shared PDF text extraction with an on-disk, content-addressed cache.
+
+Every fix/verify script used to re-parse all PDFs in fragen/ on each run.
+This module extracts each PDF at most once per backend and stores the raw and
+normalized text of every page under .cache/pdf_text/, keyed by the SHA-256 of
+the PDF plus the extractor name and version. A changed PDF or an upgraded
+extractor simply misses the cache.
+
+Backends:
+  fitz        PyMuPDF page.get_text()
+  pypdf       pypdf PageObject.extract_text()
+  pdftotext   poppler's pdftotext CLI (pages split on form feed)
+  ocr         fitz text layer, OCR for scanned pages (see pdf_ocr)
+
+iter_pages() yields page texts lazily: from the cache when present,
+otherwise extracting one page at a time, so a caller that stops early (see
+find_gruppe_b_page) never extracts the pages it does not look at. The pages
+it did extract are cached as an incomplete entry; the next iter_pages()
+continues after them, and get_pages() ignores such an entry.
+
+Usage: python3 scripts/pdf_text.py [--backend NAME ...] [PDF ...]
+Warms the cache for the given PDFs (default: all of fragen/).
+Run from project root.
+"""
+
+import hashlib
+import json
+import os
+import re
+import subprocess
+import sys
+
+from text_utils import normalize_text
+
+FRAGEN_DIR = "fragen"
+CACHE_DIR = ".cache/pdf_text"
+CACHE_FORMAT = 1
+BACKENDS = ("fitz", "pypdf", "pdftotext", "ocr")
+
+# In-process memo so repeated lookups in one run skip even the cache read
+_sha_memo = {}    # (path, size, mtime_ns) -> sha256
+_pages_memo = {}  # (sha256, backend, version) -> [{'raw', 'normalized'}]
+_version_memo = {}
+
+
+def file_sha256(path):
+    """SHA-256 of a file, memoized per (path, size, mtime) within this process."""
+    st = os.stat(path)
+    key = (os.path.abspath(path), st.st_size, st.st_mtime_ns)
+    if key not in _sha_memo:
+        h = hashlib.sha256()
+        with open(path, 'rb') as f:
+            for chunk in iter(lambda: f.read(1 << 20), b''):
+                h.update(chunk)
+        _sha_memo[key] = h.hexdigest()
+    return _sha_memo[key]
+
+
+def extractor_version(backend):
+    """Version string of the library/binary behind a backend."""
+    if backend not in _version_memo:
+        if backend == "fitz":
+            import fitz
+            version = fitz.VersionBind
+        elif backend == "pypdf":
+            import pypdf
+            version = pypdf.__version__
+        elif backend == "pdftotext":
+            result = subprocess.run(['pdftotext', '-v'], capture_output=True, text=True)
+            version = (result.stderr or result.stdout).split('\n')[0].split()[-1]
+        elif backend == "ocr":
+            import fitz
+            import pdf_ocr
+            version = f"{fitz.VersionBind}-{pdf_ocr.ocr_version()}"
+        else:
+            raise ValueError(f"Unknown backend: {backend}")
+        _version_memo[backend] = version
+    return _version_memo[backend]
+
+
+def _iter_fitz(pdf_path, start=0):
+    import fitz
+    with fitz.open(pdf_path) as doc:
+        for page_idx in range(start, doc.page_count):
+            yield doc[page_idx].get_text()
+
+
+def _extract_fitz(pdf_path):
+    return list(_iter_fitz(pdf_path))
+
+
+def _extract_pypdf(pdf_path):
+    from pypdf import PdfReader
+    reader = PdfReader(pdf_path)
+    return [page.extract_text() or "" for page in reader.pages]
+
+
+def _extract_pdftotext(pdf_path):
+    result = subprocess.run(['pdftotext', pdf_path, '-'],
+                            capture_output=True, text=True)
+    parts = result.stdout.split('\f')
+    # pdftotext terminates every page with a form feed
+    if parts and parts[-1] == '':
+        parts.pop()
+    return parts
+
+
+def _extract_ocr(pdf_path):
+    import pdf_ocr
+    return pdf_ocr.extract_pages(pdf_path)
+
+
+_EXTRACTORS = {
+    "fitz": _extract_fitz,
+    "pypdf": _extract_pypdf,
+    "pdftotext": _extract_pdftotext,
+    "ocr": _extract_ocr,
+}
+
+# Backends that can extract a single page without processing the rest:
+# iterator(pdf_path, start) over the pages from start on
+_PAGE_ITERATORS = {
+    "fitz": _iter_fitz,
+}
+
+
+def _cache_path(sha, backend, version):
+    safe_version = "".join(c if c.isalnum() or c in '.-' else '_' for c in str(version))
+    return os.path.join(CACHE_DIR, f"{sha}-{backend}-{safe_version}.json")
+
+
+def _read_cache(path, partial=False):
+    """Cached pages, or None. With partial, (pages, complete) of any entry."""
+    try:
+        with open(path, 'r', encoding='utf-8') as f:
+            data = json.load(f)
+    except (OSError, ValueError):
+        data = {}
+    if data.get('format') != CACHE_FORMAT:
+        return (None, False) if partial else None
+    complete = data.get('complete', True)
+    if partial:
+        return data['pages'], complete
+    return data['pages'] if complete else None
+
+
+def _write_cache(path, sha, backend, version, pages, complete=True):
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    tmp = f"{path}.{os.getpid()}.tmp"
+    with open(tmp, 'w', encoding='utf-8') as f:
+        json.dump({
+            'format': CACHE_FORMAT,
+            'sha256': sha,
+            'backend': backend,
+            'version': version,
+            'pages': pages,
+            'complete': complete,
+        }, f, ensure_ascii=False)
+    os.replace(tmp, path)
+
+
+def get_pages(pdf_path, backend="fitz"):
+    """Return [{'raw': str, 'normalized': str}] for every page of a PDF.
+
+    Extracts with the given backend on a cache miss and stores the result.
+    """
+    sha = file_sha256(pdf_path)
+    version = extractor_version(backend)
+    key = (sha, backend, version)
+    if key in _pages_memo:
+        return _pages_memo[key]
+
+    path = _cache_path(sha, backend, version)
+    pages = _read_cache(path)
+    if pages is None:
+        raw_pages = _EXTRACTORS[backend](pdf_path)
+        pages = [{'raw': raw, 'normalized': normalize_text(raw)} for raw in raw_pages]
+        _write_cache(path, sha, backend, version, pages)
+
+    _pages_memo[key] = pages
+    return pages
+
+
+def iter_pages(pdf_path, backend="fitz"):
+    """Yield the raw text of each page, extracting lazily on a cache miss.
+
+    With a page-wise backend the pages are extracted as the caller asks for
+    them. If the caller stops early, the pages extracted so far are cached
+    as an incomplete entry, and the next call starts extracting after them.
+    """
+    sha = file_sha256(pdf_path)
+    version = extractor_version(backend)
+    key = (sha, backend, version)
+    if key not in _pages_memo:
+        path = _cache_path(sha, backend, version)
+        pages, complete = _read_cache(path, partial=True)
+        if complete:
+            _pages_memo[key] = pages
+        elif backend in _PAGE_ITERATORS:
+            pages = pages or []
+            cached = len(pages)
+            complete = False
+            try:
+                for page in pages[:cached]:
+                    yield page['raw']
+                for raw in _PAGE_ITERATORS[backend](pdf_path, cached):
+                    pages.append({'raw': raw, 'normalized': normalize_text(raw)})
+                    yield raw
+                complete = True
+            finally:
+                # Also runs when the caller stops early (generator closed)
+                if len(pages) > cached or complete:
+                    _write_cache(path, sha, backend, version, pages, complete)
+            if complete:
+                _pages_memo[key] = pages
+            return
+    for page in get_pages(pdf_path, backend):
+        yield page['raw']
+
+
+def get_page_texts(pdf_path, backend="fitz"):
+    """Raw text of every page."""
+    return [p['raw'] for p in get_pages(pdf_path, backend)]
+
+
+def get_text(pdf_path, backend="fitz", sep="\n"):
+    """Full raw text, each page followed by `sep` (the classic concat loop)."""
+    return "".join(p['raw'] + sep for p in get_pages(pdf_path, backend))
+
+
+def get_normalized_text(pdf_path, backend="fitz"):
+    """Whitespace-normalized full text; equals normalize_text(get_text(...))."""
+    return " ".join(p['normalized'] for p in get_pages(pdf_path, backend) if p['normalized'])
+
+
+GRUPPE_B_RE = re.compile(r'Gruppe\s*B')
+GRUPPE_HEADER_LINES = 5  # a section starts with "Gruppe B" in its first lines
+
+
+def find_gruppe_b_page(pages):
+    """Index of the page where a Gruppe B section starts, or None.
+
+    pages is any iterable of page texts, e.g. iter_pages(pdf_path); it is
+    consumed only up to the answer. The section starts at the first page
+    after the title page with "Gruppe B" near its top. If the first two
+    pages both have it, "Gruppe B" is a running page header and the whole
+    PDF is one group.
+    """
+    title_has_b = False
+    for i, text in enumerate(pages):
+        lines = text.strip().split('\n')[:GRUPPE_HEADER_LINES]
+        has_b = any(GRUPPE_B_RE.search(line) for line in lines)
+        if i == 0:
+            title_has_b = has_b
+        elif has_b:
+            return None if i == 1 and title_has_b else i
+    return None
+
+
+def main():
+    args = sys.argv[1:]
+    backends = []
+    pdfs = []
+    i = 0
+    while i < len(args):
+        if args[i] == '--backend' and i + 1 < len(args):
+            backends.append(args[i + 1])
+            i += 2
+        else:
+            pdfs.append(args[i])
+            i += 1
+    backends = backends or ["fitz"]
+    if not pdfs:
+        pdfs = [os.path.join(FRAGEN_DIR, f) for f in sorted(os.listdir(FRAGEN_DIR))
+                if f.endswith('.pdf')]
+
+    for backend in backends:
+        for pdf_path in pdfs:
+            pages = get_pages(pdf_path, backend)
+            chars = sum(len(p['raw']) for p in pages)
+            print(f"  {backend:<10} {os.path.basename(pdf_path):<55} {len(pages):>3} pages {chars:>7} chars")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,267 @@
+#!/usr/bin/env python3
+"""Single-pass tokenizer for exam PDF text.
+
+The question parsers in fix_all, fix_merged_questions and fix_question_text
+used to find question starts, statement markers and option markers with
+several overlapping re.finditer() passes over the text and then again per
+question region. tokenize() scans the text once with one pre-compiled
+pattern and returns a typed token stream with character offsets; the
+parsers slice that stream instead of re-scanning the text.
+
+Token kinds:
+  question     "12 Einfachauswahl" at the start of a line  key=12, text=type
+  statement    "3." / "3)"                                  key='3'
+  option       "C)" / "C.", optionally after a low quote    key='C', lead=quote
+  page_header  "Heilpraktiker..." running page header       text=rest of line
+  answer_key   "Lösungsschlüssel"                           text=match
+
+Statement and option markers are emitted wherever they occur. Whether a
+marker starts a line is answered by TokenStream.line_start(), relative to
+whatever region a parser is looking at - this reproduces the old
+"(?:^|\\n)\\s*" patterns exactly, including ^ matching at a region start.
+"""
+
+import bisect
+import re
+from collections import namedtuple
+
+QUESTION = 'question'
+STATEMENT = 'statement'
+OPTION = 'option'
+PAGE_HEADER = 'page_header'
+ANSWER_KEY = 'answer_key'
+
+QUESTION_TYPES = r'Einfachauswahl|Aussage\s*n?\s*kombination|Mehrfachauswahl(?:aufgabe)?'
+MAX_QUESTIONS = 28
+
+# One alternation, tried left to right at each position. Markers consume
+# only their own characters (the page header is a lookahead), so no token
+# can hide another one.
+_TOKEN_RE = re.compile(
+    r'(?P<qnum>\d{1,2})\s+(?P<qtype>' + QUESTION_TYPES + r')'
+    r'|(?P<snum>\d)(?P<sdelim>[.)])'
+    r'|(?P<olead>[‚„]?)(?P<oletter>[A-E])(?P<odelim>[.)])'
+    r'|(?P<akey>L(?:ö|oe)sungs?schl(?:ü|ue)ssel)'
+    r'|Heilpraktiker(?=(?P<header>[^\n]*))')
+
+# start/end: offsets of the marker itself (for options: the letter, without
+# the lead quote). ws_from: start of the whitespace run in front of it.
+Token = namedtuple('Token', 'kind start end ws_from key delim lead text')
+
+# A "(?:^|\n)\s*(\d)[.)]\s*" match: start of the line prefix, the digit, and
+# the end of the trailing whitespace.
+Marker = namedtuple('Marker', 'start key end')
+
+# A numbered block: Marker fields plus the block body [body_start, body_end).
+Block = namedtuple('Block', 'start key body_start body_end')
+
+
+class TokenStream:
+    """Tokens of one text, ordered by offset."""
+
+    __slots__ = ('text', 'tokens', '_starts')
+
+    def __init__(self, text):
+        self.text = text
+        tokens = []
+        for m in _TOKEN_RE.finditer(text):
+            if m.group('qnum') is not None:
+                kind, key, delim, lead, extra = QUESTION, int(m.group('qnum')), '', '', m.group('qtype')
+                start, end = m.start(), m.end()
+            elif m.group('snum') is not None:
+                kind, key, delim, lead, extra = STATEMENT, m.group('snum'), m.group('sdelim'), '', ''
+                start, end = m.start(), m.end()
+            elif m.group('oletter') is not None:
+                kind, key, delim, lead, extra = OPTION, m.group('oletter'), m.group('odelim'), m.group('olead'), ''
+                start, end = m.start('oletter'), m.end()
+            elif m.group('akey') is not None:
+                kind, key, delim, lead, extra = ANSWER_KEY, None, '', '', m.group('akey')
+                start, end = m.start(), m.end()
+            else:
+                kind, key, delim, lead, extra = PAGE_HEADER, None, '', '', m.group('header')
+                start, end = m.start(), m.end('header')
+            ws_from = start - len(lead)
+            while ws_from > 0 and text[ws_from - 1].isspace():
+                ws_from -= 1
+            tok = Token(kind, start, end, ws_from, key, delim, lead, extra)
+            if kind == QUESTION and self.line_start(tok) is None:
+                continue  # "12 Einfachauswahl" in running text
+            tokens.append(tok)
+        self.tokens = tokens
+        self._starts = [t.start for t in tokens]
+
+    def between(self, lo, hi, kind=None):
+        """Tokens lying completely inside text[lo:hi]."""
+        i = bisect.bisect_left(self._starts, lo)
+        out = []
+        for t in self.tokens[i:]:
+            if t.start >= hi:
+                break
+            if t.end <= hi and (kind is None or t.kind == kind):
+                out.append(t)
+        return out
+
+    def markers(self, lo, hi, kind, delims='.)', spaced=False):
+        """Statement/option tokens in text[lo:hi] with one of the delimiters.
+
+        spaced=True also requires a whitespace character right after the
+        delimiter (inside the region), like the old "[A-E]\\)\\s" patterns.
+        """
+        text = self.text
+        return [t for t in self.between(lo, hi, kind)
+                if t.delim in delims
+                and (not spaced or (t.end < hi and text[t.end].isspace()))]
+
+    def line_start(self, tok, lo=0, anchor=True):
+        """Where "(?:^|\\n)\\s*" in front of tok would match, or None.
+
+        lo is where the regex search starts; with anchor=True ^ may match
+        there (re.search on text[lo:hi]), otherwise only a newline counts
+        (finditer resuming after a previous match).
+        """
+        first = tok.start - len(tok.lead)
+        if first < lo:
+            return None
+        if anchor and tok.ws_from <= lo:
+            return lo
+        i = self.text.find('\n', max(tok.ws_from, lo), first)
+        return i if i >= 0 else None
+
+    def skip_ws(self, pos, hi):
+        """End of the whitespace run starting at pos (like a greedy \\s*)."""
+        text = self.text
+        while pos < hi and text[pos].isspace():
+            pos += 1
+        return pos
+
+    def question_starts(self, max_num=MAX_QUESTIONS, types=None):
+        """{number: (start, end, type)} of question headers 1..max_num.
+
+        The earliest header wins when a number occurs more than once.
+        types optionally restricts the accepted spellings of the type.
+        """
+        starts = {}
+        for t in self.tokens:
+            if t.kind != QUESTION or not 1 <= t.key <= max_num:
+                continue
+            if types is not None and t.text not in types:
+                continue
+            start = self.line_start(t)
+            if t.key not in starts or start < starts[t.key][0]:
+                starts[t.key] = (start, t.end, t.text)
+        return starts
+
+    def numbered_markers(self, lo, hi, delims='.)'):
+        """Matches of "(?:^|\\n)\\s*(\\d)[.)]\\s*" in text[lo:hi], finditer-style."""
+        out = []
+        pos = lo
+        for t in self.markers(lo, hi, STATEMENT, delims):
+            if t.start < pos:
+                continue
+            start = self.line_start(t, pos, anchor=(pos == lo))
+            if start is None:
+                continue
+            pos = self.skip_ws(t.end, hi)
+            out.append(Marker(start, t.key, pos))
+        return out
+
+    def numbered_blocks(self, lo, hi, delims='.)'):
+        """Numbered statements with their text, finditer-style.
+
+        Same as re.finditer(r'(?:^|\\n)\\s*(\\d)[.)]\\s*(.*?)(?=\\n\\s*\\d[.)]\\s|'
+        r'\\n\\s*[A-E][.)]\\s|\\Z)', text[lo:hi], re.DOTALL): a body runs up to
+        the next line starting with a numbered or lettered marker.
+        """
+        stmts = self.markers(lo, hi, STATEMENT, delims)
+        stops = sorted(self.markers(lo, hi, STATEMENT, delims, spaced=True)
+                       + [t for t in self.markers(lo, hi, OPTION, spaced=True) if not t.lead],
+                       key=lambda t: t.start)
+        out = []
+        pos = lo
+        si = 0
+        stop_i = 0
+        while True:
+            start = None
+            while si < len(stmts):
+                t = stmts[si]
+                si += 1
+                if t.start >= pos:
+                    start = self.line_start(t, pos, anchor=(pos == lo))
+                    if start is not None:
+                        break
+            if start is None:
+                return out
+            body_start = self.skip_ws(t.end, hi)
+            body_end = hi
+            while stop_i < len(stops):
+                s = stops[stop_i]
+                if s.start > body_start:
+                    nl = self.text.find('\n', max(s.ws_from, body_start), s.start)
+                    if nl >= 0:
+                        body_end = nl
+                        break
+                stop_i += 1
+            out.append(Block(start, t.key, body_start, body_end))
+            pos = body_end
+
+
+# "A) " / "A. " style option markers for option_sequences()
+OPTION_MARKER_RE = re.compile(r'\b([A-E])([.)])\s')
+OPTION_WINDOW = 4000   # B..E must follow within this many chars of A
+OPTION_MAX_GAP = 800   # max distance between consecutive marker starts
+
+
+def option_sequences(text, window=OPTION_WINDOW, max_gap=OPTION_MAX_GAP):
+    """Yield (a_start, markers, window_end) for every complete A-E sequence.
+
+    markers is [(start, end)] for A..E, end being after the whitespace that
+    follows the marker. For every "A)" the sequence uses the first "B)"
+    after it, the first "C)" after that B, and so on, all ending within
+    `window` characters of A and at most `max_gap` apart. Only one marker
+    style is used: "X)" or "X.", whichever is more common for A (ties go
+    to "X)").
+
+    One regex scan collects all markers; per-letter cursors then only move
+    forward (later A's never need earlier B's), so the whole search is
+    linear in the number of markers.
+    """
+    by_delim = {delim: {letter: [] for letter in 'ABCDE'} for delim in ').'}
+    for m in OPTION_MARKER_RE.finditer(text):
+        by_delim[m.group(2)][m.group(1)].append((m.start(), m.end()))
+    delim = ')' if len(by_delim[')']['A']) >= len(by_delim['.']['A']) else '.'
+    found = by_delim[delim]
+
+    cursors = dict.fromkeys('BCDE', 0)
+    for a in found['A']:
+        limit = a[0] + window
+        markers = [a]
+        pos = a[1]
+        for letter in 'BCDE':
+            candidates = found[letter]
+            i = cursors[letter]
+            while i < len(candidates) and candidates[i][0] < pos:
+                i += 1
+            cursors[letter] = i
+            if i == len(candidates) or candidates[i][1] > limit:
+                break
+            markers.append(candidates[i])
+            pos = candidates[i][1]
+        else:
+            if all(markers[k + 1][0] - markers[k][0] <= max_gap for k in range(4)):
+                yield a[0], markers, limit
+
+
+# Most recently tokenized texts, keyed by the text itself (see text_utils)
+_STREAM_CACHE = {}
+_STREAM_CACHE_SIZE = 4
+
+
+def tokenize(text):
+    """Return the (cached) TokenStream for a full PDF text."""
+    stream = _STREAM_CACHE.pop(text, None)
+    if stream is None:
+        stream = TokenStream(text)
+        while len(_STREAM_CACHE) >= _STREAM_CACHE_SIZE:
+            _STREAM_CACHE.pop(next(iter(_STREAM_CACHE)))
+    _STREAM_CACHE[text] = stream
+    return stream
@@ -1,4 +1,3 @@
-from difflib import SequenceMatcher
 import re
 
 def normalize_text(text):
@@ -8,33 +7,130 @@ def normalize_text(text):
     text = re.sub(r'\s+', ' ', text).strip()
     return text
 
+
+class TextIndex:
+    """Suffix automaton over a (normalized) PDF text, built once per PDF.
+
+    longest_match(needle) returns the length of the longest substring of
+    needle that occurs anywhere in the text, in O(len(needle)) regardless
+    of the text size. Build cost is linear in the text length; the automaton
+    is only built on the first longest_match() call, so an index whose
+    lookups are all plain substring hits costs nothing.
+    """
+
+    __slots__ = ('text', '_next', '_link', '_len', '_clean')
+
+    def __init__(self, text):
+        self.text = text
+        self._clean = None
+        self._next = None
+
+    def _build(self):
+        nxt = [{}]
+        link = [-1]
+        length = [0]
+        last = 0
+        for ch in self.text:
+            cur = len(nxt)
+            nxt.append({})
+            link.append(0)
+            length.append(length[last] + 1)
+            p = last
+            while p != -1 and ch not in nxt[p]:
+                nxt[p][ch] = cur
+                p = link[p]
+            if p != -1:
+                q = nxt[p][ch]
+                if length[p] + 1 == length[q]:
+                    link[cur] = q
+                else:
+                    clone = len(nxt)
+                    nxt.append(dict(nxt[q]))
+                    link.append(link[q])
+                    length.append(length[p] + 1)
+                    while p != -1 and nxt[p].get(ch) == q:
+                        nxt[p][ch] = clone
+                        p = link[p]
+                    link[q] = clone
+                    link[cur] = clone
+            last = cur
+        self._next = nxt
+        self._link = link
+        self._len = length
+
+    def __contains__(self, needle):
+        return needle in self.text
+
+    def longest_match(self, needle):
+        """Length of the longest substring of needle that occurs in the text."""
+        if self._next is None:
+            self._build()
+        nxt, link, length = self._next, self._link, self._len
+        state = 0
+        cur = 0
+        best = 0
+        for ch in needle:
+            while state and ch not in nxt[state]:
+                state = link[state]
+                cur = length[state]
+            if ch in nxt[state]:
+                state = nxt[state][ch]
+                cur += 1
+                if cur > best:
+                    best = cur
+            else:
+                state = 0
+                cur = 0
+        return best
+
+    @property
+    def clean(self):
+        """Lower-cased text with all non-word characters removed (lazy)."""
+        if self._clean is None:
+            self._clean = re.sub(r'\W+', '', self.text).lower()
+        return self._clean
+
+
+# Most recently used indexes, keyed by the haystack string itself. Python
+# caches str hashes, so looking up the same 30 KB text again is O(1).
+_INDEX_CACHE = {}
+_INDEX_CACHE_SIZE = 4
+
+
+def text_index(pdf_text):
+    """Return the TextIndex for pdf_text, building it on first use."""
+    if isinstance(pdf_text, TextIndex):
+        return pdf_text
+    index = _INDEX_CACHE.pop(pdf_text, None)
+    if index is None:
+        index = TextIndex(pdf_text)
+        while len(_INDEX_CACHE) >= _INDEX_CACHE_SIZE:
+            _INDEX_CACHE.pop(next(iter(_INDEX_CACHE)))
+    _INDEX_CACHE[pdf_text] = index
+    return index
+
+
 def verify_text_match(app_text, pdf_text, threshold=0.85):
     """
     Verifies if app_text is present in pdf_text.
+    pdf_text should already be normalized; it may also be a TextIndex.
     Returns: (is_match, score)
     """
     norm_app = normalize_text(app_text)
-    # pdf_text might be huge, so we don't always normalize the whole thing if passed repeatedly, 
-    # but here we assume caller manages it or we do it.
-    # ideally pdf_text is already normalized.
-    
+
     if not norm_app:
         return True, 1.0 # Empty text is "found" (or irrelevant)
 
+    index = text_index(pdf_text)
+
     # 1. Direct substring match (fastest)
-    if norm_app in pdf_text:
+    if norm_app in index.text:
         return True, 1.0
 
-    # 2. Fuzzy substring match
-    # SequenceMatcher is slow for large text. 
-    # We can try to split app_text into chunks overlap?
-    # Or just use find_longest_match logic
-    
-    s = SequenceMatcher(None, norm_app, pdf_text)
-    match = s.find_longest_match(0, len(norm_app), 0, len(pdf_text))
-    
+    # 2. Fuzzy substring match: longest common substring via the index.
     # If the longest match covers most of the app_text, it's a match.
-    if match.size > len(norm_app) * threshold:
-        return True, match.size / len(norm_app)
-        
-    return False, match.size / len(norm_app) if len(norm_app) > 0 else 0
+    size = index.longest_match(norm_app)
+    if size > len(norm_app) * threshold:
+        return True, size / len(norm_app)
+
+    return False, size / len(norm_app)
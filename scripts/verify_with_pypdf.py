@@ -1,13 +1,15 @@
-import json
 import os
 import re
 import sys
-from pypdf import PdfReader
-from difflib import SequenceMatcher
+
+from corpus import EXAMS_JSON, load_corpus
+from pdf_catalog import pdf_for_exam
+from pdf_layout import get_layout
+from pdf_text import get_normalized_text, get_pages
+from text_utils import text_index
 
 # Configuration
-EXAMS_JSON_PATH = "app/src/main/assets/exams.json"
-PDF_DIR = "fragen"
+EXAMS_JSON_PATH = EXAMS_JSON
 REPORT_FILE = "pypdf_verification_report.md"
 
 def normalize_text(text):
@@ -27,52 +29,41 @@ def verify_text_match(app_text, pdf_text, threshold=0.85):
     if not norm_app:
         return True, 1.0
 
-    if norm_app in pdf_text:
-        return True, 1.0
+    # One index per PDF text, reused for every field; its automaton is only
+    # built once a field needs longest_match
+    index = text_index(pdf_text)
 
-    # For now, let's stick to simple "in" check on normalized PDF text.
-    # If not found, we return False.
-    # Calculating score on full PDF is expensive.
+    if norm_app in index.text:
+        return True, 1.0
 
     # Remove all non-alphanumeric to be very lenient
     clean_app = re.sub(r'\W+', '', norm_app).lower()
-    clean_pdf = re.sub(r'\W+', '', pdf_text).lower()
 
-    if clean_app in clean_pdf:
+    if clean_app in index.clean:
         return True, 0.95
 
-    return False, 0.0
-
-def get_pdf_filename(exam_id):
-    year, month = exam_id.split('-')
-    month_german = "Maerz" if month == "march" else "Oktober"
-
-    # Heuristics for PDF naming
-    patterns = [
-        f"HPP_Pruefung_{month_german}_{year}",
-        f"{month_german}-{year}",
-        f"Oktober-{year}" if month == "october" else f"Maerz-{year}",
-        f"{month_german} {year}"
-    ]
-
-    for f in os.listdir(PDF_DIR):
-        if not f.endswith(".pdf"): continue
-        for p in patterns:
-            if f.startswith(p) or p in f:
-                return os.path.join(PDF_DIR, f)
-    return None
+    # Not found: report how much of the text occurs verbatim as the score
+    return False, index.longest_match(norm_app) / len(norm_app)
 
 def extract_pdf_text(pdf_path):
     try:
-        reader = PdfReader(pdf_path)
-        text = ""
-        for page in reader.pages:
-            text += page.extract_text() + "\n"
-        return normalize_text(text)
+        return get_normalized_text(pdf_path, "pypdf")
     except Exception as e:
         print(f"Error extracting text from {pdf_path}: {e}")
         return ""
 
+def extract_key_text(pdf_path, pdf_text):
+    """Normalized text of the Gruppe A answer key page from the layout index.
+
+    Falls back to the whole PDF text if the index has no such page (scanned
+    PDFs). Searching only the key page keeps "1 Einfachauswahl" and the like
+    on question pages from being read as key entries.
+    """
+    key = get_layout(pdf_path)['answer_key']
+    if key is None or key['gruppe_b_only']:
+        return pdf_text
+    return get_pages(pdf_path, "pypdf")[key['page']]['normalized']
+
 def extract_solution_key(pdf_text):
     """
     Attempts to find a solution key in the text.
@@ -113,8 +104,7 @@ def main():
         print(f"Error: {EXAMS_JSON_PATH} not found.")
         return
 
-    with open(EXAMS_JSON_PATH, 'r') as f:
-        exams = json.load(f)
+    exams = load_corpus(EXAMS_JSON_PATH).exams
 
     report_lines = []
     report_lines.append("# Verification Report (with pypdf)")
@@ -128,7 +118,7 @@ def main():
         exam_id = exam.get('id')
         print(f"Processing {exam_id}...")
 
-        pdf_path = get_pdf_filename(exam_id)
+        pdf_path = pdf_for_exam(exam_id)
         if not pdf_path:
             report_lines.append(f"## {exam_id}")
             report_lines.append(f"- **MISSING PDF**: Could not find a matching PDF file.")
@@ -147,7 +137,7 @@ def main():
         report_lines.append(f"PDF: `{pdf_path}`")
 
         # Try to extract solution key
-        pdf_solutions = extract_solution_key(pdf_text)
+        pdf_solutions = extract_solution_key(extract_key_text(pdf_path, pdf_text))
         if pdf_solutions:
             report_lines.append(f"- **Solution Key**: Found ({len(pdf_solutions)} entries)")
         else:
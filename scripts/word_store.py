@@ -0,0 +1,184 @@
+#!/usr/bin/env python3
+"""Columnar store of the word boxes of every page of a PDF, cached as .npz.
+
+The geometry stages each called page.get_text("words") again and walked
+the words in Python: question_headers and page_rows (pdf_layout),
+detect_grid_sections (extract_pdf_images, which grouped number words into
+round(y0 / 8) * 8 buckets). build_columns() extracts the words of all pages
+once into columns:
+
+  x0, y0, x1, y1      float32 (MuPDF computes boxes in float32, so this
+                      is lossless)
+  page, block, line, word   int32, as in get_text("words")
+  text                int32 index into strings, the interned word texts
+
+Words are ordered by page, then in get_text("words") order. get_store()
+caches the columns under .cache/words/, keyed by the SHA-256 of the PDF
+and STORE_VERSION, and returns a WordStore with vectorized queries:
+page ranges, words inside a rect, row clustering and number-header rows.
+
+Usage: python3 scripts/word_store.py [PDF ...]
+Prints the store size of the given PDFs (default: all of fragen/).
+Run from project root.
+"""
+
+import os
+import sys
+import time
+import zipfile
+
+import numpy as np
+
+from answer_grid import cluster_1d
+from pdf_text import file_sha256
+
+FRAGEN_DIR = "fragen"
+STORE_DIR = ".cache/words"
+# Bump when the extraction or the columns change
+STORE_VERSION = 1
+BOX_COLUMNS = ('x0', 'y0', 'x1', 'y1')
+INDEX_COLUMNS = ('page', 'block', 'line', 'word')
+
+_memo = {}  # sha256 -> WordStore
+
+
+class WordStore:
+    """Word boxes of one PDF as NumPy columns (see module docstring)."""
+
+    def __init__(self, columns, strings):
+        for name in BOX_COLUMNS + INDEX_COLUMNS + ('text',):
+            setattr(self, name, columns[name])
+        self.strings = strings
+        # int() of every distinct text, -1 where it is not a number
+        numbers = []
+        for s in strings:
+            try:
+                numbers.append(int(s))
+            except ValueError:
+                numbers.append(-1)
+        self.string_numbers = np.array(numbers, dtype=np.int64)
+        self.number = self.string_numbers[self.text]
+
+    def __len__(self):
+        return len(self.text)
+
+    def texts(self, idx):
+        """Texts of the words at the given indices."""
+        return self.strings[self.text[idx]]
+
+    def is_text(self, *texts):
+        """Mask of the words whose text is one of texts."""
+        return np.isin(self.text, np.flatnonzero(np.isin(self.strings, list(texts))))
+
+    def page_range(self, page_idx):
+        """(start, stop) of a page's words."""
+        return (int(np.searchsorted(self.page, page_idx, 'left')),
+                int(np.searchsorted(self.page, page_idx, 'right')))
+
+    def page_words(self, page_idx):
+        """Indices of a page's words, in get_text("words") order."""
+        return np.arange(*self.page_range(page_idx))
+
+    def in_rect(self, page_idx, rect):
+        """Indices of the page's words whose centre lies inside rect (x0, y0, x1, y1)."""
+        start, stop = self.page_range(page_idx)
+        cx = (self.x0[start:stop] + self.x1[start:stop]) / 2
+        cy = (self.y0[start:stop] + self.y1[start:stop]) / 2
+        inside = (cx >= rect[0]) & (cx <= rect[2]) & (cy >= rect[1]) & (cy <= rect[3])
+        return start + np.flatnonzero(inside)
+
+    def rows(self, idx, gap=None):
+        """Row labels of the words at idx, numbered top to bottom.
+
+        Words whose y centres lie within gap of each other (default: half
+        the median word height) share a row.
+        """
+        if not len(idx):
+            return np.empty(0, dtype=int)
+        cy = (self.y0[idx] + self.y1[idx]) / 2
+        if gap is None:
+            gap = np.median(self.y1[idx] - self.y0[idx]) / 2
+        return cluster_1d(cy, gap)
+
+    def number_rows(self, page_idx, min_count, lo=1, hi=28, key='y0', gap=None):
+        """Rows of at least min_count numbers in [lo, hi], e.g. answer grid headers.
+
+        Rows are clustered on the key column (default: half the median
+        height of the numbers). Returns index arrays top to bottom, each
+        sorted left to right.
+        """
+        idx = self.page_words(page_idx)
+        idx = idx[(self.number[idx] >= lo) & (self.number[idx] <= hi)]
+        if not len(idx):
+            return []
+        values = getattr(self, key)[idx]
+        if gap is None:
+            gap = np.median(self.y1[idx] - self.y0[idx]) / 2
+        labels = cluster_1d(values, gap)
+        rows = []
+        for label in range(labels.max() + 1):
+            members = idx[labels == label]
+            if len(members) >= min_count:
+                rows.append(members[np.argsort(self.x0[members], kind='stable')])
+        return rows
+
+
+def build_columns(pdf_path):
+    """(columns, strings) of every word of a PDF."""
+    import fitz
+    records = []
+    with fitz.open(pdf_path) as doc:
+        for page_idx, page in enumerate(doc):
+            for w in page.get_text("words"):
+                records.append((w[0], w[1], w[2], w[3], page_idx, w[5], w[6], w[7], w[4]))
+    texts = [r[8] for r in records]
+    strings, text = np.unique(np.array(texts, dtype=str), return_inverse=True)
+    columns = {'text': text.astype(np.int32)}
+    for i, name in enumerate(BOX_COLUMNS):
+        columns[name] = np.array([r[i] for r in records], dtype=np.float32)
+    for i, name in enumerate(INDEX_COLUMNS, start=len(BOX_COLUMNS)):
+        columns[name] = np.array([r[i] for r in records], dtype=np.int32)
+    return columns, strings
+
+
+def _store_path(sha):
+    return os.path.join(STORE_DIR, f"{sha}-v{STORE_VERSION}.npz")
+
+
+def get_store(pdf_path):
+    """WordStore of a PDF, cached by content hash."""
+    sha = file_sha256(pdf_path)
+    if sha in _memo:
+        return _memo[sha]
+    path = _store_path(sha)
+    try:
+        with np.load(path) as data:
+            columns = {name: data[name] for name in data.files if name != 'strings'}
+            strings = data['strings']
+    except (OSError, ValueError, KeyError, zipfile.BadZipFile):
+        columns = None
+    if columns is None:
+        columns, strings = build_columns(pdf_path)
+        os.makedirs(STORE_DIR, exist_ok=True)
+        tmp = f"{path}.{os.getpid()}.tmp.npz"
+        np.savez(tmp, strings=strings, **columns)
+        os.replace(tmp, path)
+    _memo[sha] = store = WordStore(columns, strings)
+    return store
+
+
+def main():
+    pdfs = sys.argv[1:]
+    if not pdfs:
+        pdfs = [os.path.join(FRAGEN_DIR, f) for f in sorted(os.listdir(FRAGEN_DIR))
+                if f.endswith('.pdf')]
+    for pdf_path in pdfs:
+        start = time.perf_counter()
+        store = get_store(pdf_path)
+        seconds = time.perf_counter() - start
+        print(f"  {os.path.basename(pdf_path):<55} {len(store):>6} words "
+              f"{len(store.strings):>5} distinct {seconds * 1000:>7.1f}ms")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,140 @@
+import json
+import os
+import sys
+import types
+
+import pytest
+from PIL import Image, ImageDraw
+
+import extract_pdf_images as epi
+from pdf_text import file_sha256
+
+EXAM_ID = "2022-march"
+
+# Globals configure() rebinds; restored after every test
+CONFIG_GLOBALS = ("DPI", "OUTPUT_DIR", "MANIFEST_PATH", "INDEX_PATH", "ENCODER",
+                  "ENCODER_PROFILES", "OUTPUT_TIERS", "PACK_DIR", "PAGE_CACHE_BYTES",
+                  "TRIM_PADDING", "REPORT_TRIM_BYTES")
+
+
+@pytest.fixture
+def project(tmp_path, monkeypatch):
+    """Empty project root with one exam whose 'rendering' writes a stub file."""
+    monkeypatch.chdir(tmp_path)
+    for name in CONFIG_GLOBALS:
+        monkeypatch.setattr(epi, name, getattr(epi, name))
+    monkeypatch.setattr(epi, "load_corpus", lambda: types.SimpleNamespace(exams=[{'id': EXAM_ID}]))
+
+    def process_exam(exam, previous=None, force=False):
+        output_dir = os.path.join(epi.OUTPUT_DIR, exam['id'])
+        os.makedirs(output_dir, exist_ok=True)
+        path = os.path.join(output_dir, "q1.webp")
+        with open(path, 'wb') as f:
+            f.write(b"RIFF-stub")
+        outputs = {"q1.webp": {'segments': [], 'variants': {'1x': {
+            'file': "q1.webp", 'width': 1, 'height': 1, 'sha256': file_sha256(path),
+            'encoding': "fixed", 'bytes': 9, 'baseline_bytes': 9}}}}
+        if epi.PACK_DIR:
+            epi.write_pack(exam['id'], output_dir, outputs)
+        return 1, {'outputs': outputs, **epi.render_settings()}
+
+    monkeypatch.setattr(epi, "process_exam", process_exam)
+    os.makedirs(os.path.join(epi.ASSETS_DIR, EXAM_ID))
+    return tmp_path
+
+
+def run(monkeypatch, *args):
+    monkeypatch.setattr(sys, "argv", ["extract_pdf_images.py", *args])
+    epi.main()
+
+
+def test_switching_between_loose_and_pack_mode(project, monkeypatch):
+    assets = epi.ASSETS_DIR
+    loose = os.path.join(assets, EXAM_ID, "q1.webp")
+    pack = os.path.join(assets, epi.pack_name(EXAM_ID))
+    hand_made = os.path.join(assets, EXAM_ID, "diagram.png")
+    with open(hand_made, 'wb') as f:
+        f.write(b"png")
+
+    run(monkeypatch)
+    assert os.path.exists(loose) and not os.path.exists(pack)
+
+    run(monkeypatch, "--pack")
+    assert os.path.exists(pack) and not os.path.exists(loose)
+    assert set(epi.read_pack(pack)) == {"q1.webp"}
+
+    # Back to loose files: the pack must go, or the app keeps reading it
+    run(monkeypatch)
+    assert os.path.exists(loose) and not os.path.exists(pack)
+    assert os.path.exists(hand_made)
+
+
+def test_loose_run_to_other_output_keeps_packs(project, monkeypatch):
+    run(monkeypatch, "--pack")
+    run(monkeypatch, "--output", "export")
+    assert os.path.exists(os.path.join(epi.ASSETS_DIR, epi.pack_name(EXAM_ID)))
+    assert os.path.exists(os.path.join("export", EXAM_ID, "q1.webp"))
+
+
+def page_tiers(ink_box, size=(400, 600)):
+    """1x and 2x renderings of a white page with a black rectangle.
+
+    ink_box is (x0, y0, x1, y1) in 1x pixels, both ends included.
+    """
+    x0, y0, x1, y1 = ink_box
+    base = Image.new("RGB", (size[0] * 2, size[1] * 2), "white")
+    ImageDraw.Draw(base).rectangle([x0 * 2, y0 * 2, x1 * 2 + 1, y1 * 2 + 1], fill="black")
+    return {'1x': base.resize(size, Image.BOX), '2x': base}
+
+
+def test_ink_bbox():
+    img = Image.new("L", (50, 40), 255)
+    assert epi.ink_bbox(img) is None
+    img.putpixel((10, 5), 0)
+    img.putpixel((30, 20), 200)
+    assert epi.ink_bbox(img) == (10, 5, 31, 21)
+    assert epi.ink_bbox(img, threshold=100) == (10, 5, 11, 6)
+
+
+def test_trim_tiers_leaves_blank_and_full_images_alone():
+    blank = {'1x': Image.new("RGB", (40, 30), "white"), '2x': Image.new("RGB", (80, 60), "white")}
+    assert epi.trim_tiers(blank, 8) is blank
+    full = page_tiers((2, 2, 37, 27), size=(40, 30))
+    assert epi.trim_tiers(full, 8) is full
+
+
+def test_trim_tiers_cuts_every_tier_at_the_same_whole_pixel_box():
+    images = page_tiers((100, 200, 150, 301))
+    trimmed = epi.trim_tiers(images, 8)
+    # Ink spans 1x pixels 100..150 and 200..301; 8 pixels of padding
+    assert trimmed['1x'].size == (150 + 1 + 8 - 92, 301 + 1 + 8 - 192)
+    assert trimmed['2x'].size == (trimmed['1x'].width * 2, trimmed['1x'].height * 2)
+    assert epi.ink_bbox(trimmed['1x']) == (8, 8, trimmed['1x'].width - 8, trimmed['1x'].height - 8)
+    assert epi.ink_bbox(trimmed['2x']) == (16, 16, trimmed['2x'].width - 16, trimmed['2x'].height - 16)
+
+
+def test_trim_tiers_padding_stops_at_the_image_edge():
+    trimmed = epi.trim_tiers(page_tiers((3, 250, 200, 300)), 8)
+    assert epi.ink_bbox(trimmed['1x'])[0] == 3
+
+
+def test_manifest_stays_out_of_the_app_assets(project, monkeypatch):
+    run(monkeypatch)
+    assert not os.path.exists(os.path.join(epi.ASSETS_DIR, "manifest.json"))
+    assert EXAM_ID in epi.read_manifest(epi.ASSETS_DIR)['exams']
+    assert os.path.exists(epi.manifest_path(epi.ASSETS_DIR))
+
+
+def test_manifest_format_change_removes_the_old_images(project, monkeypatch):
+    # A format 1 manifest, left in the assets by an earlier version
+    old = os.path.join(epi.ASSETS_DIR, EXAM_ID, "q9.webp")
+    with open(old, 'wb') as f:
+        f.write(b"old")
+    legacy = os.path.join(epi.ASSETS_DIR, "manifest.json")
+    with open(legacy, 'w') as f:
+        json.dump({'format': 1, 'exams': {EXAM_ID: {'outputs': {
+            "q9.webp": {'segments': [], 'sha256': "x"}}}}}, f)
+
+    run(monkeypatch)
+    assert not os.path.exists(old) and not os.path.exists(legacy)
+    assert os.path.exists(os.path.join(epi.ASSETS_DIR, EXAM_ID, "q1.webp"))
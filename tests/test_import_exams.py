@@ -0,0 +1,85 @@
+import json
+import os
+
+import pytest
+
+import import_exams
+from corpus import load_corpus
+
+OCR_PAGE = """Heilpraktikerüberprüfung - 10. Oktober 2007 Gruppe B
+bitte nicht beschriften!
+9
+Einfachauswahl
+Darunter ist zu verstehen:
+] A) Eine besondere Überlastungsreaktion
+] B) Eine Zerstreutheit
+[1] c) Eine Zerfahrenheit
+| D Ein krankhaft beschleunigter Denkablauf
+| E) Eine Wahnvorstellung | |
+41 bitte nicht beschriften!
+Aussagenkombination
+Welche Aussagen treffen zu?
+1. Mundtrockenheit
+2. Schwitzen
+N] A) Nur die Aussage 1 ist richtig
+] B) Nur die Aussage 2 ist richtig
+] BD) Nur die Aussagen 1 und 2 sind richtig
+] D) Keine Aussage ist richtig
+] E) Alle Aussagen sind richtig
+7
+"""
+
+
+def test_ocr_question_lines_recover_numbers_and_option_markers():
+    questions = import_exams.parse_token_questions(
+        "\n".join(import_exams.ocr_question_lines([OCR_PAGE])))
+    assert [(q['id'], q['type']) for q in questions] == [
+        (9, "Einfachauswahl"), (10, "Aussagenkombination")]
+    assert questions[0]['options'][:4] == [
+        "A) Eine besondere Überlastungsreaktion", "B) Eine Zerstreutheit",
+        "C) Eine Zerfahrenheit", "D) Ein krankhaft beschleunigter Denkablauf"]
+    assert questions[0]['options'][4].startswith("E) Eine Wahnvorstellung")
+    assert questions[1]['statements'] == ["Mundtrockenheit", "Schwitzen"]
+    assert [o[:3] for o in questions[1]['options']] == ["A) ", "B) ", "C) ", "D) ", "E) "]
+
+
+def test_merge_keeps_answer_key_and_explanation_the_import_lacks():
+    corpus = type("Corpus", (), {})()
+    exam = {'questions': [{'id': 1, 'correctIndices': [2], 'explanation': "Weil"}]}
+    corpus.exam = lambda exam_id: exam
+    questions = [{'id': 1, 'text': "Neu", 'correctIndices': [], 'explanation': ""}]
+    assert import_exams.merge_exam(corpus, "2007-october", 2007, "Oktober", questions, 'B') == "replaced"
+    assert exam['questions'] == [{'id': 1, 'text': "Neu", 'correctIndices': [2], 'explanation': "Weil"}]
+
+
+def test_fix_passes_run_after_a_failing_one(monkeypatch):
+    from corpus import Corpus, Exam
+    corpus = Corpus([Exam("2007-october", 2007, "Oktober", [
+        {'id': 1, 'type': "Einfachauswahl", 'text': "Frage", 'options': ["A) Ja", "B) Nein"]}], 'B')])
+
+    def fail(corpus):
+        raise FileNotFoundError("pdftotext")
+
+    def strip_prefixes(corpus):
+        for q in corpus.exams[0]['questions']:
+            q['options'] = [o[3:] for o in q['options']]
+
+    monkeypatch.setattr(import_exams.fix_pipeline, "PASSES",
+                        [('fail', fail), ('strip', strip_prefixes)])
+    assert import_exams.apply_fix_passes(corpus, {"2007-october"}) == 1
+    assert corpus.exams[0]['questions'][0]['options'] == ["Ja", "Nein"]
+
+
+def test_reimport_leaves_every_other_exam_byte_identical():
+    pdf = os.path.join(import_exams.FRAGEN_DIR, "HPP_Pruefung_Maerz_2022_mit_Loesungen_.pdf")
+    if not os.path.exists(pdf):
+        pytest.skip(f"{pdf} not found")
+    corpus = load_corpus()
+    original = {e['id']: json.dumps(e, ensure_ascii=False) for e in corpus.to_list()}
+    questions, gruppe, error, _ = import_exams.import_pdf(pdf)
+    assert not error
+    import_exams.merge_exam(corpus, "2022-march", 2022, "März", questions, gruppe)
+    import_exams.apply_fix_passes(corpus, {"2022-march"})
+    after = {e['id']: json.dumps(e, ensure_ascii=False) for e in corpus.to_list()}
+    assert list(after) == list(original)
+    assert {eid for eid in original if after[eid] != original[eid]} <= {"2022-march"}
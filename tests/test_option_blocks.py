@@ -0,0 +1,62 @@
+"""Golden test of the option block finders over every PDF in fragen/.
+
+tests/golden/option_blocks/{pdf}.json holds the blocks that
+extract_options.find_option_blocks and fix_all.find_option_blocks returned
+for the PDF's cleaned fitz text before the pdf_tokens.option_sequences
+rewrite, plus the SHA-256 of that text. A PDF whose text differs (another
+PyMuPDF version) is skipped rather than compared against stale blocks.
+
+After an intended change of the block output, rewrite the golden files with
+UPDATE_GOLDEN=1 python -m pytest tests/test_option_blocks.py
+"""
+
+import hashlib
+import json
+import os
+
+import pytest
+
+import extract_options
+import fix_all
+
+TESTS_DIR = os.path.dirname(os.path.abspath(__file__))
+FRAGEN_DIR = os.path.join(os.path.dirname(TESTS_DIR), "fragen")
+GOLDEN_DIR = os.path.join(TESTS_DIR, "golden", "option_blocks")
+UPDATE = os.environ.get("UPDATE_GOLDEN") == "1"
+
+PDFS = sorted(f for f in os.listdir(FRAGEN_DIR) if f.endswith('.pdf')) \
+    if os.path.isdir(FRAGEN_DIR) else []
+GOLDEN = sorted(os.listdir(GOLDEN_DIR)) if os.path.isdir(GOLDEN_DIR) else []
+
+
+def golden_path(pdf):
+    return os.path.join(GOLDEN_DIR, os.path.splitext(pdf)[0] + ".json")
+
+
+@pytest.mark.parametrize("pdf", PDFS)
+def test_option_blocks_match_golden(pdf):
+    text = fix_all.get_pdf_text(os.path.join(FRAGEN_DIR, pdf))
+    actual = {'text_sha256': hashlib.sha256(text.encode()).hexdigest(),
+              'extract_options': extract_options.find_option_blocks(text),
+              'fix_all': fix_all.find_option_blocks(text)}
+    if UPDATE:
+        os.makedirs(GOLDEN_DIR, exist_ok=True)
+        with open(golden_path(pdf), 'w') as f:
+            json.dump(actual, f, ensure_ascii=False, indent=1, sort_keys=True)
+            f.write("\n")
+        return
+    with open(golden_path(pdf)) as f:
+        golden = json.load(f)
+    if golden['text_sha256'] != actual['text_sha256']:
+        pytest.skip("PDF text differs from the golden run (PyMuPDF version?)")
+    assert actual['extract_options'] == golden['extract_options']
+    assert actual['fix_all'] == golden['fix_all']
+
+
+def test_every_pdf_has_golden_blocks():
+    # A wrong path would collect no cases above and pass silently
+    assert GOLDEN, f"no golden files in {GOLDEN_DIR}"
+    assert PDFS, f"no PDFs in {FRAGEN_DIR}"
+    missing = [pdf for pdf in PDFS if not os.path.exists(golden_path(pdf))]
+    assert not missing
+    assert len(GOLDEN) == len(PDFS)
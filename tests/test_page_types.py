@@ -0,0 +1,13 @@
+from page_types import is_answer_key_text
+
+
+def test_answer_key_heading_counts_in_the_second_half():
+    assert is_answer_key_text("Lösungsschlüssel Gruppe A", 10, 16)
+    assert is_answer_key_text("Lösungschlüssel", 8, 16)
+    assert not is_answer_key_text("Prüfung mit Lösungsschlüssel", 0, 16)
+
+
+def test_solutions_heading_counts_on_the_last_pages_only():
+    assert is_answer_key_text("Lösungen Gruppe A", 14, 16)
+    assert is_answer_key_text("Lösungen Gruppe B", 15, 16)
+    assert not is_answer_key_text("Lösungen", 11, 16)
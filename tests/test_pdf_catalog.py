@@ -0,0 +1,27 @@
+import os
+
+import pytest
+
+import fitz
+from pdf_catalog import describe_pdf
+from pdf_layout import find_answer_key_page
+
+FRAGEN_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "fragen")
+
+
+# Key pages headed "Lösungen Gruppe A" / "Lösungen für die ...", no "Lösungsschlüssel"
+@pytest.mark.parametrize("pdf", ["Maerz-2014.pdf", "Oktober-2005.pdf", "Maerz-2008.pdf"])
+def test_solutions_heading_marks_a_key_page(pdf):
+    path = os.path.join(FRAGEN_DIR, pdf)
+    if not os.path.exists(path):
+        pytest.skip(f"{pdf} not in fragen/")
+    assert describe_pdf(path)['has_solutions']
+    with fitz.open(path) as doc:
+        assert find_answer_key_page(doc)[0] is not None
+
+
+def test_pdf_without_key_page():
+    path = os.path.join(FRAGEN_DIR, "Oktober-2008.pdf")
+    if not os.path.exists(path):
+        pytest.skip("Oktober-2008.pdf not in fragen/")
+    assert not describe_pdf(path)['has_solutions']
@@ -0,0 +1,8 @@
+import pdf_layout
+import word_store
+
+
+def test_layout_cache_key_follows_word_store_version(monkeypatch):
+    before = pdf_layout._cache_path("ab" * 32)
+    monkeypatch.setattr(word_store, "STORE_VERSION", word_store.STORE_VERSION + 1)
+    assert pdf_layout._cache_path("ab" * 32) != before
@@ -0,0 +1,87 @@
+import pytest
+
+import pdf_ocr
+
+
+@pytest.fixture
+def engine(tmp_path, monkeypatch):
+    """A fake OCR engine whose version() fails once it is 'uninstalled'."""
+    state = {'installed': True}
+
+    def version():
+        if not state['installed']:
+            raise RuntimeError("fake engine not found")
+        return "1.2"
+
+    monkeypatch.setattr(pdf_ocr, "CACHE_DIR", str(tmp_path))
+    monkeypatch.setattr(pdf_ocr, "VERSIONS_PATH", str(tmp_path / "engines.json"))
+    monkeypatch.setattr(pdf_ocr, "ENGINES", {"fake": (None, version)})
+    monkeypatch.setattr(pdf_ocr, "_version_memo", {})
+    return state
+
+
+def test_engine_version_falls_back_to_recorded_version(engine):
+    assert pdf_ocr.engine_version("fake") == "1.2"
+    engine['installed'] = False
+    pdf_ocr._version_memo.clear()
+    assert pdf_ocr.engine_version("fake") == "1.2"
+
+
+def test_engine_version_without_engine_or_record_fails(engine):
+    engine['installed'] = False
+    with pytest.raises(RuntimeError):
+        pdf_ocr.engine_version("fake")
+
+
+# OCR text of a scanned exam: a question page, the Gruppe B copy and the key
+OCR_PAGES = [
+    """Heilpraktikerüberprüfung - 10. Oktober 2007 Gruppe A
+12 | |
+Aussagenkombination
+Welche Aussagen zur Demenz treffen zu?
+1. Gedächtnisstörungen
+2. Beginn meist
+im Kindesalter
+Wählen Sie eine richtige Aussagenkombination!
+|] A) Nur die Aussage 1 ist richtig
+] B) Nur die Aussage 2 ist richtig
+[1] c) Nur die Aussagen 1 und 2 sind richtig
+| D Keine Aussage ist richtig
+] E) Alle Aussagen sind richtig
+Einfachauswahl
+Was trifft zu?
+] A) Eins
+] B) Zwei
+] C) Drei
+] D) Vier
+] E) Fünf
+""",
+    """Gruppe B
+1
+Einfachauswahl
+Kopie
+""",
+    """Lösungsschlüssel Gruppe A
+12 A
+13 C
+""",
+]
+
+
+def test_scanned_pdf_is_parsed_from_its_ocr_text(monkeypatch):
+    import import_exams
+    monkeypatch.setattr(import_exams, "get_page_texts",
+                        lambda pdf_path, backend="fitz": OCR_PAGES)
+    questions, group = import_exams.parse_pdf_scanned("scan.pdf")
+    assert group == 'A'
+    assert [(q['id'], q['type']) for q in questions] == [
+        (12, "Aussagenkombination"), (13, "Einfachauswahl")]
+    first, second = questions
+    assert first['text'] == "Welche Aussagen zur Demenz treffen zu?"
+    assert first['statements'] == ["Gedächtnisstörungen", "Beginn meist im Kindesalter"]
+    assert first['options'] == [
+        "A) Nur die Aussage 1 ist richtig", "B) Nur die Aussage 2 ist richtig",
+        "C) Nur die Aussagen 1 und 2 sind richtig", "D) Keine Aussage ist richtig",
+        "E) Alle Aussagen sind richtig"]
+    assert second['options'] == ["A) Eins", "B) Zwei", "C) Drei", "D) Vier", "E) Fünf"]
+    assert second['correctIndices'] == []
@@ -0,0 +1,50 @@
+import fitz
+import pytest
+
+import pdf_text
+
+
+@pytest.fixture
+def pdf(tmp_path, monkeypatch):
+    """Four-page PDF, an empty text cache and a count of extracted pages."""
+    monkeypatch.setattr(pdf_text, "CACHE_DIR", str(tmp_path / "cache"))
+    monkeypatch.setattr(pdf_text, "_pages_memo", {})
+    extracted = []
+
+    def iter_fitz(pdf_path, start=0):
+        for page_idx, text in enumerate(pdf_text._iter_fitz(pdf_path, start), start):
+            extracted.append(page_idx)
+            yield text
+
+    monkeypatch.setitem(pdf_text._PAGE_ITERATORS, "fitz", iter_fitz)
+    path = str(tmp_path / "exam.pdf")
+    doc = fitz.open()
+    for n in range(4):
+        doc.new_page().insert_text((72, 72), f"Seite {n + 1}")
+    doc.save(path)
+    doc.close()
+    return path, extracted
+
+
+def test_early_stop_caches_the_extracted_prefix(pdf):
+    path, extracted = pdf
+    for i, _ in enumerate(pdf_text.iter_pages(path)):
+        if i == 1:
+            break
+    assert extracted == [0, 1]
+
+    texts = list(pdf_text.iter_pages(path))
+    assert [t.strip() for t in texts] == ["Seite 1", "Seite 2", "Seite 3", "Seite 4"]
+    assert extracted == [0, 1, 2, 3]  # continued after the cached prefix
+
+    # Now complete: served from the cache, also to get_pages
+    pdf_text._pages_memo.clear()
+    assert list(pdf_text.iter_pages(path)) == texts
+    assert [p['raw'] for p in pdf_text.get_pages(path)] == texts
+    assert extracted == [0, 1, 2, 3]
+
+
+def test_get_pages_ignores_an_incomplete_entry(pdf):
+    path, _ = pdf
+    next(pdf_text.iter_pages(path))
+    assert len(pdf_text.get_pages(path)) == 4
@@ -0,0 +1,64 @@
+import pytest
+
+import text_utils
+from text_utils import TextIndex, text_index, verify_text_match
+
+TEXTS = [
+    "welche aussage trifft zu? die leber",
+    "abracadabra",
+    "aaaaab",
+    "",
+]
+PATTERNS = ["", "zzz", "abra", "cadab", "leber!", "aab", "bab", "rac", "die lunge", "a"]
+
+
+def brute_force_longest(text, pattern):
+    return max((j - i for i in range(len(pattern)) for j in range(i + 1, len(pattern) + 1)
+                if pattern[i:j] in text), default=0)
+
+
+@pytest.mark.parametrize("text", TEXTS)
+def test_matches_agree_with_brute_force(text):
+    index = TextIndex(text)
+    for pattern in PATTERNS:
+        assert (pattern in index) == (pattern in text)
+        assert index.longest_match(pattern) == brute_force_longest(text, pattern)
+
+
+@pytest.fixture
+def builds(monkeypatch):
+    """Texts whose automaton gets built, with an empty text_index cache."""
+    built = []
+    build = TextIndex._build
+
+    def counting_build(index):
+        built.append(index.text)
+        build(index)
+
+    monkeypatch.setattr(TextIndex, "_build", counting_build)
+    monkeypatch.setattr(text_utils, "_INDEX_CACHE", {})
+    return built
+
+
+def test_substring_hits_never_build_the_automaton(builds):
+    texts = [f"seite {n} welche aussage trifft zu" for n in range(6)]
+    for text in texts:
+        assert verify_text_match("aussage  trifft", text) == (True, 1.0)
+        assert text_index(text).clean.startswith("seite")
+    assert builds == []
+
+    match, score = verify_text_match("aussage trifft nie", texts[-1])
+    assert not match and score == len("aussage trifft ") / len("aussage trifft nie")
+    assert builds == [texts[-1]]
+
+
+def test_cached_index_builds_once(builds):
+    text = "die leber ist ein organ"
+    for _ in range(3):
+        verify_text_match("die lunge", text)
+    assert builds == [text]
+    # Four other texts push it out of the LRU; it is built again
+    for n in range(4):
+        verify_text_match("x", f"text {n}")
+    verify_text_match("die lunge", text)
+    assert builds.count(text) == 2
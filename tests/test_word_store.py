@@ -0,0 +1,31 @@
+import numpy as np
+
+from word_store import BOX_COLUMNS, INDEX_COLUMNS, WordStore
+
+
+def make_store(words):
+    """WordStore of [(page, x0, y0, x1, y1, text)], already in page order."""
+    strings, text = np.unique(np.array([w[5] for w in words], dtype=str), return_inverse=True)
+    columns = {'text': text.astype(np.int32)}
+    for i, name in enumerate(BOX_COLUMNS, start=1):
+        columns[name] = np.array([w[i] for w in words], dtype=np.float32)
+    for name in INDEX_COLUMNS:
+        columns[name] = np.zeros(len(words), dtype=np.int32)
+    columns['page'] = np.array([w[0] for w in words], dtype=np.int32)
+    return WordStore(columns, strings)
+
+
+def test_in_rect_selects_words_by_centre_on_one_page():
+    store = make_store([
+        (0, 10, 10, 30, 20, "oben"),
+        (0, 10, 95, 30, 115, "Grenze"),   # centre y 105: outside
+        (0, 50, 50, 70, 60, "mitte"),
+        (1, 10, 10, 30, 20, "andere"),    # same box, other page
+        (1, 50, 50, 70, 60, "Seite"),
+    ])
+    assert store.texts(store.in_rect(0, (0, 0, 100, 100))).tolist() == ["oben", "mitte"]
+    assert store.texts(store.in_rect(1, (0, 0, 40, 40))).tolist() == ["andere"]
+    # Edges are inclusive
+    assert store.texts(store.in_rect(0, (20, 15, 60, 55))).tolist() == ["oben", "mitte"]
+    assert len(store.in_rect(0, (200, 200, 300, 300))) == 0
+    assert len(store.in_rect(2, (0, 0, 100, 100))) == 0